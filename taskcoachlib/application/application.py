@@ -253,6 +253,7 @@ class Application(object, metaclass=patterns.Singleton):
         self.__init_config(loadSettings)
         self.__init_language()
         self.__init_domain_objects()
+        self.__init_command_history()
         self.__init_application()
         from taskcoachlib import gui, persistence
 
@@ -329,6 +330,16 @@ class Application(object, metaclass=patterns.Singleton):
         task.Task.settings = self.settings
         attachment.Attachment.settings = self.settings
 
+    def __init_command_history(self):
+        """Limit the memory used by the undo history."""
+        history = patterns.CommandHistory()
+        history.setMaxDepth(self.settings.getint("behavior", "undodepth"))
+        history.setMaxBytes(
+            self.settings.getint("behavior", "undomegabytes") * 1024 * 1024
+        )
+        if self.settings.getboolean("behavior", "undojournal"):
+            history.setJournal(patterns.CommandJournal())
+
     def __init_application(self):
         from taskcoachlib import meta
 
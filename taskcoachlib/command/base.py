@@ -18,6 +18,7 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
+import contextlib
 from taskcoachlib import patterns
 from taskcoachlib.domain import date
 from taskcoachlib.i18n import _
@@ -74,16 +75,25 @@ class BaseCommand(patterns.Command):
 
     def do(self):
         if self.canDo():
-            super().do()
-            self.do_command()
+            with self.__batch():
+                super().do()
 
     def undo(self):
         super().undo()
-        self.undo_command()
+        with self.__batch():
+            self.undo_command()
 
     def redo(self):
         super().redo()
-        self.redo_command()
+        with self.__batch():
+            self.redo_command()
+
+    def __batch(self):
+        """Commands that change multiple items defer and coalesce the
+        resulting notifications, so observers are notified once."""
+        if len(self.items) > 1:
+            return patterns.batch()
+        return contextlib.nullcontext()
 
     def __tryInvokeMethodOnSuper(self, methodName, *args, **kwargs):
         try:
@@ -113,22 +123,38 @@ class BaseCommand(patterns.Command):
 
 class SaveStateMixin(object):
     """Mixin class for commands that need to keep the states of objects.
-    Objects should provide __getstate__ and __setstate__ methods."""
+    Objects should provide __getstate__ and __setstate__ methods. As soon
+    as the command has been done, only the attributes it changed are kept,
+    as (object, attribute, old value, new value) tuples."""
 
     # pylint: disable=W0201
 
+    # Commands may be done without saving states, e.g. a DeleteCommand that
+    # removes its items instead of marking them deleted:
+    objectsToBeSaved = oldStates = ()
+    changes = None
+
     def saveStates(self, objects):
         self.objectsToBeSaved = objects
         self.oldStates = self.__getStates()
+        self.changes = None
+
+    def compact(self):
+        self.__recordChanges()
+        try:
+            compact = super().compact
+        except AttributeError:
+            return  # No 'compact' in any super class
+        compact()
 
     @patterns.eventSource
     def undoStates(self, event=None):
-        self.newStates = self.__getStates()
-        self.__setStates(self.oldStates, event=event)
+        self.__recordChanges()
+        self.__applyChanges(undo=True, event=event)
 
     @patterns.eventSource
     def redoStates(self, event=None):
-        self.__setStates(self.newStates, event=event)
+        self.__applyChanges(undo=False, event=event)
 
     def __getStates(self):
         return [
@@ -136,10 +162,34 @@ class SaveStateMixin(object):
             for objectToBeSaved in self.objectsToBeSaved
         ]
 
+    def __recordChanges(self):
+        """Replace the saved states with the attributes that changed since
+        the states were saved."""
+        if self.changes is not None:
+            return
+        self.changes = []
+        for objectToBeSaved, oldState, newState in zip(
+            self.objectsToBeSaved, self.oldStates, self.__getStates()
+        ):
+            for attribute, oldValue in oldState.items():
+                newValue = newState.get(attribute)
+                if newValue != oldValue:
+                    self.changes.append(
+                        (objectToBeSaved, attribute, oldValue, newValue)
+                    )
+        self.oldStates = []
+
     @patterns.eventSource
-    def __setStates(self, states, event=None):
-        for objectToBeSaved, state in zip(self.objectsToBeSaved, states):
-            objectToBeSaved.__setstate__(state, event=event)
+    def __applyChanges(self, undo, event=None):
+        # Objects can only restore complete states, so overlay the changed
+        # attributes on the current state of each changed object:
+        states = dict()
+        for changedObject, attribute, oldValue, newValue in self.changes:
+            if changedObject not in states:
+                states[changedObject] = changedObject.__getstate__()
+            states[changedObject][attribute] = oldValue if undo else newValue
+        for changedObject, state in states.items():
+            changedObject.__setstate__(state, event=event)
 
 
 class CompositeMixin(object):
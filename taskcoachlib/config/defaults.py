@@ -559,6 +559,9 @@ defaults = {
     "behavior": {
         "markparentcompletedwhenallchildrencompleted": "False",
         "duesoonhours": "24",  # When a task is considered to be "due soon"
+        "undodepth": "0",  # Max. number of commands in memory, 0 = no limit
+        "undomegabytes": "64",  # Max. memory used by undo history
+        "undojournal": "True",  # Keep old commands on disk, not forget them
     },
     "feature": {
         "syncml": "False",
@@ -36,20 +36,46 @@ class UnicodeAwareConfigParser(configparser.ConfigParser):
 
 
 class CachingConfigParser(UnicodeAwareConfigParser):
-    """ConfigParser is rather slow, so cache its values."""
+    """ConfigParser is rather slow, so cache its values. Besides the raw
+    values, subclasses can cache values derived from them, e.g. parsed
+    values, per kind of value. Derived values are discarded when the
+    option is set."""
 
     def __init__(self, *args, **kwargs):
         self.__cachedValues = dict()
+        self.__cachedDerivedValues = dict()
         super().__init__(*args, **kwargs)
 
     def read(self, *args, **kwargs):
         self.__cachedValues = dict()
+        self.__cachedDerivedValues = dict()
         return super().read(*args, **kwargs)
 
+    def read_file(self, *args, **kwargs):
+        self.__cachedValues = dict()
+        self.__cachedDerivedValues = dict()
+        return super().read_file(*args, **kwargs)
+
+    def remove_section(self, section):
+        self.__cachedValues = dict()
+        self.__cachedDerivedValues = dict()
+        return super().remove_section(section)
+
     def set(self, section, option, value=None):
         self.__cachedValues[(section, option)] = value
+        self.__cachedDerivedValues.pop((section, option), None)
         super().set(section, option, value)
 
+    def getCachedValue(self, section, option, kind):
+        """Return the cached value of the kind for the option. Raise
+        KeyError when there is none."""
+        return self.__cachedDerivedValues[(section, option)][kind]
+
+    def cacheValue(self, section, option, kind, value):
+        self.__cachedDerivedValues.setdefault((section, option), dict())[
+            kind
+        ] = value
+
     def get(self, section, option, **kwargs):
         cache, key = self.__cachedValues, (section, option)
         if key not in cache:
@@ -136,12 +162,19 @@ class Settings(CachingConfigParser):
         return super().set(section, option, value)
 
     def get(self, section, option, **kwargs):
+        if not kwargs:
+            try:
+                return self.getCachedValue(section, option, "text")
+            except KeyError:
+                pass
         try:
             result = super().get(section, option, **kwargs)
         except (configparser.NoOptionError, configparser.NoSectionError):
             return self.getDefault(section, option)
         result = self._fixValuesFromOldIniFiles(section, option, result)
         result = self._ensureMinimum(section, option, result)
+        if not kwargs:
+            self.cacheValue(section, option, "text", result)
         return result
 
     def getDefault(self, section, option):
@@ -273,6 +306,32 @@ class Settings(CachingConfigParser):
     def gettext(self, section, option):
         return self.get(section, option)
 
+    def getcolour(self, section, option):
+        """Return the option, a tuple of color components, as wx.Colour. The
+        colour is shared between callers, so don't modify it."""
+        try:
+            return self.getCachedValue(section, option, "colour")
+        except KeyError:
+            colour = wx.Colour(*self.gettuple(section, option))
+            self.cacheValue(section, option, "colour", colour)
+            return colour
+
+    def getfont(self, section, option):
+        """Return the option, a native font info string, as wx.Font, or None
+        if the option is empty. The font is shared between callers, so
+        don't modify it."""
+        try:
+            return self.getCachedValue(section, option, "font")
+        except KeyError:
+            nativeInfoString = self.get(section, option)
+            font = (
+                wx.FontFromNativeInfoString(nativeInfoString)
+                if nativeInfoString
+                else None
+            )
+            self.cacheValue(section, option, "font", font)
+            return font
+
     @staticmethod
     def evalBoolean(stringValue):
         if stringValue in ("True", "False"):
@@ -285,9 +344,13 @@ class Settings(CachingConfigParser):
     def getEvaluatedValue(
         self, section, option, evaluate=eval, showerror=wx.MessageBox
     ):
+        try:
+            return self.getCachedValue(section, option, evaluate)
+        except KeyError:
+            pass
         stringValue = self.get(section, option)
         try:
-            return evaluate(stringValue)
+            value = evaluate(stringValue)
         except Exception as exceptionMessage:  # pylint: disable=W0703
             message = "\n".join(
                 [
@@ -309,6 +372,14 @@ class Settings(CachingConfigParser):
                 section, option, defaultValue, new=True
             )  # Ignore current value
             return evaluate(defaultValue)
+        try:
+            hash(value)
+        except TypeError:
+            # Lists and dictionaries may be changed by the caller, so
+            # don't cache them:
+            return value
+        self.cacheValue(section, option, evaluate, value)
+        return value
 
     def save(
         self, showerror=wx.MessageBox, file=open
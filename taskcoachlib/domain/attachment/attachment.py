@@ -21,7 +21,6 @@ import urllib.parse
 from taskcoachlib import patterns, mailer
 from taskcoachlib.domain import base
 from taskcoachlib.tools import openfile
-from pubsub import pub
 from taskcoachlib.domain.note.noteowner import NoteOwner
 from functools import total_ordering
 
@@ -91,7 +90,7 @@ class Attachment(base.Object, NoteOwner):
         if location != self.__location:
             self.__location = location
             self.markDirty()
-            pub.sendMessage(
+            patterns.sendMessage(
                 self.locationChangedEventType(), newValue=location, sender=self
             )
 
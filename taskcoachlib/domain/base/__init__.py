@@ -17,7 +17,7 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
 from .object import Object, CompositeObject, SynchronizedObject
-from .attribute import Attribute, SetAttribute
+from .attribute import Attribute, CompactAttribute, SetAttribute
 from .collection import Collection
 from .filter import Filter, SearchFilter, SelectedItemsFilter, DeletedFilter
 from .sorter import Sorter, TreeSorter
@@ -18,7 +18,10 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from taskcoachlib import patterns
 import weakref
-from taskcoachlib.thirdparty._weakrefset import WeakSet
+from weakref import WeakSet
+
+
+noValues = frozenset()
 
 
 class Attribute(object):
@@ -44,6 +47,32 @@ class Attribute(object):
             return True
 
 
+class CompactAttribute(object):
+    """Attribute that is shared by all owners of a class. Each owner keeps
+    the values of its compact attributes in one list, its value table, so
+    owners don't need an Attribute instance per attribute. The attribute
+    only knows the index of its value in the value table and the name of
+    the owner method that sends the event when the value changes."""
+
+    __slots__ = ("__index", "__setEvent")
+
+    def __init__(self, index, setEvent):
+        super().__init__()
+        self.__index = index
+        self.__setEvent = setEvent
+
+    def get(self, values):
+        return values[self.__index]
+
+    @patterns.eventSource
+    def set(self, owner, values, value, event=None):
+        if value == values[self.__index]:
+            return False
+        values[self.__index] = value
+        getattr(owner, self.__setEvent)(event)
+        return True
+
+
 class SetAttribute(object):
     __slots__ = (
         "__set",
@@ -63,56 +92,85 @@ class SetAttribute(object):
         changeEvent=None,
         weak=False,
     ):
-        self.__setClass = WeakSet if weak else set
-        self.__set = self.__setClass(values) if values else self.__setClass()
+        self.__setClass = WeakSet if weak else frozenset
+        self.__set = self.__newSet(values)
         self.__owner = weakref.ref(owner)
         self.__addEvent = (addEvent or self.__nullEvent).__func__
         self.__removeEvent = (removeEvent or self.__nullEvent).__func__
-        self.__changeEvent = (changeEvent or self.__nullEvent).__func__
+        self.__changeEvent = changeEvent.__func__ if changeEvent else None
 
     def get(self):
-        return set(self.__set)
+        """Return the values as read-only set. Values that are not weakly
+        referenced are kept in a frozenset, which is returned as is."""
+        if self.__setClass is frozenset:
+            return self.__set
+        return frozenset(self.__set) if self.__set else noValues
 
     @patterns.eventSource
     def set(self, values, event=None):
         owner = self.__owner()
         if owner is not None:
-            if values == set(self.__set):
+            current = self.__set
+            added = set(value for value in values if value not in current)
+            removed = set(value for value in current if value not in values)
+            if not added and not removed:
                 return False
-            added = values - set(self.__set)
-            removed = set(self.__set) - values
-            self.__set = self.__setClass(values)
+            self.__update(added, removed)
             if added:
                 self.__addEvent(owner, event, *added)  # pylint: disable=W0142
             if removed:
                 self.__removeEvent(
                     owner, event, *removed
                 )  # pylint: disable=W0142
-            if added or removed:
-                self.__changeEvent(owner, event, *set(self.__set))
+            self.__sendChangeEvent(owner, event)
             return True
 
     @patterns.eventSource
     def add(self, values, event=None):
         owner = self.__owner()
         if owner is not None:
-            if values <= set(self.__set):
+            added = set(value for value in values if value not in self.__set)
+            if not added:
                 return False
-            self.__set = self.__setClass(set(self.__set) | values)
+            self.__update(added, ())
             self.__addEvent(owner, event, *values)  # pylint: disable=W0142
-            self.__changeEvent(owner, event, *set(self.__set))
+            self.__sendChangeEvent(owner, event)
             return True
 
     @patterns.eventSource
     def remove(self, values, event=None):
         owner = self.__owner()
         if owner is not None:
-            if values & set(self.__set) == set():
+            removed = set(value for value in values if value in self.__set)
+            if not removed:
                 return False
-            self.__set = self.__setClass(set(self.__set) - values)
+            self.__update((), removed)
             self.__removeEvent(owner, event, *values)  # pylint: disable=W0142
-            self.__changeEvent(owner, event, *set(self.__set))
+            self.__sendChangeEvent(owner, event)
             return True
 
+    def __update(self, added, removed):
+        # Frozensets may have been handed out by get(), so replace them. Weak
+        # sets are changed in place, to not create a weak reference for each
+        # value again:
+        if self.__setClass is frozenset or self.__set is noValues:
+            self.__set = self.__newSet(
+                self.__set.union(added).difference(removed)
+            )
+        else:
+            self.__set.difference_update(removed)
+            self.__set.update(added)
+            if not self.__set:
+                self.__set = noValues
+
+    def __newSet(self, values):
+        # Most sets are empty, so share one empty set between them:
+        return self.__setClass(values) if values else noValues
+
+    def __sendChangeEvent(self, owner, event):
+        # Don't pass all values when nobody is interested in them:
+        if self.__changeEvent:
+            self.__changeEvent(owner, event, *self.__set)
+
     def __nullEvent(self, *args, **kwargs):
         pass
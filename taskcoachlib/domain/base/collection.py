@@ -20,8 +20,40 @@ from taskcoachlib import patterns
 
 
 class Collection(patterns.CompositeSet):
+    def __init__(self, *args, **kwargs):
+        self.__objectsById = dict()  # {id: domain object}
+        super().__init__(*args, **kwargs)
+
+    @patterns.eventSource
+    def extend(self, domainObjects, event=None):
+        super().extend(domainObjects, event=event)
+        for domainObject in self._compositesAndAllChildren(domainObjects):
+            self.__objectsById[domainObject.id()] = domainObject
+
+    @patterns.eventSource
+    def removeItems(self, domainObjects, event=None):
+        super().removeItems(domainObjects, event=event)
+        for domainObject in self._compositesAndAllChildren(domainObjects):
+            if self.__objectsById.get(domainObject.id()) is domainObject:
+                del self.__objectsById[domainObject.id()]
+
+    @patterns.eventSource
+    def clear(self, event=None):
+        super().clear(event=event)
+        self.__objectsById.clear()
+
     def getObjectById(self, domainObjectId):
-        for domainObject in self:
-            if domainObjectId == domainObject.id():
-                return domainObject
-        raise IndexError
+        try:
+            return self.__objectsById[domainObjectId]
+        except KeyError:
+            raise IndexError(domainObjectId)
+
+    def getObjectsByIds(self, domainObjectIds):
+        """Return the objects in this collection that have one of the
+        given ids. Ids of objects not in this collection are ignored."""
+        objectsById = self.__objectsById
+        return [
+            objectsById[domainObjectId]
+            for domainObjectId in domainObjectIds
+            if domainObjectId in objectsById
+        ]
@@ -60,6 +60,50 @@ class Filter(patterns.SetDecorator):
             [item for item in filteredItems if item not in self], event=event
         )
 
+    @patterns.eventSource
+    def refreshItems(self, items, event=None):
+        """Incrementally update the filter for items whose filter outcome
+        may have changed. Only the items themselves (and their ancestors in
+        tree mode) are re-evaluated, so this is much cheaper than a reset.
+        Use reset() when the filter criteria themselves change."""
+        if self.isFrozen():
+            return
+
+        affectedItems = set(items)
+        if not affectedItems:
+            return
+        if self.treeMode():
+            for item in affectedItems.copy():
+                affectedItems.update(item.ancestors())
+        observable = self.observable()
+        candidates = set(item for item in affectedItems if item in observable)
+        includedItems = set(self.filterItems(list(candidates))) & candidates
+        if self.treeMode():
+            # Ancestors stay in the filter as long as one of their children
+            # does, so decide for the deepest items first:
+            for item in sorted(
+                candidates - includedItems,
+                key=lambda item: len(item.ancestors()),
+                reverse=True,
+            ):
+                if any(
+                    child in includedItems
+                    or (child not in affectedItems and child in self)
+                    for child in item.children()
+                ):
+                    includedItems.add(item)
+        self.removeItemsFromSelf(
+            [
+                item
+                for item in affectedItems
+                if item in self and item not in includedItems
+            ],
+            event=event,
+        )
+        self.extendSelf(
+            [item for item in includedItems if item not in self], event=event
+        )
+
     def filterItems(self, items):
         """filter returns the items that pass the filter."""
         raise NotImplementedError  # pragma: no cover
@@ -68,10 +112,10 @@ class Filter(patterns.SetDecorator):
         return [item for item in self if item.parent() is None]
 
     def onAddItem(self, event):
-        self.reset()
+        self.refreshItems(event.values())
 
     def onRemoveItem(self, event):
-        self.reset()
+        self.refreshItems(event.values())
 
 
 class SelectedItemsFilter(Filter):
@@ -99,7 +143,7 @@ class SelectedItemsFilter(Filter):
                     result.extend(item.children(recursive=True))
             return result
         else:
-            return [item for item in items if item not in self]
+            return items
 
     def itemOrAncestorInSelectedItems(self, item):
         if item in self.__selectedItems:
@@ -111,12 +155,27 @@ class SelectedItemsFilter(Filter):
 
 
 class SearchFilter(Filter):
+    """Filter items on their subject and, optionally, their description.
+
+    When created with searchIndex=True, the filter keeps an index of the
+    trigrams in the subject and description of its items. Plain search
+    strings are looked up in the index to find the candidate items before
+    the search predicate is applied to them, so searching doesn't need to
+    look at every item. The index is built when first needed and kept up
+    to date from subject and description change events."""
+
+    trigramLength = 3
+
     def __init__(self, *args, **kwargs):
         searchString = kwargs.pop("searchString", "")
         matchCase = kwargs.pop("matchCase", False)
         includeSubItems = kwargs.pop("includeSubItems", False)
         searchDescription = kwargs.pop("searchDescription", False)
         regularExpression = kwargs.pop("regularExpression", False)
+        self.__useIndex = kwargs.pop("searchIndex", False)
+        self.__index = None  # Maps trigrams to items, built when needed
+        self.__indexedText = dict()
+        self.__indexedEventTypes = set()
 
         self.setSearchFilter(
             searchString,
@@ -129,6 +188,12 @@ class SearchFilter(Filter):
 
         super().__init__(*args, **kwargs)
 
+    def detach(self):
+        patterns.Publisher().removeObserver(self.onItemTextChanged)
+        self.__indexedEventTypes.clear()
+        self.__clearIndex()
+        super().detach()
+
     def setSearchFilter(
         self,
         searchString,
@@ -145,6 +210,9 @@ class SearchFilter(Filter):
         self.__searchPredicate = self.__compileSearchPredicate(
             searchString, matchCase, regularExpression
         )
+        self.__searchTrigrams = self.__compileSearchTrigrams(
+            searchString, matchCase, regularExpression
+        )
         if doReset:
             self.reset()
 
@@ -168,38 +236,140 @@ class SearchFilter(Filter):
         else:
             return lambda x: x.lower().find(searchString.lower()) != -1
 
+    @classmethod
+    def __compileSearchTrigrams(
+        class_, searchString, matchCase, regularExpression
+    ):
+        """Return the trigrams that the text of matching items must contain,
+        or None if the search string can't be looked up in the index."""
+        if regularExpression or "\n" in searchString:
+            return None
+        if matchCase and not searchString.isascii():
+            return None  # Lower casing may change non-ASCII matches
+        trigrams = class_.__trigrams(searchString.lower())
+        return trigrams or None
+
+    @classmethod
+    def __trigrams(class_, text):
+        length = class_.trigramLength
+        return set(
+            text[index : index + length]
+            for index in range(len(text) - length + 1)
+        )
+
     def filterItems(self, items):
-        return (
-            [
-                item
-                for item in items
-                if self.__searchPredicate(self.__itemText(item))
-            ]
-            if self.__searchPredicate
-            else items
+        if not self.__searchPredicate:
+            return items
+        candidates = self.__candidates()
+        if candidates is not None:
+            if isinstance(items, set) and len(candidates) < len(items):
+                items = [item for item in candidates if item in items]
+            else:
+                items = [item for item in items if item in candidates]
+        return [
+            item
+            for item in items
+            if self.__searchPredicate(self.__itemText(item))
+        ]
+
+    def __candidates(self):
+        """Return the items that may match the search string according to
+        the index, or None if the index can't be used for this search."""
+        if (
+            not self.__useIndex
+            or self.__searchTrigrams is None
+            or self.__includeSubItems
+        ):
+            return None
+        if self.__index is None:
+            self.__buildIndex()
+        index = self.__index
+        itemSets = sorted(
+            [index.get(trigram, ()) for trigram in self.__searchTrigrams],
+            key=len,
         )
+        candidates = set(itemSets[0]).intersection(*itemSets[1:])
+        if self.treeMode():
+            for item in candidates.copy():
+                candidates.update(item.ancestors())
+        return candidates
+
+    def __buildIndex(self):
+        self.__index = dict()
+        for item in self.observable():
+            self.__indexItem(item)
+
+    def __clearIndex(self):
+        self.__index = None
+        self.__indexedText.clear()
+
+    def __indexItem(self, item):
+        text = item.subject() + "\n" + item.description()
+        self.__indexedText[item] = text
+        for trigram in self.__trigrams(text.lower()):
+            self.__index.setdefault(trigram, set()).add(item)
+        for eventType in (
+            item.subjectChangedEventType(),
+            item.descriptionChangedEventType(),
+        ):
+            if eventType not in self.__indexedEventTypes:
+                self.__indexedEventTypes.add(eventType)
+                patterns.Publisher().registerObserver(
+                    self.onItemTextChanged, eventType=eventType
+                )
+
+    def __unindexItem(self, item):
+        text = self.__indexedText.pop(item)
+        for trigram in self.__trigrams(text.lower()):
+            items = self.__index[trigram]
+            items.discard(item)
+            if not items:
+                del self.__index[trigram]
+
+    def onItemTextChanged(self, event):
+        if self.__index is None:
+            return
+        for item in event.sources():
+            if item in self.__indexedText:
+                self.__unindexItem(item)
+                self.__indexItem(item)
+
+    def onAddItem(self, event):
+        if self.__index is not None:
+            for item in event.values():
+                if item not in self.__indexedText:
+                    self.__indexItem(item)
+        super().onAddItem(event)
+
+    def onRemoveItem(self, event):
+        if self.__index is not None:
+            for item in event.values():
+                if item in self.__indexedText:
+                    self.__unindexItem(item)
+        super().onRemoveItem(event)
 
     def __itemText(self, item):
-        text = self.__itemOwnText(item)
+        texts = [self.__itemOwnText(item)]
         if self.__includeSubItems:
             parent = item.parent()
             while parent:
-                text += self.__itemOwnText(parent)
+                texts.append(self.__itemOwnText(parent))
                 parent = parent.parent()
         if self.treeMode():
-            text += " ".join(
+            texts.extend(
                 [
                     self.__itemOwnText(child)
                     for child in item.children(recursive=True)
                     if child in self.observable()
                 ]
             )
-        return text
+        # Separate the texts so that matches don't span several texts:
+        return "\n".join(texts)
 
     def __itemOwnText(self, item):
         text = item.subject()
         if self.__searchDescription:
-            text += item.description()
+            text += "\n" + item.description()
         return text
 
 
@@ -219,8 +389,8 @@ class DeletedFilter(Filter):
         patterns.Publisher().removeObserver(self.onObjectMarkedDeletedOrNot)
         super().detach()
 
-    def onObjectMarkedDeletedOrNot(self, event):  # pylint: disable=W0613
-        self.reset()
+    def onObjectMarkedDeletedOrNot(self, event):
+        self.refreshItems(event.sources())
 
     def filterItems(self, items):
         return [item for item in items if not item.isDeleted()]
@@ -21,7 +21,6 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 from taskcoachlib import patterns
 from taskcoachlib.domain.attribute import icon
 from taskcoachlib.domain.date import DateTime, Now
-from pubsub import pub
 from . import attribute
 import functools
 import sys
@@ -143,38 +142,32 @@ class Object(SynchronizedObject):
     else:
         _long_zero = 0
 
+    # The values of these attributes are kept in the value table of each
+    # object, see __init__:
+    __subject = attribute.CompactAttribute(0, "subjectChangedEvent")
+    __description = attribute.CompactAttribute(1, "descriptionChangedEvent")
+    __fgColor = attribute.CompactAttribute(2, "appearanceChangedEvent")
+    __bgColor = attribute.CompactAttribute(3, "appearanceChangedEvent")
+    __font = attribute.CompactAttribute(4, "appearanceChangedEvent")
+    __icon = attribute.CompactAttribute(5, "appearanceChangedEvent")
+    __selectedIcon = attribute.CompactAttribute(6, "appearanceChangedEvent")
+    __ordering = attribute.CompactAttribute(7, "orderingChangedEvent")
+
     def __init__(self, *args, **kwargs):
-        Attribute = attribute.Attribute
         self.__creationDateTime = kwargs.pop("creationDateTime", None) or Now()
         self.__modificationDateTime = kwargs.pop(
             "modificationDateTime", DateTime.min
         )
-        self.__subject = Attribute(
-            kwargs.pop("subject", ""), self, self.subjectChangedEvent
-        )
-        self.__description = Attribute(
-            kwargs.pop("description", ""), self, self.descriptionChangedEvent
-        )
-        self.__fgColor = Attribute(
-            kwargs.pop("fgColor", None), self, self.appearanceChangedEvent
-        )
-        self.__bgColor = Attribute(
-            kwargs.pop("bgColor", None), self, self.appearanceChangedEvent
-        )
-        self.__font = Attribute(
-            kwargs.pop("font", None), self, self.appearanceChangedEvent
-        )
-        self.__icon = Attribute(
-            kwargs.pop("icon", ""), self, self.appearanceChangedEvent
-        )
-        self.__selectedIcon = Attribute(
-            kwargs.pop("selectedIcon", ""), self, self.appearanceChangedEvent
-        )
-        self.__ordering = Attribute(
+        self.__values = [
+            kwargs.pop("subject", ""),
+            kwargs.pop("description", ""),
+            kwargs.pop("fgColor", None),
+            kwargs.pop("bgColor", None),
+            kwargs.pop("font", None),
+            kwargs.pop("icon", ""),
+            kwargs.pop("selectedIcon", ""),
             kwargs.pop("ordering", Object._long_zero),
-            self,
-            self.orderingChangedEvent,
-        )
+        ]
         self.__id = kwargs.pop("id", None) or str(uuid.uuid1())
         super().__init__(*args, **kwargs)
 
@@ -191,14 +184,14 @@ class Object(SynchronizedObject):
                 id=self.__id,
                 creationDateTime=self.__creationDateTime,
                 modificationDateTime=self.__modificationDateTime,
-                subject=self.__subject.get(),
-                description=self.__description.get(),
-                fgColor=self.__fgColor.get(),
-                bgColor=self.__bgColor.get(),
-                font=self.__font.get(),
-                icon=self.__icon.get(),
-                ordering=self.__ordering.get(),
-                selectedIcon=self.__selectedIcon.get(),
+                subject=self.__subject.get(self.__values),
+                description=self.__description.get(self.__values),
+                fgColor=self.__fgColor.get(self.__values),
+                bgColor=self.__bgColor.get(self.__values),
+                font=self.__font.get(self.__values),
+                icon=self.__icon.get(self.__values),
+                ordering=self.__ordering.get(self.__values),
+                selectedIcon=self.__selectedIcon.get(self.__values),
             )
         )
         return state
@@ -236,14 +229,14 @@ class Object(SynchronizedObject):
         # dict, because a copy should get a new id and a new creation date/time
         state.update(
             dict(
-                subject=self.__subject.get(),
-                description=self.__description.get(),
-                fgColor=self.__fgColor.get(),
-                bgColor=self.__bgColor.get(),
-                font=self.__font.get(),
-                icon=self.__icon.get(),
-                selectedIcon=self.__selectedIcon.get(),
-                ordering=self.__ordering.get(),
+                subject=self.__subject.get(self.__values),
+                description=self.__description.get(self.__values),
+                fgColor=self.__fgColor.get(self.__values),
+                bgColor=self.__bgColor.get(self.__values),
+                font=self.__font.get(self.__values),
+                icon=self.__icon.get(self.__values),
+                selectedIcon=self.__selectedIcon.get(self.__values),
+                ordering=self.__ordering.get(self.__values),
             )
         )
         return state
@@ -291,10 +284,10 @@ class Object(SynchronizedObject):
     # Subject:
 
     def subject(self):
-        return self.__subject.get()
+        return self.__subject.get(self.__values)
 
     def setSubject(self, subject, event=None):
-        self.__subject.set(subject, event=event)
+        self.__subject.set(self, self.__values, subject, event=event)
 
     def subjectChangedEvent(self, event):
         event.addSource(
@@ -321,10 +314,10 @@ class Object(SynchronizedObject):
     # Ordering:
 
     def ordering(self):
-        return self.__ordering.get()
+        return self.__ordering.get(self.__values)
 
     def setOrdering(self, ordering, event=None):
-        self.__ordering.set(ordering, event=event)
+        self.__ordering.set(self, self.__values, ordering, event=event)
 
     def orderingChangedEvent(self, event):
         event.addSource(
@@ -346,10 +339,10 @@ class Object(SynchronizedObject):
     # Description:
 
     def description(self):
-        return self.__description.get()
+        return self.__description.get(self.__values)
 
     def setDescription(self, description, event=None):
-        self.__description.set(description, event=event)
+        self.__description.set(self, self.__values, description, event=event)
 
     def descriptionChangedEvent(self, event):
         event.addSource(
@@ -376,22 +369,22 @@ class Object(SynchronizedObject):
     # Color:
 
     def setForegroundColor(self, color, event=None):
-        self.__fgColor.set(color, event=event)
+        self.__fgColor.set(self, self.__values, color, event=event)
 
     def foregroundColor(self, recursive=False):  # pylint: disable=W0613
         # The 'recursive' argument isn't actually used here, but some
         # code assumes composite objects where there aren't. This is
         # the simplest workaround.
-        return self.__fgColor.get()
+        return self.__fgColor.get(self.__values)
 
     def setBackgroundColor(self, color, event=None):
-        self.__bgColor.set(color, event=event)
+        self.__bgColor.set(self, self.__values, color, event=event)
 
     def backgroundColor(self, recursive=False):  # pylint: disable=W0613
         # The 'recursive' argument isn't actually used here, but some
         # code assumes composite objects where there aren't. This is
         # the simplest workaround.
-        return self.__bgColor.get()
+        return self.__bgColor.get(self.__values)
 
     # Font:
 
@@ -399,24 +392,24 @@ class Object(SynchronizedObject):
         # The 'recursive' argument isn't actually used here, but some
         # code assumes composite objects where there aren't. This is
         # the simplest workaround.
-        return self.__font.get()
+        return self.__font.get(self.__values)
 
     def setFont(self, font, event=None):
-        self.__font.set(font, event=event)
+        self.__font.set(self, self.__values, font, event=event)
 
     # Icons:
 
     def icon(self):
-        return self.__icon.get()
+        return self.__icon.get(self.__values)
 
     def setIcon(self, icon, event=None):
-        self.__icon.set(icon, event=event)
+        self.__icon.set(self, self.__values, icon, event=event)
 
     def selectedIcon(self):
-        return self.__selectedIcon.get()
+        return self.__selectedIcon.get(self.__values)
 
     def setSelectedIcon(self, selectedIcon, event=None):
-        self.__selectedIcon.set(selectedIcon, event=event)
+        self.__selectedIcon.set(self, self.__values, selectedIcon, event=event)
 
     # Event types:
 
@@ -443,7 +436,12 @@ class Object(SynchronizedObject):
 
 class CompositeObject(Object, patterns.ObservableComposite):
     def __init__(self, *args, **kwargs):
-        self.__expandedContexts = set(kwargs.pop("expandedContexts", []))
+        # Most composite objects are never expanded, so they share one empty
+        # set of expanded contexts:
+        self.__expandedContexts = (
+            frozenset(kwargs.pop("expandedContexts", []))
+            or attribute.noValues
+        )
         super().__init__(*args, **kwargs)
 
     def __getcopystate__(self):
@@ -509,11 +507,13 @@ class CompositeObject(Object, patterns.ObservableComposite):
         if expand == self.isExpanded(context):
             return
         if expand:
-            self.__expandedContexts.add(context)
+            self.__expandedContexts = self.__expandedContexts | {context}
         else:
-            self.__expandedContexts.discard(context)
+            self.__expandedContexts = (
+                self.__expandedContexts - {context} or attribute.noValues
+            )
         if notify:
-            pub.sendMessage(
+            patterns.sendMessage(
                 self.expansionChangedEventType(), newValue=expand, sender=self
             )
 
@@ -16,16 +16,43 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
+import bisect
 from taskcoachlib import patterns
 from pubsub import pub
 
 
+class Descending(object):
+    """Wrap a sort key so that it sorts in reverse order. This allows for
+    combining ascending and descending sort keys into one tuple key."""
+
+    __slots__ = ("key",)
+
+    def __init__(self, key):
+        self.key = key
+
+    def __eq__(self, other):
+        return self.key == other.key
+
+    def __ne__(self, other):
+        return self.key != other.key
+
+    def __lt__(self, other):
+        return other.key < self.key
+
+    def __gt__(self, other):
+        return self.key < other.key
+
+
 class Sorter(patterns.ListDecorator):
     """This class decorates a list and sorts its contents."""
 
     def __init__(self, *args, **kwargs):
         self._sortKeys = kwargs.pop("sortBy", ["subject"])
         self._sortCaseSensitive = kwargs.pop("sortCaseSensitive", True)
+        # Cached composite sort keys, {item: key}. Rebuilt on reset, updated
+        # per item when attributes of items change:
+        self.__sortKeyCache = {}
+        self.__compositeSortKey = None
         super().__init__(*args, **kwargs)
         for sortKey in self._sortKeys:
             self._registerObserverForAttribute(sortKey.lstrip("-"))
@@ -48,7 +75,16 @@ class Sorter(patterns.ListDecorator):
     @patterns.eventSource
     def extendSelf(self, items, event=None):
         super().extendSelf(items, event)
-        self.reset()
+        if self.__compositeSortKey is None:
+            self.reset()
+        else:
+            self.__resort(set(items))
+
+    @patterns.eventSource
+    def removeItemsFromSelf(self, items, event=None):
+        for item in items:
+            self.__sortKeyCache.pop(item, None)
+        return super().removeItemsFromSelf(items, event=event)
 
     def isAscending(self):
         if self._sortKeys:
@@ -58,10 +94,6 @@ class Sorter(patterns.ListDecorator):
     def sortKeys(self):
         return self._sortKeys
 
-    # We don't implement removeItemsFromSelf() because there is no need
-    # to resort when items are removed since after removing items the
-    # remaining items are still in the right order.
-
     def sortBy(self, sortKey):
         if self._sortKeys and self._sortKeys[0] == sortKey:
             if sortKey == "ordering":
@@ -99,15 +131,100 @@ class Sorter(patterns.ListDecorator):
             return
 
         oldSelf = self[:]
-        # XXXTODO: create only one function with all keys ? Reversing may
-        # be problematic.
-        for sortKey in reversed(self._sortKeys):
-            self.sort(
-                key=self.createSortKeyFunction(sortKey.lstrip("-")),
-                reverse=sortKey.startswith("-"),
-            )
+        self.__compositeSortKey = self.__createCompositeSortKeyFunction()
+        self.__sortKeyCache = dict(
+            (item, self.__compositeSortKey(item)) for item in self
+        )
+        self.sort(key=self.__sortKeyCache.__getitem__)
         if forceEvent or self != oldSelf:
-            pub.sendMessage(self.sortEventType(), sender=self)
+            patterns.sendMessage(self.sortEventType(), sender=self)
+
+    def resortItems(self, items):
+        """Move the items whose sort keys may have changed to their new
+        position, without re-sorting the whole list. Observers are only
+        notified if the order of the list actually changes."""
+        if self.isFrozen():
+            return
+        if self.__compositeSortKey is None:
+            self.reset()
+            return
+        changedItems = set()
+        for item in self._itemsAffectedBy(items):
+            if item in self.__sortKeyCache:
+                changedItems.add(item)
+            elif not isinstance(item, self.DomainObjectClass):
+                # The sort keys of our items may depend on this item, so
+                # we can't tell which items to move:
+                self.reset()
+                return
+        self.__resort(changedItems)
+
+    def __resort(self, changedItems):
+        if self.isFrozen() or not changedItems:
+            return
+        for item in changedItems:
+            self.__sortKeyCache[item] = self.__compositeSortKey(item)
+        if self.__isSorted(changedItems):
+            return
+        if len(changedItems) > len(self) // 8:
+            self.sort(key=self.__sortKeyCache.__getitem__)
+        else:
+            self.__moveItems(changedItems)
+        patterns.sendMessage(self.sortEventType(), sender=self)
+
+    def _itemsAffectedBy(self, items):
+        """Return the items whose sort key may change when the given items
+        change."""
+        return set(items)
+
+    def __isSorted(self, changedItems):
+        """Return whether the list is still sorted, given that only the sort
+        keys of the changed items have changed. We only need to compare the
+        changed items with their neighbours."""
+        sortKey = self.__sortKeyCache.__getitem__
+        lastIndex = len(self) - 1
+        for index, item in enumerate(self):
+            if item not in changedItems:
+                continue
+            key = sortKey(item)
+            if index > 0 and key < sortKey(self[index - 1]):
+                return False
+            if index < lastIndex and sortKey(self[index + 1]) < key:
+                return False
+        return True
+
+    def __moveItems(self, changedItems):
+        sortKey = self.__sortKeyCache.__getitem__
+        itemsToMove = [item for item in self if item in changedItems]
+        remainingItems = [item for item in self if item not in changedItems]
+        remainingKeys = [sortKey(item) for item in remainingItems]
+        for item in itemsToMove:
+            key = sortKey(item)
+            index = bisect.bisect_right(remainingKeys, key)
+            remainingKeys.insert(index, key)
+            remainingItems.insert(index, item)
+        self[:] = remainingItems
+
+    def __createCompositeSortKeyFunction(self):
+        """Combine the sort key functions of all sort keys into one function
+        that returns a tuple, so that sorting takes only one pass."""
+        sortKeyFunctions = [
+            (
+                self.createSortKeyFunction(sortKey.lstrip("-")),
+                sortKey.startswith("-"),
+            )
+            for sortKey in self._sortKeys
+        ]
+
+        def compositeSortKey(item):
+            return tuple(
+                Descending(sortKeyFunction(item))
+                if descending
+                else sortKeyFunction(item)
+                for sortKeyFunction, descending in sortKeyFunctions
+            )
+
+        return compositeSortKey
 
     def createSortKeyFunction(self, sortKey):
         """createSortKeyFunction returns a function that is passed to the
@@ -144,10 +261,10 @@ class Sorter(patterns.ListDecorator):
                 )
 
     def onAttributeChanged(self, newValue, sender):  # pylint: disable=W0613
-        self.reset()
+        self.resortItems([sender])
 
-    def onAttributeChanged_Deprecated(self, event):  # pylint: disable=W0613
-        self.reset()
+    def onAttributeChanged_Deprecated(self, event):
+        self.resortItems(event.sources())
 
     def _getSortEventTypes(self, attribute):
         try:
@@ -180,6 +297,23 @@ class TreeSorter(Sorter):
         self.__invalidateRootItemCache()
         return super().reset(*args, **kwargs)
 
+    def resortItems(self, items):
+        self.__invalidateRootItemCache()
+        return super().resortItems(items)
+
+    def _itemsAffectedBy(self, items):
+        """In tree mode, sort keys of items may be computed recursively, so
+        changes may affect ancestors and children too."""
+        affectedItems = super()._itemsAffectedBy(items)
+        if self.treeMode():
+            for item in affectedItems.copy():
+                try:
+                    affectedItems.update(item.ancestors())
+                    affectedItems.update(item.children(recursive=True))
+                except AttributeError:
+                    pass
+        return affectedItems
+
     @patterns.eventSource
     def extendSelf(self, items, event=None):
         self.__invalidateRootItemCache()
@@ -51,12 +51,17 @@ class CategorizableCompositeObject(base.CompositeObject):
         return state
 
     def categories(self, recursive=False, upwards=False):
+        """Return the categories as read-only set."""
         result = self.__categories.get()
         if recursive and upwards and self.parent() is not None:
             result |= self.parent().categories(recursive=True, upwards=True)
         elif recursive and not upwards:
-            for child in self.children(recursive=True):
-                result |= child.categories()
+            result = result.union(
+                *[
+                    child.categories()
+                    for child in self.children(recursive=True)
+                ]
+            )
         return result
 
     @classmethod
@@ -133,10 +133,12 @@ class Category(
             eachCategorizable.categorySubjectChangedEvent(event, subject)
 
     def categorizables(self, recursive=False):
+        """Return the categorizables as read-only set."""
         result = self.__categorizables.get()
         if recursive:
-            for child in self.children():
-                result |= child.categorizables(recursive)
+            result = result.union(
+                *[child.categorizables(recursive) for child in self.children()]
+            )
         return result
 
     def addCategorizable(self, *categorizables, **kwargs):
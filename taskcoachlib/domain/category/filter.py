@@ -28,6 +28,9 @@ class CategoryFilter(base.Filter):
         self.__filterOnlyWhenAllCategoriesMatch = kwargs.pop(
             "filterOnlyWhenAllCategoriesMatch", False
         )
+        # Index of the categorizables that belong to a category, including
+        # the categorizables of its subcategories and their children:
+        self.__index = dict()  # {category: set of categorizables}
         for eventType in (
             self.__categories.addItemEventType(),
             self.__categories.removeItemEventType(),
@@ -37,14 +40,16 @@ class CategoryFilter(base.Filter):
                 eventType=eventType,
                 eventSource=self.__categories,
             )
-        eventTypes = (
+        patterns.Publisher().registerObserver(
+            self.onCategoryFilterChanged,
+            eventType=Category.filterChangedEventType(),
+        )
+        for eventType in (
             Category.categorizableAddedEventType(),
             Category.categorizableRemovedEventType(),
-            Category.filterChangedEventType(),
-        )
-        for eventType in eventTypes:
+        ):
             patterns.Publisher().registerObserver(
-                self.onCategoryChanged, eventType=eventType
+                self.onCategorizablesChanged, eventType=eventType
             )
         pub.subscribe(
             self.onFilterMatchingChanged,
@@ -55,38 +60,104 @@ class CategoryFilter(base.Filter):
     def detach(self):
         super().detach()
         self.removeObserver(self.onCategoryChanged)
+        self.removeObserver(self.onCategoryFilterChanged)
+        self.removeObserver(self.onCategorizablesChanged)
 
     def filterItems(self, categorizables):
         filteredCategories = self.__categories.filteredCategories()
         if not filteredCategories:
             return categorizables
-
+        indexed = [
+            self.__categorizablesBelongingToCategory(category)
+            for category in filteredCategories
+        ]
         if self.__filterOnlyWhenAllCategoriesMatch:
-            filteredCategorizables = set(categorizables)
-            for category in filteredCategories:
-                filteredCategorizables &= (
-                    self.__categorizablesBelongingToCategory(category)
-                )
+            match = all
+            nrCandidates = min(len(each) for each in indexed)
         else:
-            filteredCategorizables = set()
-            for category in filteredCategories:
-                filteredCategorizables |= (
-                    self.__categorizablesBelongingToCategory(category)
-                )
-
-        filteredCategorizables &= self.observable()
-        return filteredCategorizables
+            match = any
+            nrCandidates = sum(len(each) for each in indexed)
+        if isinstance(categorizables, set) and nrCandidates < len(
+            categorizables
+        ):
+            # Look up the categorizables in the index instead of checking
+            # all categorizables:
+            if match is all:
+                candidates = min(indexed, key=len)
+            else:
+                candidates = set().union(*indexed)
+            return [
+                categorizable
+                for categorizable in candidates
+                if categorizable in categorizables
+                and match(categorizable in each for each in indexed)
+            ]
+        return [
+            categorizable
+            for categorizable in categorizables
+            if match(categorizable in each for each in indexed)
+        ]
 
-    @staticmethod
-    def __categorizablesBelongingToCategory(category):
-        categorizables = category.categorizables(recursive=True)
-        for categorizable in categorizables.copy():
-            categorizables |= set(categorizable.children(recursive=True))
-        return categorizables
+    def __categorizablesBelongingToCategory(self, category):
+        try:
+            return self.__index[category]
+        except KeyError:
+            categorizables = category.categorizables(recursive=True)
+            result = self.__index[category] = set(categorizables)
+            for categorizable in categorizables:
+                result.update(categorizable.children(recursive=True))
+            return result
 
     def onFilterMatchingChanged(self, value):
         self.__filterOnlyWhenAllCategoriesMatch = value
         self.reset()
 
     def onCategoryChanged(self, event):  # pylint: disable=W0613
+        self.__index.clear()
+        self.reset()
+
+    def onCategoryFilterChanged(self, event):  # pylint: disable=W0613
         self.reset()
+
+    def onAddItem(self, event):
+        # Categorizables may have been added to categorized parents:
+        self.__index.clear()
+        super().onAddItem(event)
+
+    def onRemoveItem(self, event):
+        self.__index.clear()
+        super().onRemoveItem(event)
+
+    def onCategorizablesChanged(self, event):
+        """Categorizables were added to or removed from a category. Only
+        those categorizables and their children can change filter outcome,
+        and only if the category is filtered (directly or via a parent)."""
+        categorizables = set()
+        for eventType in event.types():
+            for category in event.sources(eventType):
+                changed = set()
+                for categorizable in event.values(category, type=eventType):
+                    changed.add(categorizable)
+                    changed.update(categorizable.children(recursive=True))
+                self.__updateIndex(
+                    category,
+                    changed,
+                    eventType == Category.categorizableAddedEventType(),
+                )
+                if any(
+                    ancestor.isFiltered()
+                    for ancestor in [category] + category.ancestors()
+                ):
+                    categorizables |= changed
+        self.refreshItems(categorizables)
+
+    def __updateIndex(self, category, categorizables, added):
+        for eachCategory in [category] + category.ancestors():
+            if eachCategory not in self.__index:
+                continue
+            if added:
+                self.__index[eachCategory] |= categorizables
+            else:
+                # The categorizables may still belong to the category via
+                # another subcategory or parent, so rebuild when needed:
+                del self.__index[eachCategory]
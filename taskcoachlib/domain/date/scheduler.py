@@ -18,9 +18,10 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from taskcoachlib import patterns
 from . import dateandtime, timedelta
-import logging
+import contextlib
+import heapq
+import itertools
 import weakref
-import bisect
 
 
 class ScheduledMethod(object):
@@ -28,6 +29,9 @@ class ScheduledMethod(object):
         self.__func = method.__func__
         self.__self = weakref.ref(method.__self__)
         self.__id = None
+        # The id can be set after the job has been scheduled, so it is not
+        # part of the hash value:
+        self.__hash_value = hash((self.__func, id(method.__self__)))
 
     def setId(self, id_):
         self.__id = id_
@@ -45,7 +49,7 @@ class ScheduledMethod(object):
         return lvalue < rvalue
 
     def __hash__(self):
-        return hash((self.__dict__["_ScheduledMethod__func"], self.__id))
+        return self.__hash_value
 
     def __call__(self, *args, **kwargs):
         obj = self.__self()
@@ -59,19 +63,39 @@ class TwistedScheduler(object):
     """
     A class to schedule jobs at specified date/time. Unlike apscheduler, this
     uses Twisted instead of threading, in order to avoid busy waits.
+
+    Jobs are kept in a heap of [dateTime, sequence number, job, interval]
+    entries. An index maps each job to its entries, so that looking up and
+    unscheduling a job does not need to scan the heap. Unscheduled entries
+    stay in the heap with their job set to None until they are popped or
+    the heap is compacted.
     """
 
     def __init__(self):
         super().__init__()
-        self.__jobs = []
+        self.__heap = []
+        self.__entries = dict()  # {job: [entry, ...]}
+        self.__nrScheduled = 0
+        self.__sequenceNumbers = itertools.count()
+        self.__deferredEntries = None
         self.__nextCall = None
         self.__firing = False
 
     def __schedule(self, job, dateTime, interval):
+        entry = [dateTime, next(self.__sequenceNumbers), job, interval]
+        self.__entries.setdefault(job, []).append(entry)
+        self.__nrScheduled += 1
+        if self.__deferredEntries is not None:
+            self.__deferredEntries.append(entry)
+            return
+        heapq.heappush(self.__heap, entry)
+        if self.__heap[0] is entry or self.__nextCall is None:
+            self.__restart()
+
+    def __restart(self):
         if self.__nextCall is not None:
             self.__nextCall.cancel()
             self.__nextCall = None
-        bisect.insort_right(self.__jobs, (dateTime, job, interval))
         if not self.__firing:
             self.__fire()
 
@@ -87,32 +111,84 @@ class TwistedScheduler(object):
             job, startDateTime or dateandtime.Now() + interval, interval
         )
 
+    def scheduleMany(self, jobsAndDateTimes):
+        """Schedule each job to be called at its date/time. The heap is
+        built and the timer is started only once for all jobs."""
+        with self.deferred():
+            for job, dateTime in jobsAndDateTimes:
+                self.__schedule(job, dateTime, None)
+
+    @contextlib.contextmanager
+    def deferred(self):
+        """Collect the jobs scheduled within this context and add them to
+        the heap at once when the context is left. The jobs count as
+        scheduled right away, so they can be unscheduled in the mean
+        time."""
+        if self.__deferredEntries is not None:
+            yield  # Nested, the outermost context adds the jobs
+            return
+        self.__deferredEntries = []
+        try:
+            yield
+        finally:
+            entries = [
+                entry
+                for entry in self.__deferredEntries
+                if entry[2] is not None
+            ]
+            self.__deferredEntries = None
+            if entries:
+                self.__heap.extend(entries)
+                heapq.heapify(self.__heap)
+                self.__restart()
+
     def unschedule(self, theJob):
-        for idx, (ts, job, interval) in enumerate(self.__jobs):
-            if job == theJob:
-                del self.__jobs[idx]
-                break
+        entries = self.__entries.get(theJob)
+        if not entries:
+            return
+        entry = min(entries)
+        self.__removeEntry(theJob, entry)
+        entry[2] = None
+        if len(self.__heap) > 2 * self.__nrScheduled + 100:
+            # Too many unscheduled entries, compact the heap
+            self.__heap = [
+                entry for entry in self.__heap if entry[2] is not None
+            ]
+            heapq.heapify(self.__heap)
+
+    def __removeEntry(self, job, entry):
+        entries = self.__entries[job]
+        entries.remove(entry)
+        if not entries:
+            del self.__entries[job]
+        self.__nrScheduled -= 1
 
     def isScheduled(self, theJob):
-        for ts, job, interval in self.__jobs:
-            if job == theJob:
-                return True
-        return False
+        return theJob in self.__entries
 
     def shutdown(self):
         if self.__nextCall is not None:
             self.__nextCall.cancel()
             self.__nextCall = None
-        self.__jobs = []
+        self.__heap = []
+        self.__entries = dict()
+        self.__nrScheduled = 0
 
     def jobs(self):
-        return [job for ts, job, interval in self.__jobs]
+        entries = sorted(
+            entry for entries in self.__entries.values() for entry in entries
+        )
+        return [job for ts, sequenceNumber, job, interval in entries]
 
     def __fire(self):
         self.__firing = True
         try:
-            while self.__jobs and self.__jobs[0][0] <= dateandtime.Now():
-                ts, job, interval = self.__jobs.pop(0)
+            while self.__heap and self.__heap[0][0] <= dateandtime.Now():
+                entry = heapq.heappop(self.__heap)
+                ts, sequenceNumber, job, interval = entry
+                if job is None:
+                    continue  # Unscheduled
+                self.__removeEntry(job, entry)
                 try:
                     job()
                 except:
@@ -125,8 +201,10 @@ class TwistedScheduler(object):
         finally:
             self.__firing = False
 
-        if self.__jobs and self.__nextCall is None:
-            dt = self.__jobs[0][0] - dateandtime.Now()
+        while self.__heap and self.__heap[0][2] is None:
+            heapq.heappop(self.__heap)
+        if self.__heap and self.__nextCall is None:
+            dt = self.__heap[0][0] - dateandtime.Now()
             nextDuration = int(
                 (dt.microseconds + (dt.seconds + dt.days * 24 * 3600) * 10**6)
                 / 10**3
@@ -170,6 +248,11 @@ class Scheduler(object, metaclass=patterns.Singleton):
             )
             return job
 
+    def deferred(self):
+        """Return a context manager that collects the jobs scheduled within
+        it and schedules them at once, see TwistedScheduler.deferred()."""
+        return self.__scheduler.deferred()
+
     def unschedule(self, function):
         job = (
             function
@@ -17,7 +17,7 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
-from pubsub import pub
+from taskcoachlib import patterns
 import weakref
 
 
@@ -72,7 +72,7 @@ class BaseEffort(object):
         return "pubsub.effort.track"
 
     def sendDurationChangedMessage(self):
-        pub.sendMessage(
+        patterns.sendMessage(
             self.durationChangedEventType(),
             newValue=self.duration(),
             sender=self,
@@ -83,7 +83,7 @@ class BaseEffort(object):
         return "pubsub.effort.duration"
 
     def sendRevenueChangedMessage(self):
-        pub.sendMessage(
+        patterns.sendMessage(
             self.revenueChangedEventType(),
             newValue=self.revenue(),
             sender=self,
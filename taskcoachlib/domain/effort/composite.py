@@ -17,10 +17,9 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
-from taskcoachlib import render
+from taskcoachlib import patterns, render
 from taskcoachlib.domain import date
 from taskcoachlib.i18n import _
-from pubsub import pub
 from . import base
 
 
@@ -109,7 +108,7 @@ class BaseCompositeEffort(base.BaseEffort):  # pylint: disable=W0223
         if self._getEfforts():
             self.sendDurationChangedMessage()
         else:
-            pub.sendMessage(self.compositeEmptyEventType(), sender=self)
+            patterns.sendMessage(self.compositeEmptyEventType(), sender=self)
 
     @classmethod
     def compositeEmptyEventType(class_):
@@ -249,8 +248,15 @@ class CompositeEffortPerPeriod(BaseCompositeEffort):
 
     total = Total()
 
-    def __init__(self, start, stop, taskList, initialEffort=None):
+    def __init__(
+        self, start, stop, taskList, initialEffort=None, effortStore=None
+    ):
+        """If an effortStore is passed, the composite gets the efforts in
+        its period from the store instead of from the tasks in the task
+        list. The store is expected to have an efforts(start, stop) method
+        that returns (at least) the efforts in the period."""
         self.taskList = taskList
+        self.__effortStore = effortStore
         super().__init__(None, start, stop)
         if initialEffort:
             assert self._inPeriod(initialEffort)
@@ -307,8 +313,11 @@ class CompositeEffortPerPeriod(BaseCompositeEffort):
             [] if self.__effort_cache is None else self.__effort_cache[:]
         )
         self.__effort_cache = []
-        self.__add_task_effort_to_cache(self.taskList)
-        return previous_cache != self.__effort_cache
+        if self.__effortStore is None:
+            self.__add_task_effort_to_cache(self.taskList)
+        else:
+            self.__add_stored_effort_to_cache()
+        return set(previous_cache) != set(self.__effort_cache)
 
     def __add_task_effort_to_cache(self, tasks):
         """Add the effort of the tasks to the cache."""
@@ -317,3 +326,20 @@ class CompositeEffortPerPeriod(BaseCompositeEffort):
                 effort for effort in task.efforts() if self._inPeriod(effort)
             ]
             self.__effort_cache.extend(effort_in_period)
+
+    def __add_stored_effort_to_cache(self):
+        """Add the efforts in the store that belong to tasks in the task
+        list to the cache."""
+        taskList = self.taskList
+        self.__effort_cache.extend(
+            sorted(
+                [
+                    effort
+                    for effort in self.__effortStore.efforts(
+                        self.getStart(), self.getStop()
+                    )
+                    if self._inPeriod(effort) and effort.task() in taskList
+                ],
+                key=lambda effort: effort.getStart(),
+            )
+        )
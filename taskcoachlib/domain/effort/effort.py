@@ -19,7 +19,6 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from taskcoachlib import patterns
 from taskcoachlib.domain import date, base, task
-from pubsub import pub
 from . import base as baseeffort
 import weakref
 
@@ -49,7 +48,7 @@ class Effort(baseeffort.BaseEffort, base.Object):
         self._task = weakref.ref(task)
         self._task().addEffort(self)
         event.send()
-        pub.sendMessage(
+        patterns.sendMessage(
             self.taskChangedEventType(), newValue=task, sender=self
         )
 
@@ -104,7 +103,8 @@ class Effort(baseeffort.BaseEffort, base.Object):
             return
         self._start = startDateTime
         self.__updateDurationCache()
-        pub.sendMessage(
+        self.task().invalidateAggregates()
+        patterns.sendMessage(
             self.startChangedEventType(), newValue=startDateTime, sender=self
         )
         self.task().sendTimeSpentChangedMessage()
@@ -126,18 +126,19 @@ class Effort(baseeffort.BaseEffort, base.Object):
         previousStop = self._stop
         self._stop = newStop
         self.__updateDurationCache()
+        self.task().invalidateAggregates()
         if newStop == None:
-            pub.sendMessage(
+            patterns.sendMessage(
                 self.trackingChangedEventType(), newValue=True, sender=self
             )
             self.task().sendTrackingChangedMessage(tracking=True)
         elif previousStop == None:
-            pub.sendMessage(
+            patterns.sendMessage(
                 self.trackingChangedEventType(), newValue=False, sender=self
             )
             self.task().sendTrackingChangedMessage(tracking=False)
         self.task().sendTimeSpentChangedMessage()
-        pub.sendMessage(
+        patterns.sendMessage(
             self.stopChangedEventType(), newValue=self._stop, sender=self
         )
         self.sendDurationChangedMessage()
@@ -63,7 +63,7 @@ class EffortList(
         super().extendSelf(effortsToAdd, event)
         for effort in effortsToAdd:
             if effort.getStop() is None:
-                pub.sendMessage(
+                patterns.sendMessage(
                     effort.trackingChangedEventType(),
                     newValue=True,
                     sender=effort,
@@ -81,7 +81,7 @@ class EffortList(
             effortsToRemove.extend(task.efforts())
         for effort in effortsToRemove:
             if effort.getStop() is None:
-                pub.sendMessage(
+                patterns.sendMessage(
                     effort.trackingChangedEventType(),
                     newValue=False,
                     sender=effort,
@@ -102,7 +102,7 @@ class EffortList(
         super().removeItemsFromSelf(effortsToRemove)
         for effort in effortsToAdd + effortsToRemove:
             if effort.getStop() is None:
-                pub.sendMessage(
+                patterns.sendMessage(
                     effort.trackingChangedEventType(),
                     newValue=effort in effortsToAdd,
                     sender=effort,
@@ -24,6 +24,56 @@ from . import effortlist
 from . import effort
 
 
+class EffortStore(object):
+    """Efforts bucketed by the aggregation period their start falls in, so
+    that the efforts in a period can be found without looking at all
+    efforts. The keyForPeriod callable returns the (start, stop) of the
+    period of an effort."""
+
+    def __init__(self, keyForPeriod):
+        self.__keyForPeriod = keyForPeriod
+        self.__buckets = {}  # (start, stop) -> ((start, stop), efforts)
+        self.__keyOfEffort = {}
+
+    def add(self, anEffort, key=None):
+        """Add the effort, or move it to the bucket of its period if its
+        start changed since it was added. Pass the key of the period if it
+        is known already."""
+        key = key or self.__keyForPeriod(anEffort)
+        previousKey = self.__keyOfEffort.get(anEffort)
+        if key == previousKey:
+            return
+        if previousKey is not None:
+            self.remove(anEffort)
+        if key not in self.__buckets:
+            self.__buckets[key] = (key, set())
+        # Share the key between the efforts in the bucket to save memory:
+        key, bucket = self.__buckets[key]
+        bucket.add(anEffort)
+        self.__keyOfEffort[anEffort] = key
+
+    def remove(self, anEffort):
+        key = self.__keyOfEffort.pop(anEffort, None)
+        if key is None:
+            return
+        bucket = self.__buckets[key][1]
+        bucket.discard(anEffort)
+        if not bucket:
+            del self.__buckets[key]
+
+    def period(self, anEffort):
+        """Return the period the effort was added to, or None if the store
+        does not contain the effort."""
+        return self.__keyOfEffort.get(anEffort)
+
+    def efforts(self, start, stop):
+        """Return the efforts that started in the period."""
+        return self.__buckets.get((start, stop), (None, ()))[1]
+
+    def __len__(self):
+        return len(self.__keyOfEffort)
+
+
 class EffortAggregator(
     patterns.SetDecorator, effortlist.EffortUICommandNamesMixin
 ):
@@ -35,6 +85,8 @@ class EffortAggregator(
 
     def __init__(self, *args, **kwargs):
         self.__composites = {}
+        # Index to quickly find the composites affected by task changes:
+        self.__compositesForTask = {}
         self.__trackedComposites = set()
         aggregation = kwargs.pop("aggregation")
         assert aggregation in ("day", "week", "month")
@@ -43,6 +95,7 @@ class EffortAggregator(
             date.DateTime, "startOf%s" % aggregation
         )
         self.__end_of_period = getattr(date.DateTime, "endOf%s" % aggregation)
+        self.__effortStore = EffortStore(self.__key_for_period)
         super().__init__(*args, **kwargs)
         pub.subscribe(
             self.onCompositeEmpty,
@@ -105,7 +158,7 @@ class EffortAggregator(
         for new_composite in new_composites:
             if new_composite.isBeingTracked():
                 self.__trackedComposites.add(new_composite)
-                pub.sendMessage(
+                patterns.sendMessage(
                     effort.Effort.trackingChangedEventType(),
                     newValue=True,
                     sender=new_composite,
@@ -121,12 +174,22 @@ class EffortAggregator(
         composites_to_remove = []
         for task in tasks:  # pylint: disable=W0621
             composites_to_remove.extend(self.__composites_to_remove(task))
+            for each_effort in task.efforts():
+                self.__effortStore.remove(each_effort)
         self.__remove_composites_from_self(composites_to_remove, event=event)
 
     @patterns.eventSource
     def __remove_composites_from_self(self, composites_to_remove, event=None):
         """Remove composites from the aggregator."""
         self.__trackedComposites.difference_update(set(composites_to_remove))
+        for composite_to_remove in composites_to_remove:
+            if composite_to_remove.isTotal():
+                continue
+            each_task = composite_to_remove.task()
+            composites = self.__compositesForTask.get(each_task, set())
+            composites.discard(composite_to_remove)
+            if not composites:
+                self.__compositesForTask.pop(each_task, None)
         super().removeItemsFromSelf(composites_to_remove, event=event)
 
     def onTaskRemoved(self, event):
@@ -144,12 +207,15 @@ class EffortAggregator(
             return
         new_composites = []
         newValue, oldValue = newValue
+        new_efforts, old_efforts = set(newValue), set(oldValue)
         efforts_added = [
-            effort for effort in newValue if effort not in oldValue
+            effort for effort in newValue if effort not in old_efforts
         ]
         efforts_removed = [
-            effort for effort in oldValue if effort not in newValue
+            effort for effort in oldValue if effort not in new_efforts
         ]
+        for each_effort in efforts_removed:
+            self.__effortStore.remove(each_effort)
         new_composites.extend(self.__create_composites(sender, efforts_added))
         self.__extend_self_with_composites(new_composites)
         for affected_composite in self.__get_composites_for_efforts(
@@ -198,10 +264,18 @@ class EffortAggregator(
         new_composites = []
         key = self.__key_for_effort(sender)
         task = sender.task()  # pylint: disable=W0621
-        if (task in self.observable()) and (key not in self.__composites):
-            new_composites.extend(self.__create_composites(task, [sender]))
+        # Remember the period the effort was in, to update its composites:
+        previous_period = self.__effortStore.period(sender)
+        if task in self.observable():
+            self.__effortStore.add(sender)
+            if key not in self.__composites:
+                new_composites.extend(
+                    self.__create_composites(task, [sender])
+                )
         self.__extend_self_with_composites(new_composites)
-        for affected_composite in self.__get_composites_for_efforts([sender]):
+        for affected_composite in self.__get_composites_for_efforts(
+            [sender], previous_period
+        ):
             is_tracked = affected_composite.isBeingTracked()
             was_tracked = affected_composite in self.__trackedComposites
             if is_tracked and not was_tracked:
@@ -215,40 +289,63 @@ class EffortAggregator(
             affected_composite.onRevenueChanged(newValue, sender)
 
     def __get_composites_for_tasks(self, tasks):
-        tasks = set(tasks)
-        return [
-            each_composite
-            for each_composite in self
-            if each_composite.task() in tasks
-            or (
-                each_composite.task().__class__.__name__ == "Total"
-                and tasks & each_composite.tasks()
+        """Return the composites of the tasks and the composites per period
+        that contain effort of the tasks."""
+        affected_composites = set()
+        for each_task in tasks:
+            affected_composites.update(
+                self.__compositesForTask.get(each_task, ())
+            )
+            for each_effort in each_task.efforts():
+                period = self.__key_for_period(each_effort)
+                if period in self.__composites:
+                    affected_composites.add(self.__composites[period])
+        return list(affected_composites)
+
+    def __get_composites_for_efforts(self, efforts, previous_period=None):
+        """Return the composites that contain the efforts. If the efforts
+        were in another period before, pass that period to also return the
+        composites of that period."""
+        affected_composites = set()
+        for each_effort in efforts:
+            affected_composites.update(
+                self.__composites_for_effort(each_effort, previous_period)
             )
+        return list(affected_composites)
+
+    def __composites_for_effort(self, an_effort, previous_period=None):
+        task = an_effort.task()  # pylint: disable=W0621
+        tasks = [task] + task.ancestors()
+        periods = [self.__key_for_period(an_effort)]
+        if previous_period and previous_period != periods[0]:
+            periods.append(previous_period)
+        keys = [
+            (each_task,) + period for each_task in tasks for period in periods
         ]
-
-    def __get_composites_for_efforts(self, efforts):
-        efforts = set(efforts)
+        keys.extend(periods)
         return [
-            each_composite
-            for each_composite in self
-            if set(each_composite._getEfforts()) & efforts
+            self.__composites[key] for key in keys if key in self.__composites
         ]
 
     def __create_composites(self, task, efforts):  # pylint: disable=W0621
         new_composites = []
         for effort in efforts:
+            period = self.__key_for_period(effort)
+            self.__effortStore.add(effort, period)
             new_composites.extend(
-                self.__create_composites_for_task(effort, task)
+                self.__create_composites_for_task(effort, task, period)
+            )
+            new_composites.extend(
+                self.__create_composite_for_period(effort, period)
             )
-            new_composites.extend(self.__create_composite_for_period(effort))
         return new_composites
 
     def __create_composites_for_task(
-        self, an_effort, task
+        self, an_effort, task, period
     ):  # pylint: disable=W0621
         new_composites = []
         for each_task in [task] + task.ancestors():
-            key = self.__key_for_effort(an_effort, each_task)
+            key = (each_task,) + period
             if key in self.__composites:
                 self.__composites[key].addEffort(an_effort)
                 continue
@@ -257,16 +354,22 @@ class EffortAggregator(
             )  # pylint: disable=W0142
             new_composite.addEffort(an_effort)
             self.__composites[key] = new_composite
+            self.__compositesForTask.setdefault(each_task, set()).add(
+                new_composite
+            )
             new_composites.append(new_composite)
         return new_composites
 
-    def __create_composite_for_period(self, an_effort):
-        key = self.__key_for_period(an_effort)
+    def __create_composite_for_period(self, an_effort, key):
         if key in self.__composites:
             self.__composites[key].addEffort(an_effort)
             return []
         new_composite_per_period = composite.CompositeEffortPerPeriod(
-            key[0], key[1], self.observable(), an_effort
+            key[0],
+            key[1],
+            self.observable(),
+            an_effort,
+            effortStore=self.__effortStore,
         )
         self.__composites[key] = new_composite_per_period
         return [new_composite_per_period]
@@ -312,17 +415,15 @@ class EffortAggregator(
 
     def __key_for_effort(self, effort, task=None):  # pylint: disable=W0621
         task = task or effort.task()
+        return (task,) + self.__key_for_period(effort)
+
+    def __key_for_period(self, effort):
         effort_start = effort.getStart()
         return (
-            task,
             self.__start_of_period(effort_start),
             self.__end_of_period(effort_start),
         )
 
-    def __key_for_period(self, effort):
-        key = self.__key_for_effort(effort)
-        return key[1], key[2]
-
     @classmethod
     def sortEventType(class_):
         return "this event type is not used"  # pragma: no cover
@@ -17,7 +17,7 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
 from taskcoachlib import patterns
-from taskcoachlib.domain import base, date
+from taskcoachlib.domain import base
 from pubsub import pub
 from . import task
 from . import tasklist
@@ -31,41 +31,47 @@ class ViewFilter(tasklist.TaskListQueryMixin, base.Filter):
         super().__init__(*args, **kwargs)
 
     def registerObservers(self):
+        # Tasks notify us when their status actually changes, including the
+        # changes that happen when time passes (tasks schedule those
+        # themselves), so only the tasks that flip need to be refreshed:
+        pub.subscribe(
+            self.onTaskStatusChange, task.Task.statusChangedEventType()
+        )
         registerObserver = patterns.Publisher().registerObserver
         for eventType in (
-            task.Task.plannedStartDateTimeChangedEventType(),
-            task.Task.dueDateTimeChangedEventType(),
-            task.Task.actualStartDateTimeChangedEventType(),
-            task.Task.completionDateTimeChangedEventType(),
-            task.Task.prerequisitesChangedEventType(),
-            task.Task.appearanceChangedEventType(),  # Proxy for status changes
             task.Task.addChildEventType(),
             task.Task.removeChildEventType(),
         ):
-            if eventType.startswith("pubsub"):
-                pub.subscribe(self.onTaskStatusChange, eventType)
-            else:
-                registerObserver(
-                    self.onTaskStatusChange_Deprecated, eventType=eventType
-                )
-        date.Scheduler().schedule_interval(self.atMidnight, days=1)
+            registerObserver(
+                self.onTaskStatusChange_Deprecated, eventType=eventType
+            )
 
     def detach(self):
         super().detach()
         patterns.Publisher().removeObserver(self.onTaskStatusChange_Deprecated)
 
-    def atMidnight(self):
-        """Whether tasks are included in the filter or not may change at
-        midnight."""
-        self.reset()
-
     def onTaskStatusChange(self, newValue, sender):  # pylint: disable=W0613
-        self.reset()
+        self.refreshItems([sender])
 
     def onTaskStatusChange_Deprecated(
         self, event=None
     ):  # pylint: disable=W0613
-        self.reset()
+        self.refreshItems(self.__tasksAffectedByStatusChange(event.sources()))
+
+    @staticmethod
+    def __tasksAffectedByStatusChange(tasks):
+        """Return the tasks whose status may change when the status of the
+        given tasks changes. The status of a task depends on the
+        prerequisites of its ancestors, so we include the children of the
+        tasks and of their dependencies."""
+        affectedTasks = set()
+        for eachTask in tasks:
+            if not isinstance(eachTask, task.Task):
+                continue
+            for affectedTask in [eachTask] + list(eachTask.dependencies()):
+                affectedTasks.add(affectedTask)
+                affectedTasks.update(affectedTask.children(recursive=True))
+        return affectedTasks
 
     def hideTaskStatus(self, status, hide=True):
         if hide:
@@ -58,10 +58,11 @@ class Sorter(base.TreeSorter):
         return self.__treeMode
 
     def sortByTaskStatusFirst(self, sortByTaskStatusFirst):
+        if sortByTaskStatusFirst == self.__sortByTaskStatusFirst:
+            return
         self.__sortByTaskStatusFirst = sortByTaskStatusFirst
-        # We don't need to invoke self.reset() here since when this property is
-        # changed, the sort order also changes which in turn will cause
-        # self.reset() to be called.
+        # The cached sort keys include the task status, so recompute them:
+        self.reset()
 
     def createSortKeyFunction(self, sortKey):
         statusSortKey = self.__createStatusSortKey()
@@ -77,6 +78,21 @@ class Sorter(base.TreeSorter):
         else:
             return lambda task: []
 
+    def _itemsAffectedBy(self, tasks):
+        # The status of tasks depends on the completion of their
+        # prerequisites, so sorting by status first may need to move the
+        # dependencies of the changed tasks (and their children) too.
+        affectedTasks = super()._itemsAffectedBy(tasks)
+        if self.__sortByTaskStatusFirst:
+            for eachTask in affectedTasks.copy():
+                if isinstance(eachTask, task.Task):
+                    for dependency in eachTask.dependencies():
+                        affectedTasks.add(dependency)
+                        affectedTasks.update(
+                            dependency.children(recursive=True)
+                        )
+        return affectedTasks
+
     def _registerObserverForAttribute(self, attribute):
         # Sorter is always observing task dates and prerequisites because
         # sorting by status depends on those attributes. Hence we don't need
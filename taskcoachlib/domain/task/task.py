@@ -23,12 +23,19 @@ from taskcoachlib import patterns
 from taskcoachlib.domain import date, categorizable, note, attachment, base
 from taskcoachlib.domain.attribute.icon import getImageOpen
 from pubsub import pub
-from taskcoachlib.thirdparty._weakrefset import WeakSet
 from . import status
+from weakref import WeakSet
 import weakref
 import wx
 
 
+def weakTaskSet(tasks):
+    """Return a weak set of the tasks. Most tasks have no prerequisites and
+    dependencies, so share one empty set between them instead of creating
+    an empty weak set per task."""
+    return WeakSet(tasks) if tasks else base.attribute.noValues
+
+
 class Task(
     note.NoteOwner,
     attachment.AttachmentOwner,
@@ -36,6 +43,9 @@ class Task(
 ):
 
     maxDateTime = date.DateTime()
+    # All tasks, so the task class can subscribe to setting changes once
+    # instead of each task subscribing itself:
+    __instances = weakref.WeakSet()
 
     def __init__(
         self,
@@ -68,6 +78,8 @@ class Task(
         kwargs["categories"] = categories
         super().__init__(*args, **kwargs)
         self.__status = None  # status cache
+        self.__notifiedStatus = None  # status last seen by observers
+        self.__aggregates = dict()  # recursive aggregates cache
         self.__dueSoonHours = self.settings.getint(
             "behavior", "duesoonhours"
         )  # pylint: disable=E1101
@@ -94,28 +106,15 @@ class Task(
         self.__recurrence = (
             date.Recurrence() if recurrence is None else recurrence
         )
-        self.__prerequisites = WeakSet(prerequisites or [])
-        self.__dependencies = WeakSet(dependencies or [])
+        self.__prerequisites = weakTaskSet(prerequisites)
+        self.__dependencies = weakTaskSet(dependencies)
         self.__shouldMarkCompletedWhenAllChildrenCompleted = (
             shouldMarkCompletedWhenAllChildrenCompleted
         )
         for effort in self._efforts:
             effort.setTask(self)
-        pub.subscribe(
-            self.__computeRecursiveForegroundColor, "settings.fgcolor"
-        )
-        pub.subscribe(
-            self.__computeRecursiveBackgroundColor, "settings.bgcolor"
-        )
-        pub.subscribe(self.__computeRecursiveIcon, "settings.icon")
-        pub.subscribe(self.__computeRecursiveSelectedIcon, "settings.icon")
-        pub.subscribe(
-            self.onDueSoonHoursChanged, "settings.behavior.duesoonhours"
-        )
-        pub.subscribe(
-            self.onMarkParentCompletedWhenAllChildrenCompletedChanged,
-            "settings.behavior.markparentcompletedwhenallchildrencompleted",
-        )
+        Task.__instances.add(self)
+        Task.__subscribeToSettings()
 
         now = date.Now()
         if now < self.__dueDateTime < maxDateTime:
@@ -136,9 +135,54 @@ class Task(
                 self.__plannedStartDateTime + date.ONE_SECOND,
             )
 
+    @classmethod
+    def __subscribeToSettings(class_):
+        # Subscribing is cheap when already subscribed, and subscribing for
+        # each new task makes sure we're subscribed after pub.unsubAll():
+        pub.subscribe(class_.__onForegroundColorChanged, "settings.fgcolor")
+        pub.subscribe(class_.__onBackgroundColorChanged, "settings.bgcolor")
+        pub.subscribe(class_.__onIconChanged, "settings.icon")
+        pub.subscribe(
+            class_.__onDueSoonHoursChanged, "settings.behavior.duesoonhours"
+        )
+        pub.subscribe(
+            class_.__onMarkParentCompletedWhenAllChildrenCompletedChanged,
+            "settings.behavior.markparentcompletedwhenallchildrencompleted",
+        )
+
+    @staticmethod
+    def __onForegroundColorChanged(value=None):
+        for eachTask in list(Task.__instances):
+            eachTask.__computeRecursiveForegroundColor(value)
+
+    @staticmethod
+    def __onBackgroundColorChanged(*args, **kwargs):
+        for eachTask in list(Task.__instances):
+            eachTask.__computeRecursiveBackgroundColor(*args, **kwargs)
+
+    @staticmethod
+    def __onIconChanged(*args, **kwargs):
+        for eachTask in list(Task.__instances):
+            eachTask.__computeRecursiveIcon(*args, **kwargs)
+            eachTask.__computeRecursiveSelectedIcon(*args, **kwargs)
+
+    @staticmethod
+    def __onDueSoonHoursChanged(value):
+        for eachTask in list(Task.__instances):
+            eachTask.onDueSoonHoursChanged(value)
+
+    @staticmethod
+    def __onMarkParentCompletedWhenAllChildrenCompletedChanged(value):
+        for eachTask in list(Task.__instances):
+            eachTask.onMarkParentCompletedWhenAllChildrenCompletedChanged(
+                value
+            )
+
     @patterns.eventSource
     def __setstate__(self, state, event=None):
+        self.invalidateAggregates()
         super().__setstate__(state, event=event)
+        self.invalidateAggregates()
         self.setPlannedStartDateTime(state["plannedStartDateTime"])
         self.setActualStartDateTime(state["actualStartDateTime"])
         self.setDueDateTime(state["dueDateTime"])
@@ -250,6 +294,7 @@ class Task(
             return
         wasTracking = self.isBeingTracked(recursive=True)
         super().addChild(child, event=event)
+        self.invalidateAggregates()
         self.childChangeEvent(child, wasTracking, event)
         if self.shouldBeMarkedCompleted():
             self.setCompletionDateTime(child.completionDateTime())
@@ -264,6 +309,7 @@ class Task(
             return
         wasTracking = self.isBeingTracked(recursive=True)
         super().removeChild(child, event=event)
+        self.invalidateAggregates()
         self.childChangeEvent(child, wasTracking, event)
         if self.shouldBeMarkedCompleted():
             # The removed child was the last uncompleted child
@@ -301,14 +347,14 @@ class Task(
         super().setSubject(subject, event=event)
         # The subject of a dependency of our prerequisites has changed, notify:
         for prerequisite in self.prerequisites():
-            pub.sendMessage(
+            patterns.sendMessage(
                 prerequisite.dependenciesChangedEventType(),
                 newValue=prerequisite.dependencies(),
                 sender=prerequisite,
             )
         # The subject of a prerequisite of our dependencies has changed, notify:
         for dependency in self.dependencies():
-            pub.sendMessage(
+            patterns.sendMessage(
                 dependency.prerequisitesChangedEventType(),
                 newValue=dependency.prerequisites(),
                 sender=dependency,
@@ -347,13 +393,13 @@ class Task(
                     date.Scheduler().schedule(self.onDueSoon, dueSoonDateTime)
         self.markDirty()
         self.recomputeAppearance()
-        pub.sendMessage(
+        patterns.sendMessage(
             self.dueDateTimeChangedEventType(),
             newValue=dueDateTime,
             sender=self,
         )
         for ancestor in self.ancestors():
-            pub.sendMessage(
+            patterns.sendMessage(
                 ancestor.dueDateTimeChangedEventType(),
                 newValue=dueDateTime,
                 sender=ancestor,
@@ -405,13 +451,13 @@ class Task(
             date.Scheduler().schedule(
                 self.onTimeToStart, plannedStartDateTime + date.ONE_SECOND
             )
-        pub.sendMessage(
+        patterns.sendMessage(
             self.plannedStartDateTimeChangedEventType(),
             newValue=plannedStartDateTime,
             sender=self,
         )
         for ancestor in self.ancestors():
-            pub.sendMessage(
+            patterns.sendMessage(
                 ancestor.plannedStartDateTimeChangedEventType(),
                 newValue=plannedStartDateTime,
                 sender=ancestor,
@@ -472,13 +518,13 @@ class Task(
                 child.setActualStartDateTime(actualStartDateTime)
         self.markDirty()
         self.recomputeAppearance()
-        pub.sendMessage(
+        patterns.sendMessage(
             self.actualStartDateTimeChangedEventType(),
             newValue=actualStartDateTime,
             sender=self,
         )
         for ancestor in self.ancestors():
-            pub.sendMessage(
+            patterns.sendMessage(
                 ancestor.actualStartDateTimeChangedEventType(),
                 newValue=actualStartDateTime,
                 sender=ancestor,
@@ -549,13 +595,13 @@ class Task(
             self.recomputeAppearance()
             for dependency in self.dependencies():
                 dependency.recomputeAppearance(recursive=True)
-            pub.sendMessage(
+            patterns.sendMessage(
                 self.completionDateTimeChangedEventType(),
                 newValue=completionDateTime,
                 sender=self,
             )
             for ancestor in self.ancestors():
-                pub.sendMessage(
+                patterns.sendMessage(
                     ancestor.completionDateTimeChangedEventType(),
                     newValue=completionDateTime,
                     sender=ancestor,
@@ -602,10 +648,11 @@ class Task(
     def onMarkParentCompletedWhenAllChildrenCompletedChanged(self, value):
         """When the global setting changes, send a percentage completed
         changed if necessary."""
+        self.invalidateAggregates()
         if self.shouldMarkCompletedWhenAllChildrenCompleted() is None and any(
             [child.percentageComplete(True) for child in self.children()]
         ):
-            pub.sendMessage(
+            patterns.sendMessage(
                 self.percentageCompleteChangedEventType(),
                 newValue=self.percentageComplete(),
                 sender=self,
@@ -686,8 +733,14 @@ class Task(
                 self.__status = status.late
             else:
                 self.__status = status.inactive
+        if self.__notifiedStatus is None:
+            self.__notifiedStatus = self.__status
         return self.__status
 
+    @classmethod
+    def statusChangedEventType(class_):
+        return "pubsub.task.status"
+
     def onDueSoonHoursChanged(self, value):
         date.Scheduler().unschedule(self.onDueSoon)
         self.__dueSoonHours = value
@@ -701,24 +754,64 @@ class Task(
             date.Scheduler().schedule(self.onDueSoon, newDueSoonDateTime)
         self.recomputeAppearance()
 
+    # Recursive aggregates
+
+    def invalidateAggregates(self):
+        """Forget the cached recursive aggregates of this task and of its
+        ancestors. Must be called whenever something changes that the
+        recursive values of time spent, budget, revenue, etc. depend on."""
+        self.__aggregates.clear()
+        for ancestor in self.ancestors():
+            ancestor.__aggregates.clear()
+
+    def __aggregate(self, key, compute):
+        """Return the cached recursive aggregate key, computing it if
+        needed."""
+        try:
+            return self.__aggregates[key]
+        except KeyError:
+            value = self.__aggregates[key] = compute()
+            return value
+
+    def __recursiveEfforts(self):
+        """Return the efforts of this task and its children (recursively),
+        the efforts among them that are being tracked and the total
+        duration of the efforts that are not being tracked. The duration
+        of tracked efforts changes all the time, so it can't be cached."""
+        return self.__aggregate("efforts", self.__computeRecursiveEfforts)
+
+    def __computeRecursiveEfforts(self):
+        efforts = self._efforts[:]
+        activeEfforts = []
+        duration = date.TimeDelta()
+        for effort in self._efforts:
+            if effort.isBeingTracked():
+                activeEfforts.append(effort)
+            else:
+                duration += effort.duration()
+        for child in self.children():
+            childEfforts, childActiveEfforts, childDuration = (
+                child.__recursiveEfforts()
+            )
+            efforts.extend(childEfforts)
+            activeEfforts.extend(childActiveEfforts)
+            duration += childDuration
+        return efforts, activeEfforts, duration
+
     # effort related methods:
 
     def efforts(self, recursive=False):
-        childEfforts = []
         if recursive:
-            for child in self.children():
-                childEfforts.extend(child.efforts(recursive=True))
-        return self._efforts + childEfforts
+            return self.__recursiveEfforts()[0][:]
+        return self._efforts[:]
 
     def isBeingTracked(self, recursive=False):
         return self.activeEfforts(recursive)
 
     def activeEfforts(self, recursive=False):
-        return [
-            effort
-            for effort in self.efforts(recursive)
-            if effort.isBeingTracked()
-        ]
+        if recursive:
+            return self.__recursiveEfforts()[1][:]
+        return [effort for effort in self._efforts if effort.isBeingTracked()]
 
     def addEffort(self, effort):
         if effort in self._efforts:
@@ -726,9 +819,10 @@ class Task(
         wasTracking = self.isBeingTracked()
         oldValue = self._efforts[:]
         self._efforts.append(effort)
+        self.invalidateAggregates()
         if effort.getStart() < self.actualStartDateTime():
             self.setActualStartDateTime(effort.getStart())
-        pub.sendMessage(
+        patterns.sendMessage(
             self.effortsChangedEventType(),
             newValue=(self._efforts, oldValue),
             sender=self,
@@ -742,12 +836,13 @@ class Task(
         return "pubsub.task.efforts"
 
     def sendTrackingChangedMessage(self, tracking):
+        self.invalidateAggregates()
         self.recomputeAppearance()
-        pub.sendMessage(
+        patterns.sendMessage(
             self.trackingChangedEventType(), newValue=tracking, sender=self
         )
         for ancestor in self.ancestors():
-            pub.sendMessage(
+            patterns.sendMessage(
                 ancestor.trackingChangedEventType(),
                 newValue=tracking,
                 sender=ancestor,
@@ -758,7 +853,8 @@ class Task(
             return
         oldValue = self._efforts[:]
         self._efforts.remove(effort)
-        pub.sendMessage(
+        self.invalidateAggregates()
+        patterns.sendMessage(
             self.effortsChangedEventType(),
             newValue=(self._efforts, oldValue),
             sender=self,
@@ -776,7 +872,8 @@ class Task(
             return
         oldValue = self._efforts[:]
         self._efforts = efforts
-        pub.sendMessage(
+        self.invalidateAggregates()
+        patterns.sendMessage(
             self.effortsChangedEventType(),
             newValue=(self._efforts, oldValue),
             sender=self,
@@ -790,19 +887,24 @@ class Task(
     # Time spent
 
     def timeSpent(self, recursive=False):
+        if recursive:
+            _, activeEfforts, duration = self.__recursiveEfforts()
+            return sum(
+                (effort.duration() for effort in activeEfforts), duration
+            )
         return sum(
-            (effort.duration() for effort in self.efforts(recursive)),
-            date.TimeDelta(),
+            (effort.duration() for effort in self._efforts), date.TimeDelta()
         )
 
     def sendTimeSpentChangedMessage(self):
-        pub.sendMessage(
+        self.invalidateAggregates()
+        patterns.sendMessage(
             self.timeSpentChangedEventType(),
             newValue=self.timeSpent(),
             sender=self,
         )
         for ancestor in self.ancestors():
-            pub.sendMessage(
+            patterns.sendMessage(
                 ancestor.timeSpentChangedEventType(),
                 newValue=ancestor.timeSpent(),
                 sender=ancestor,
@@ -829,25 +931,30 @@ class Task(
     # Budget
 
     def budget(self, recursive=False):
-        result = self.__budget
         if recursive:
-            for task in self.children():
-                result += task.budget(recursive)
+            return self.__aggregate("budget", self.__computeRecursiveBudget)
+        return self.__budget
+
+    def __computeRecursiveBudget(self):
+        result = self.__budget
+        for task in self.children():
+            result += task.budget(recursive=True)
         return result
 
     def setBudget(self, budget):
         if budget == self.__budget:
             return
         self.__budget = budget
+        self.invalidateAggregates()
         self.sendBudgetChangedMessage()
         self.sendBudgetLeftChangedMessage()
 
     def sendBudgetChangedMessage(self):
-        pub.sendMessage(
+        patterns.sendMessage(
             self.budgetChangedEventType(), newValue=self.budget(), sender=self
         )
         for ancestor in self.ancestors():
-            pub.sendMessage(
+            patterns.sendMessage(
                 ancestor.budgetChangedEventType(),
                 newValue=ancestor.budget(recursive=True),
                 sender=ancestor,
@@ -874,13 +981,13 @@ class Task(
         return budget - self.timeSpent(recursive) if budget else budget
 
     def sendBudgetLeftChangedMessage(self):
-        pub.sendMessage(
+        patterns.sendMessage(
             self.budgetLeftChangedEventType(),
             newValue=self.budgetLeft(),
             sender=self,
         )
         for ancestor in self.ancestors():
-            pub.sendMessage(
+            patterns.sendMessage(
                 ancestor.budgetLeftChangedEventType(),
                 newValue=ancestor.budgetLeft(recursive=True),
                 sender=ancestor,
@@ -938,8 +1045,8 @@ class Task(
 
     @classmethod
     def fgColorForStatus(class_, taskStatus):
-        return wx.Colour(
-            *eval(class_.settings.get("fgcolor", "%stasks" % taskStatus))
+        return class_.settings.getcolour(
+            "fgcolor", "%stasks" % taskStatus
         )  # pylint: disable=E1101
 
     def appearanceChangedEvent(self, event):
@@ -998,8 +1105,8 @@ class Task(
 
     @classmethod
     def bgColorForStatus(class_, taskStatus):
-        return wx.Colour(
-            *eval(class_.settings.get("bgcolor", "%stasks" % taskStatus))
+        return class_.settings.getcolour(
+            "bgcolor", "%stasks" % taskStatus
         )  # pylint: disable=E1101
 
     # Font
@@ -1022,14 +1129,9 @@ class Task(
 
     @classmethod
     def fontForStatus(class_, taskStatus):
-        nativeInfoString = class_.settings.get(
+        return class_.settings.getfont(
             "font", "%stasks" % taskStatus
         )  # pylint: disable=E1101
-        return (
-            wx.FontFromNativeInfoString(nativeInfoString)
-            if nativeInfoString
-            else None
-        )
 
     # Icon
 
@@ -1086,6 +1188,7 @@ class Task(
 
     @patterns.eventSource
     def recomputeAppearance(self, recursive=False, event=None):
+        notifiedStatus = self.__notifiedStatus
         self.__status = None
         # Need to prepare for AttributeError because the cached recursive values
         # are not set in __init__ for performance reasons
@@ -1110,6 +1213,14 @@ class Task(
             or self.__recursiveSelectedIcon != previousRecursiveSelectedIcon
         ):
             event.addSource(self, type=self.appearanceChangedEventType())
+        newStatus = self.status()
+        if notifiedStatus is not None and notifiedStatus != newStatus:
+            # Only tell observers when the status actually flipped, so that
+            # they don't need to reevaluate tasks whose status didn't change
+            self.__notifiedStatus = newStatus
+            patterns.sendMessage(
+                self.statusChangedEventType(), newValue=newStatus, sender=self
+            )
         if recursive:
             for child in self.children():
                 child.recomputeAppearance(recursive=True, event=event)
@@ -1118,31 +1229,34 @@ class Task(
 
     def percentageComplete(self, recursive=False):
         if recursive:
-            if self.shouldMarkCompletedWhenAllChildrenCompleted() is None:
-                # pylint: disable=E1101
-                ignore_me = self.settings.getboolean(
-                    "behavior", "markparentcompletedwhenallchildrencompleted"
-                )
-            else:
-                ignore_me = self.shouldMarkCompletedWhenAllChildrenCompleted()
-            percentages = []
-            if self.__percentageComplete > 0 or not ignore_me:
-                percentages.append(self.__percentageComplete)
-            percentages.extend(
-                [
-                    child.percentageComplete(recursive)
-                    for child in self.children()
-                ]
+            return self.__aggregate(
+                "percentageComplete", self.__computeRecursivePercentageComplete
             )
-            return sum(percentages) // len(percentages) if percentages else 0
         else:
             return self.__percentageComplete
 
+    def __computeRecursivePercentageComplete(self):
+        if self.shouldMarkCompletedWhenAllChildrenCompleted() is None:
+            # pylint: disable=E1101
+            ignore_me = self.settings.getboolean(
+                "behavior", "markparentcompletedwhenallchildrencompleted"
+            )
+        else:
+            ignore_me = self.shouldMarkCompletedWhenAllChildrenCompleted()
+        percentages = []
+        if self.__percentageComplete > 0 or not ignore_me:
+            percentages.append(self.__percentageComplete)
+        percentages.extend(
+            [child.percentageComplete(True) for child in self.children()]
+        )
+        return sum(percentages) // len(percentages) if percentages else 0
+
     def setPercentageComplete(self, percentage):
         if percentage == self.__percentageComplete:
             return
         oldPercentage = self.__percentageComplete
         self.__percentageComplete = percentage
+        self.invalidateAggregates()
         if (
             percentage == 100
             and oldPercentage != 100
@@ -1160,13 +1274,13 @@ class Task(
             and self.actualStartDateTime() == date.DateTime()
         ):
             self.setActualStartDateTime(date.Now())
-        pub.sendMessage(
+        patterns.sendMessage(
             self.percentageCompleteChangedEventType(),
             newValue=percentage,
             sender=self,
         )
         for ancestor in self.ancestors():
-            pub.sendMessage(
+            patterns.sendMessage(
                 ancestor.percentageCompleteChangedEventType(),
                 newValue=ancestor.percentageComplete(recursive=True),
                 sender=ancestor,
@@ -1206,13 +1320,13 @@ class Task(
         self.sendPriorityChangedMessage()
 
     def sendPriorityChangedMessage(self):
-        pub.sendMessage(
+        patterns.sendMessage(
             self.priorityChangedEventType(),
             newValue=self.priority(),
             sender=self,
         )
         for ancestor in self.ancestors():
-            pub.sendMessage(
+            patterns.sendMessage(
                 ancestor.priorityChangedEventType(),
                 newValue=ancestor.priority(),
                 sender=ancestor,
@@ -1241,7 +1355,8 @@ class Task(
         if hourlyFee == self.__hourlyFee:
             return
         self.__hourlyFee = hourlyFee
-        pub.sendMessage(
+        self.invalidateAggregates()
+        patterns.sendMessage(
             self.hourlyFeeChangedEventType(), newValue=hourlyFee, sender=self
         )
         if self.timeSpent() > date.TimeDelta():
@@ -1265,22 +1380,24 @@ class Task(
     # Fixed fee
 
     def fixedFee(self, recursive=False):
-        childFixedFees = (
-            sum(child.fixedFee(recursive) for child in self.children())
-            if recursive
-            else 0
-        )
-        return self.__fixedFee + childFixedFees
+        if recursive:
+            return self.__aggregate(
+                "fixedFee",
+                lambda: self.__fixedFee
+                + sum(child.fixedFee(True) for child in self.children()),
+            )
+        return self.__fixedFee
 
     def setFixedFee(self, fixedFee):
         if fixedFee == self.__fixedFee:
             return
         self.__fixedFee = fixedFee
-        pub.sendMessage(
+        self.invalidateAggregates()
+        patterns.sendMessage(
             self.fixedFeeChangedEventType(), newValue=fixedFee, sender=self
         )
         for ancestor in self.ancestors():
-            pub.sendMessage(
+            patterns.sendMessage(
                 ancestor.fixedFeeChangedEventType(),
                 newValue=ancestor.fixedFee(recursive=True),
                 sender=ancestor,
@@ -1304,6 +1421,15 @@ class Task(
     # Revenue
 
     def revenue(self, recursive=False):
+        if recursive and not self.__recursiveEfforts()[1]:
+            # Only cache when no effort is being tracked, because the
+            # revenue of tracked efforts increases while they're tracked.
+            return self.__aggregate(
+                "revenue", lambda: self.__computeRevenue(recursive=True)
+            )
+        return self.__computeRevenue(recursive)
+
+    def __computeRevenue(self, recursive):
         childRevenues = (
             sum(child.revenue(recursive) for child in self.children())
             if recursive
@@ -1316,13 +1442,13 @@ class Task(
         )
 
     def sendRevenueChangedMessage(self):
-        pub.sendMessage(
+        patterns.sendMessage(
             self.revenueChangedEventType(),
             newValue=self.revenue(),
             sender=self,
         )
         for ancestor in self.ancestors():
-            pub.sendMessage(
+            patterns.sendMessage(
                 ancestor.revenueChangedEventType(),
                 newValue=ancestor.revenue(recursive=True),
                 sender=ancestor,
@@ -1367,13 +1493,13 @@ class Task(
             return
         self.__reminder = reminderDateTime
         self.__reminderBeforeSnooze = reminderDateTime
-        pub.sendMessage(
+        patterns.sendMessage(
             self.reminderChangedEventType(),
             newValue=reminderDateTime,
             sender=self,
         )
         for ancestor in self.ancestors():
-            pub.sendMessage(
+            patterns.sendMessage(
                 ancestor.reminderChangedEventType(),
                 newValue=reminderDateTime,
                 sender=ancestor,
@@ -1382,7 +1508,7 @@ class Task(
     def snoozeReminder(self, timeDelta, now=date.Now):
         if timeDelta:
             self.__reminder = now() + timeDelta
-            pub.sendMessage(
+            patterns.sendMessage(
                 self.reminderChangedEventType(),
                 newValue=self.__reminder,
                 sender=self,
@@ -1390,7 +1516,7 @@ class Task(
         else:
             if self.recurrence():
                 self.__reminder = None
-                pub.sendMessage(
+                patterns.sendMessage(
                     self.reminderChangedEventType(),
                     newValue=self.__reminder,
                     sender=self,
@@ -1433,7 +1559,7 @@ class Task(
         if recurrence == self.__recurrence:
             return
         self.__recurrence = recurrence
-        pub.sendMessage(
+        patterns.sendMessage(
             self.recurrenceChangedEventType(), newValue=recurrence, sender=self
         )
 
@@ -1527,35 +1653,36 @@ class Task(
         prerequisites = set(prerequisites)
         if prerequisites == self.prerequisites():
             return
-        self.__prerequisites = WeakSet(prerequisites)
+        self.__prerequisites = weakTaskSet(prerequisites)
         self.setActualStartDateTime(self.maxDateTime, recursive=True)
         self.recomputeAppearance(recursive=True)
-        pub.sendMessage(
+        patterns.sendMessage(
             self.prerequisitesChangedEventType(),
             newValue=self.prerequisites(),
             sender=self,
         )
 
     def addPrerequisites(self, prerequisites):
-        prerequisites = set(prerequisites)
-        if prerequisites <= self.prerequisites():
+        current = self.prerequisites()
+        prerequisites = set(prerequisites) - current
+        if not prerequisites:
             return
-        self.__prerequisites = WeakSet(prerequisites | self.prerequisites())
+        self.__prerequisites = weakTaskSet(current | prerequisites)
         self.setActualStartDateTime(self.maxDateTime, recursive=True)
         self.recomputeAppearance(recursive=True)
-        pub.sendMessage(
+        patterns.sendMessage(
             self.prerequisitesChangedEventType(),
             newValue=self.prerequisites(),
             sender=self,
         )
 
     def removePrerequisites(self, prerequisites):
-        prerequisites = set(prerequisites)
-        if self.prerequisites().isdisjoint(prerequisites):
+        current = self.prerequisites()
+        if current.isdisjoint(prerequisites):
             return
-        self.__prerequisites = WeakSet(self.prerequisites() - prerequisites)
+        self.__prerequisites = weakTaskSet(current.difference(prerequisites))
         self.recomputeAppearance(recursive=True)
-        pub.sendMessage(
+        patterns.sendMessage(
             self.prerequisitesChangedEventType(),
             newValue=self.prerequisites(),
             sender=self,
@@ -1623,30 +1750,31 @@ class Task(
         dependencies = set(dependencies)
         if dependencies == self.dependencies():
             return
-        self.__dependencies = WeakSet(dependencies)
-        pub.sendMessage(
+        self.__dependencies = weakTaskSet(dependencies)
+        patterns.sendMessage(
             self.dependenciesChangedEventType(),
             newValue=self.dependencies(),
             sender=self,
         )
 
     def addDependencies(self, dependencies):
-        dependencies = set(dependencies)
-        if dependencies <= self.dependencies():
+        current = self.dependencies()
+        dependencies = set(dependencies) - current
+        if not dependencies:
             return
-        self.__dependencies = WeakSet(self.dependencies() | dependencies)
-        pub.sendMessage(
+        self.__dependencies = weakTaskSet(current | dependencies)
+        patterns.sendMessage(
             self.dependenciesChangedEventType(),
             newValue=self.dependencies(),
             sender=self,
         )
 
     def removeDependencies(self, dependencies):
-        dependencies = set(dependencies)
-        if self.dependencies().isdisjoint(dependencies):
+        current = self.dependencies()
+        if current.isdisjoint(dependencies):
             return
-        self.__dependencies = WeakSet(self.dependencies() - dependencies)
-        pub.sendMessage(
+        self.__dependencies = weakTaskSet(current.difference(dependencies))
+        patterns.sendMessage(
             self.dependenciesChangedEventType(),
             newValue=self.dependencies(),
             sender=self,
@@ -1701,12 +1829,13 @@ class Task(
         if newValue == self.__shouldMarkCompletedWhenAllChildrenCompleted:
             return
         self.__shouldMarkCompletedWhenAllChildrenCompleted = newValue
-        pub.sendMessage(
+        self.invalidateAggregates()
+        patterns.sendMessage(
             self.shouldMarkCompletedWhenAllChildrenCompletedChangedEventType(),
             newValue=newValue,
             sender=self,
         )
-        pub.sendMessage(
+        patterns.sendMessage(
             self.percentageCompleteChangedEventType(),
             newValue=self.percentageComplete(),
             sender=self,
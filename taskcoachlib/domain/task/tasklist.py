@@ -20,19 +20,19 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
 from taskcoachlib.i18n import _
-from taskcoachlib.domain import categorizable
+from taskcoachlib.domain import base, categorizable
+from taskcoachlib import patterns
 from taskcoachlib import help, operating_system  # pylint: disable=W0622
+from pubsub import pub
 from . import task
 
 
 class TaskListQueryMixin(object):
     def nrOfTasksPerStatus(self):
-        statuses = [
-            eachTask.status() for eachTask in self if not eachTask.isDeleted()
-        ]
-        count = dict()
-        for status in task.Task.possibleStatuses():
-            count[status] = statuses.count(status)
+        count = dict.fromkeys(task.Task.possibleStatuses(), 0)
+        for eachTask in self:
+            if not eachTask.isDeleted():
+                count[eachTask.status()] += 1
         return count
 
 
@@ -44,6 +44,88 @@ class TaskList(TaskListQueryMixin, categorizable.CategorizableContainer):
     )
     newItemHelpText = help.taskNew
 
+    def __init__(self, *args, **kwargs):
+        # Status index: {task: status} and {status: count}. It is built on
+        # first use and then kept up to date with the status changes of
+        # individual tasks, so counting tasks per status doesn't need to
+        # look at every task.
+        self.__statusOfTask = None
+        self.__countPerStatus = None
+        super().__init__(*args, **kwargs)
+
+    @patterns.eventSource
+    def extend(self, items, event=None):
+        super().extend(items, event=event)
+        if self.__statusOfTask is not None:
+            self.__addToStatusIndex(self._compositesAndAllChildren(items))
+
+    @patterns.eventSource
+    def removeItems(self, items, event=None):
+        super().removeItems(items, event=event)
+        if self.__statusOfTask is not None:
+            self.__removeFromStatusIndex(
+                self._compositesAndAllChildren(items)
+            )
+
+    @patterns.eventSource
+    def clear(self, event=None):
+        super().clear(event=event)
+        if self.__statusOfTask is not None:
+            self.__removeFromStatusIndex(list(self.__statusOfTask))
+
+    def detach(self):
+        super().detach()
+        if self.__statusOfTask is not None:
+            patterns.Publisher().removeObserver(self.onTaskMarkedDeletedOrNot)
+
+    def nrOfTasksPerStatus(self):
+        if self.__statusOfTask is None:
+            self.__buildStatusIndex()
+        return self.__countPerStatus.copy()
+
+    def __buildStatusIndex(self):
+        self.__statusOfTask = dict()
+        self.__countPerStatus = dict.fromkeys(task.Task.possibleStatuses(), 0)
+        self.__addToStatusIndex(self)
+        pub.subscribe(
+            self.onTaskStatusChanged, task.Task.statusChangedEventType()
+        )
+        for eventType in (
+            base.Object.markDeletedEventType(),
+            base.Object.markNotDeletedEventType(),
+        ):
+            patterns.Publisher().registerObserver(
+                self.onTaskMarkedDeletedOrNot, eventType=eventType
+            )
+
+    def __addToStatusIndex(self, tasks):
+        for eachTask in tasks:
+            if eachTask.isDeleted() or eachTask in self.__statusOfTask:
+                continue
+            status = self.__statusOfTask[eachTask] = eachTask.status()
+            self.__countPerStatus[status] += 1
+
+    def __removeFromStatusIndex(self, tasks):
+        for eachTask in tasks:
+            status = self.__statusOfTask.pop(eachTask, None)
+            if status is not None:
+                self.__countPerStatus[status] -= 1
+
+    def onTaskStatusChanged(self, newValue, sender):
+        oldStatus = self.__statusOfTask.get(sender)
+        if oldStatus is None:
+            return
+        self.__countPerStatus[oldStatus] -= 1
+        self.__countPerStatus[newValue] += 1
+        self.__statusOfTask[sender] = newValue
+
+    def onTaskMarkedDeletedOrNot(self, event):
+        tasks = [eachTask for eachTask in event.sources() if eachTask in self]
+        self.__removeFromStatusIndex(
+            [eachTask for eachTask in tasks if eachTask.isDeleted()]
+        )
+        self.__addToStatusIndex(tasks)
+
     def nrBeingTracked(self):
         return len(self.tasksBeingTracked())
 
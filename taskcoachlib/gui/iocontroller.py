@@ -637,11 +637,23 @@ Break the lock?"""
         gc.collect()
 
     def __showSaveMessage(self, savedFile):
+        statistics = savedFile.saveStatistics()
+        if statistics["path"] == "merge":
+            message = _(
+                "Saved %(nrtasks)d tasks to %(filename)s, merging changes "
+                "on disk, in %(duration).2f seconds"
+            )
+        else:
+            message = _(
+                "Saved %(nrtasks)d tasks to %(filename)s "
+                "in %(duration).2f seconds"
+            )
         self.__messageCallback(
-            _("Saved %(nrtasks)d tasks to %(filename)s")
+            message
             % {
                 "nrtasks": len(savedFile.tasks()),
                 "filename": savedFile.filename(),
+                "duration": statistics["duration"],
             }
         )
 
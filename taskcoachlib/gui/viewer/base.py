@@ -50,6 +50,8 @@ class Viewer(wx.Panel, patterns.Observer, metaclass=ViewerMeta):
         self.settings = settings
         self.__settingsSection = kwargs.pop("settingsSection")
         self.__freezeCount = 0
+        # Number of rows in the widget the last refresh touched:
+        self.__rowsTouched = 0
         # The how maniest of this viewer type are we? Used for settings
         self.__instanceNumber = kwargs.pop("instanceNumber")
         self.__use_separate_settings_section = kwargs.pop(
@@ -274,7 +276,7 @@ class Viewer(wx.Panel, patterns.Observer, metaclass=ViewerMeta):
         def allItemsAreSelected():
             return set(self.__curselection).issubset(set(event.values()))
 
-        self.refresh()
+        self.refreshStructure()
         if itemsRemoved() and allItemsAreSelected():
             self.selectNextItemsAfterRemoval(list(event.values()))
         self.updateSelection(sendViewerStatusEvent=False)
@@ -317,6 +319,26 @@ class Viewer(wx.Panel, patterns.Observer, metaclass=ViewerMeta):
     def refresh(self):
         if self and not self.__freezeCount:
             self.widget.RefreshAllItems(len(self.presentation()))
+            self.__rowsTouched = len(self.presentation())
+
+    def refreshStructure(self):
+        """Refresh the widget after items have been added, removed or
+        reordered. Tree list controls only update the rows that changed,
+        other widgets are refreshed completely."""
+        if not self or self.__freezeCount:
+            return
+        if (
+            isinstance(self.widget, widgets.TreeListCtrl)
+            and self.widget.GetRootItem()
+        ):
+            self.__rowsTouched = self.widget.UpdateAllItems()
+        else:
+            self.refresh()
+
+    def rowsTouched(self):
+        """Return the number of rows the last refresh of the widget
+        inserted, deleted, moved or refreshed."""
+        return self.__rowsTouched
 
     def refreshItems(self, *items):
         if not self.__freezeCount:
@@ -84,6 +84,7 @@ class BaseCategoryViewer(
             columnPopupMenu,
             resizeableColumn=1 if self.hasOrderingColumn() else 0,
             validateDrag=self.validateDrag,
+            virtual=True,
             **self.widgetCreationKeywordArguments()
         )
         if self.hasOrderingColumn():
@@ -36,7 +36,9 @@ class SearchableViewerMixin(object):
 
     def createFilter(self, presentation):
         presentation = super().createFilter(presentation)
-        return base.SearchFilter(presentation, **self.searchOptions())
+        return base.SearchFilter(
+            presentation, searchIndex=True, **self.searchOptions()
+        )
 
     def searchOptions(self):
         (
@@ -63,6 +65,17 @@ class SearchableViewerMixin(object):
         searchDescription=False,
         regularExpression=False,
     ):
+        # The search control only searches after the user pauses typing,
+        # but it may still ask for the same search again, e.g. when the
+        # user presses enter. Don't filter the presentation again then.
+        if self.getSearchFilter() == (
+            searchString,
+            matchCase,
+            includeSubItems,
+            searchDescription,
+            regularExpression,
+        ):
+            return
         section = self.settingsSection()
         self.settings.set(section, "searchfilterstring", searchString)
         self.settings.set(section, "searchfiltermatchcase", str(matchCase))
@@ -296,7 +309,7 @@ class SortableViewerMixin(object):
 
     def onSortOrderChanged(self, sender):
         if sender == self.presentation():
-            self.refresh()
+            self.refreshStructure()
             self.updateSelection(sendViewerStatusEvent=False)
             self.sendViewerStatusEvent()
 
@@ -1255,6 +1255,7 @@ class TaskViewer(
             columnPopupMenu,
             resizeableColumn=1 if self.hasOrderingColumn() else 0,
             validateDrag=self.validateDrag,
+            virtual=True,
             **self.widgetCreationKeywordArguments()
         )
         if self.hasOrderingColumn():
@@ -2175,9 +2176,7 @@ class TaskStatsViewer(BaseTaskViewer):  # pylint: disable=W0223
             series[0].SetValue(1)
 
     def getFgColor(self, status):
-        color = wx.Colour(
-            *eval(self.settings.get("fgcolor", "%stasks" % status))
-        )
+        color = self.settings.getcolour("fgcolor", "%stasks" % status)
         if status == task.status.active and color == wx.BLACK:
             color = wx.BLUE
         return color
@@ -2340,9 +2339,7 @@ else:
             return graph, visual_style
 
         def getFgColor(self, status):
-            color = wx.Colour(
-                *eval(self.settings.get("fgcolor", "%stasks" % status))
-            )
+            color = self.settings.getcolour("fgcolor", "%stasks" % status)
             if status == task.status.active and color == wx.BLACK:
                 color = wx.BLUE
             return color
@@ -29,13 +29,15 @@ from taskcoachlib.domain.date import (
 from taskcoachlib.domain.category import Category
 from taskcoachlib.domain.task import Task
 from taskcoachlib.domain.effort import Effort
+from taskcoachlib.changes import ChangeMonitor
+from taskcoachlib.thirdparty.guid import generate
 
 from taskcoachlib.i18n import _
 
 from twisted.internet.protocol import Protocol, ServerFactory
 from twisted.internet.error import CannotListenError
 
-import wx, struct, random, time, hashlib, io, socket, os
+import wx, struct, random, time, hashlib, io, socket, os, collections
 
 # Default port is 8001.
 #
@@ -277,7 +279,7 @@ class CompositeItem(BaseItem):
         if len(self._items) == 1:
             return self._items[0].pack(values[0])
         else:
-            return "".join(
+            return b"".join(
                 [self._items[idx].pack(v) for idx, v in enumerate(values)]
             )
 
@@ -335,7 +337,7 @@ class ListItem(BaseItem):
             self._item.feed(data)
 
     def pack(self, value):
-        return struct.pack("!i", len(value)) + "".join(
+        return struct.pack("!i", len(value)) + b"".join(
             [self._item.pack(v) for v in value]
         )
 
@@ -416,6 +418,10 @@ class ItemParser(object):
 
 
 class State(object):
+    # Parsed items used for packing, per format. Packing does not depend
+    # on the parsing state of an item, so they can be shared.
+    _packers = {}
+
     def __init__(self, disp):
         super().__init__()
 
@@ -425,7 +431,7 @@ class State(object):
         self.__format = format
         self.__count = count
 
-        self.__data = io.StringIO()
+        self.__data = io.BytesIO()
 
         if format is None:
             self.__item = None
@@ -454,7 +460,7 @@ class State(object):
     def found_terminator(self):
         if self.__format is not None:
             self.__item.feed(self.__data.getvalue())
-            self.__data = io.StringIO()
+            self.__data = io.BytesIO()
 
             length = self.__item.expect()
             if length is None:
@@ -475,7 +481,16 @@ class State(object):
     def pack(self, format, *values):  # pylint: disable=W0622
         """Send a value."""
 
-        self.__disp.push(ItemParser().parse(format).pack(*values))
+        self.__disp.push(self.packed(format, *values))
+
+    def packed(self, format, *values):  # pylint: disable=W0622
+        """Return the bytes for a value, without sending them."""
+
+        try:
+            packer = self._packers[format]
+        except KeyError:
+            packer = self._packers[format] = ItemParser().parse(format)
+        return packer.pack(*values)
 
     def handleClose(self):
         pass
@@ -487,41 +502,243 @@ class State(object):
         raise NotImplementedError
 
 
+class ObjectMap(object):
+    """Maps ids to the objects of a domain collection, like a dict built
+    from the collection would, but without enumerating the collection up
+    front. Objects set or popped only affect the map, not the
+    collection."""
+
+    def __init__(self, collection):
+        super().__init__()
+
+        self.__collection = collection
+        self.__objectsById = None
+        self.__added = dict()
+        self.__removed = set()
+
+    def __lookup(self, id_):
+        try:
+            getObjectById = self.__collection.getObjectById
+        except AttributeError:
+            # Not all collections are indexed by id; index them on first use
+            if self.__objectsById is None:
+                self.__objectsById = dict(
+                    [(obj.id(), obj) for obj in self.__collection]
+                )
+            return self.__objectsById[id_]
+        try:
+            return getObjectById(id_)
+        except IndexError:
+            raise KeyError(id_)
+
+    def __getitem__(self, id_):
+        if id_ in self.__removed:
+            raise KeyError(id_)
+        try:
+            return self.__added[id_]
+        except KeyError:
+            return self.__lookup(id_)
+
+    def __setitem__(self, id_, obj):
+        self.__removed.discard(id_)
+        self.__added[id_] = obj
+
+    def __contains__(self, id_):
+        try:
+            self[id_]
+        except KeyError:
+            return False
+        return True
+
+    def pop(self, id_):
+        obj = self[id_]
+        self.__added.pop(id_, None)
+        self.__removed.add(id_)
+        return obj
+
+
+class DeviceChanges(object):
+    """Keeps track of the changes made on the desktop since the last
+    synchronization with a device, so that the next synchronization only
+    needs to send those. A synchronization token identifies the state
+    the device has; it changes with every synchronization and is only
+    valid once the device has acknowledged it."""
+
+    monitoredClasses = (Category, Task, Effort)
+
+    def __init__(self, taskFile, syncCompleted):
+        super().__init__()
+
+        self.__taskFileGuid = taskFile.guid()
+        self.__syncCompleted = syncCompleted
+        self.__token = None
+        self.__pendingToken = generate()
+        # Tasks not sent to the device; their efforts have to be sent
+        # along when they are sent after all.
+        self.__hiddenTasks = set()
+        self.__collections = [taskFile.categories(), taskFile.tasks()]
+        self.__monitor = ChangeMonitor()
+        for collection in self.__collections:
+            self.__monitor.monitorCollection(collection)
+        for domainClass in self.monitoredClasses:
+            self.__monitor.monitorClass(domainClass)
+        for obj in taskFile.categories():
+            self.__monitor.setChanges(obj.id(), set())
+        for task in taskFile.tasks():
+            self.__monitor.setChanges(task.id(), set())
+            if not self.isTaskSynced(task):
+                self.__hiddenTasks.add(task.id())
+        for effort in taskFile.efforts():
+            self.__monitor.setChanges(effort.id(), set())
+
+    def stop(self):
+        for collection in self.__collections:
+            self.__monitor.unmonitorCollection(collection)
+        for domainClass in self.monitoredClasses:
+            self.__monitor.unmonitorClass(domainClass)
+
+    def isTaskSynced(self, task):
+        return not task.isDeleted() and (
+            self.__syncCompleted or not task.completed()
+        )
+
+    def matches(self, token, taskFile, syncCompleted):
+        """Return whether the device with the given token can be sent the
+        changes only."""
+        return (
+            self.__token is not None
+            and token == self.__token
+            and taskFile.guid() == self.__taskFileGuid
+            and syncCompleted == self.__syncCompleted
+        )
+
+    def changes(self, taskFile):
+        """Return the categories, tasks and efforts to send to the device
+        and the ids of the objects to delete from it. Afterwards, the
+        changes start over and the current token is no longer valid."""
+        changedIds, newIds, deletedIds = [], set(), []
+        for id_, names in self.__monitor.allChanges().items():
+            if names is None:
+                changedIds.append(id_)
+                newIds.add(id_)
+            elif "__del__" in names:
+                deletedIds.append(id_)
+            elif names:
+                changedIds.append(id_)
+        self.__hiddenTasks.difference_update(deletedIds)
+
+        remainingIds = set(changedIds)
+        categories = []
+        for category in taskFile.categories().getObjectsByIds(changedIds):
+            remainingIds.discard(category.id())
+            if category.isDeleted():
+                deletedIds.append(category.id())
+            else:
+                categories.append(category)
+
+        tasks, efforts = [], dict()
+        for task in taskFile.tasks().getObjectsByIds(changedIds):
+            remainingIds.discard(task.id())
+            if not self.isTaskSynced(task):
+                deletedIds.append(task.id())
+                self.__hiddenTasks.add(task.id())
+                continue
+            tasks.append(task)
+            if task.id() in newIds or task.id() in self.__hiddenTasks:
+                self.__hiddenTasks.discard(task.id())
+                for effort in task.efforts():
+                    efforts[effort.id()] = effort
+
+        if remainingIds:
+            # Efforts are not indexed by id, so look for the changed ones
+            for effort in taskFile.efforts():
+                if effort.id() in remainingIds and (
+                    effort.task() is None or self.isTaskSynced(effort.task())
+                ):
+                    efforts[effort.id()] = effort
+
+        self.__monitor.resetAllChanges()
+        for effortId in efforts:
+            self.__monitor.setChanges(effortId, set())
+        self.__token = None
+        self.__pendingToken = generate()
+
+        # Parents have to be sent before their children
+        categories.sort(key=lambda category: len(category.ancestors()))
+        tasks.sort(key=lambda task: len(task.ancestors()))
+        return categories, tasks, list(efforts.values()), deletedIds
+
+    def pendingToken(self):
+        return self.__pendingToken
+
+    def commit(self):
+        """The device acknowledged the pending token."""
+        self.__token = self.__pendingToken
+
+
 ###############################################################################
 # Actual protocol
 
 _PROTOVERSION = 5
 
+# From this version on, objects sent to the device are pipelined in
+# batches. Only offer it once the device app supports it.
+_PIPELINED_PROTOVERSION = 6
+
+# From this version on, the device presents the token of its last
+# synchronization and is only sent the changes made since then.
+_DELTA_PROTOVERSION = 7
+
 
 class IPhoneHandler(Protocol):
+    protocolVersion = _PROTOVERSION
+
     def __init__(self):
         self.state = None
-        self.__buffer = ""
+        # Received data is appended to the buffer and consumed from the
+        # offset on; the consumed part is only dropped once it makes up
+        # at least half of the buffer, so each byte is moved a constant
+        # number of times on average.
+        self.__buffer = bytearray()
+        self.__offset = 0
         self.__expecting = None
+        self.__flushing = False
         random.seed(time.time())
 
     def connectionMade(self):
         self.transport.socket.setsockopt(socket.SOL_TCP, socket.TCP_NODELAY, 1)
         self.state = BaseState(self)
-        self.state.setState(InitialState, _PROTOVERSION)
+        self.state.setState(InitialState, self.protocolVersion)
 
     def log(self, msg, *args):
         if self.state.ui is not None:
             self.state.ui.AddLogLine(msg % args)
 
     def _flush(self):
-        while (
-            self.__expecting is not None
-            and len(self.__buffer) >= self.__expecting
-        ):
-            data = self.__buffer[: self.__expecting]
-            self.__buffer = self.__buffer[self.__expecting :]
-            self.state.collect_incoming_data(data)
-            self.state.found_terminator()
+        # The state sets the next terminator while handling the data, so
+        # don't recurse for every item found in a large buffer.
+        self.__flushing = True
+        try:
+            while (
+                self.__expecting is not None
+                and len(self.__buffer) - self.__offset >= self.__expecting
+            ):
+                start = self.__offset
+                self.__offset += self.__expecting
+                with memoryview(self.__buffer) as view:
+                    data = view[start : self.__offset].tobytes()
+                self.state.collect_incoming_data(data)
+                self.state.found_terminator()
+        finally:
+            self.__flushing = False
+        if self.__offset and 2 * self.__offset >= len(self.__buffer):
+            del self.__buffer[: self.__offset]
+            self.__offset = 0
 
     def set_terminator(self, terminator):
         self.__expecting = terminator
-        self._flush()
+        if not self.__flushing:
+            self._flush()
 
     def close_when_done(self):
         # XXX: without this delay, the other side sometimes doesn't "notice" the socket has been
@@ -531,7 +748,7 @@ class IPhoneHandler(Protocol):
         reactor.callLater(0.5, self.transport.loseConnection)
 
     def dataReceived(self, data):
-        self.__buffer += data
+        self.__buffer.extend(data)
         self._flush()
 
     def connectionLost(self, reason):
@@ -550,6 +767,7 @@ class IPhoneAcceptor(ServerFactory):
         self.window = window
         self.settings = settings
         self.iocontroller = iocontroller
+        self.devices = dict()  # {device name: DeviceChanges}
 
         for port in range(4096, 8192):
             try:
@@ -570,6 +788,7 @@ class IPhoneAcceptor(ServerFactory):
             protocol.window = self.window
             protocol.settings = self.settings
             protocol.iocontroller = self.iocontroller
+            protocol.devices = self.devices
             return protocol
 
         wx.MessageBox(
@@ -587,6 +806,9 @@ class IPhoneAcceptor(ServerFactory):
     def close(self):
         self.__listening.stopListening()
         self.__listening = None
+        for deviceChanges in self.devices.values():
+            deviceChanges.stop()
+        self.devices.clear()
 
 
 class BaseState(State):  # pylint: disable=W0223
@@ -648,7 +870,7 @@ class InitialState(BaseState):
 
         super().init("i", 1)
 
-        if self.version == _PROTOVERSION:
+        if self.version == self.disp().protocolVersion:
             self.ui = self.disp().window.createIPhoneProgressFrame()
             self.ui.Started()
 
@@ -677,7 +899,7 @@ class PasswordState(BaseState):
     def init(self):
         super().init("20b", 1)
 
-        self.hashData = "".join(
+        self.hashData = b"".join(
             [struct.pack("B", random.randint(0, 255)) for dummy in range(512)]
         )
         self.pack("20b", self.hashData)
@@ -772,6 +994,22 @@ class DayHoursState(BaseState):
         )
 
     def handleNewObject(self, response):  # pylint: disable=W0613
+        if self.version < _DELTA_PROTOVERSION:
+            self.setState(TwoWayState)
+        else:
+            self.setState(SyncTokenState)
+
+    def finished(self):
+        pass
+
+
+class SyncTokenState(BaseState):
+    def init(self):
+        super().init("z", 1)
+
+    def handleNewObject(self, token):
+        self.disp().log(_("Synchronization token: %s"), token)
+        self.syncToken = token
         self.setState(TwoWayState)
 
     def finished(self):
@@ -780,6 +1018,75 @@ class DayHoursState(BaseState):
 
 class FullFromDesktopState(BaseState):
     def init(self):
+        self.deletedIds = []
+
+        if self.version < _DELTA_PROTOVERSION:
+            self.initFull()
+        else:
+            full = not self.initChanges()
+            if full:
+                self.initFull()
+
+        if self.version >= _DELTA_PROTOVERSION:
+            self.pack(
+                "iiiii",
+                full,
+                len(self.categories),
+                len(self.tasks),
+                len(self.efforts),
+                len(self.deletedIds),
+            )
+            self.total = (
+                len(self.categories)
+                + len(self.tasks)
+                + len(self.efforts)
+                + len(self.deletedIds)
+            )
+        elif self.version >= 4:
+            self.pack(
+                "iii", len(self.categories), len(self.tasks), len(self.efforts)
+            )
+            self.total = (
+                len(self.categories) + len(self.tasks) + len(self.efforts)
+            )
+        else:
+            self.pack("ii", len(self.categories), len(self.tasks))
+            self.total = len(self.categories) + len(self.tasks)
+
+        self.count = 0
+
+        self.setState(FullFromDesktopCategoryState)
+
+    def initChanges(self):
+        """Prepare sending the changes since the last synchronization
+        with the device. Return False if the device has to be sent
+        everything instead."""
+
+        taskFile = self.disp().window.taskFile
+        devices = self.disp().devices
+        deviceChanges = devices.get(self.deviceName)
+
+        if deviceChanges is not None and deviceChanges.matches(
+            self.syncToken, taskFile, self.syncCompleted
+        ):
+            self.disp().log(_("Changes from desktop."))
+            (
+                self.categories,
+                self.tasks,
+                self.efforts,
+                self.deletedIds,
+            ) = deviceChanges.changes(taskFile)
+            self.deviceChanges = deviceChanges
+            return True
+
+        if deviceChanges is not None:
+            deviceChanges.stop()
+        self.deviceChanges = devices[self.deviceName] = DeviceChanges(
+            taskFile, self.syncCompleted
+        )
+        return False
+
+    def initFull(self):
         self.disp().log(_("Full from desktop."))
 
         if self.version >= 4:
@@ -840,130 +1147,147 @@ class FullFromDesktopState(BaseState):
             ]
         )
 
-        if self.version >= 4:
-            self.pack(
-                "iii", len(self.categories), len(self.tasks), len(self.efforts)
-            )
-            self.total = (
-                len(self.categories) + len(self.tasks) + len(self.efforts)
-            )
-        else:
-            self.pack("ii", len(self.categories), len(self.tasks))
-            self.total = len(self.categories) + len(self.tasks)
 
-        self.count = 0
-
-        self.setState(FullFromDesktopCategoryState)
+class FullFromDesktopObjectState(BaseState):  # pylint: disable=W0223
+    """Sends objects to the device and waits for it to acknowledge them.
+    Up to version 5 of the protocol, an object is only sent once the
+    previous one has been acknowledged. From version 6 on, objects are
+    sent in batches, each preceded by its number of objects and
+    acknowledged with a single integer, and up to windowSize batches
+    are in flight at any time."""
 
+    batchSize = 100
+    windowSize = 4
 
-class FullFromDesktopCategoryState(BaseState):
-    def init(self):
-        super().init("i", len(self.categories))
+    def init(self, objects):
+        self.__objects = objects
+        self.__position = 0
+        self.__batches = collections.deque()
 
-        self.disp().log(_("%d categories"), len(self.categories))
+        pipelined = self.version >= _PIPELINED_PROTOVERSION
+        if pipelined:
+            batchCount = (len(objects) + self.batchSize - 1) // self.batchSize
+            super().init("i", batchCount)
+        else:
+            super().init("i", len(objects))
 
-        if self.categories:
-            self.sendObject()
+        if objects:
+            for dummy in range(self.windowSize if pipelined else 1):
+                self.sendObjects()
 
-    def sendObject(self):
-        if self.categories:
-            category = self.categories.pop(0)
-            self.disp().log(_("Send category %s"), category.id())
-            self.pack(
-                "ssz",
-                category.subject(),
-                category.id(),
-                None if category.parent() is None else category.parent().id(),
-            )
+    def sendObjects(self):
+        if self.__position < len(self.__objects):
+            if self.version >= _PIPELINED_PROTOVERSION:
+                batch = self.__objects[
+                    self.__position : self.__position + self.batchSize
+                ]
+                self.disp().push(
+                    self.packed("i", len(batch))
+                    + b"".join([self.packObject(obj) for obj in batch])
+                )
+            else:
+                batch = self.__objects[self.__position : self.__position + 1]
+                self.disp().push(self.packObject(batch[0]))
+            self.__position += len(batch)
+            self.__batches.append(len(batch))
 
     def handleNewObject(self, code):
         self.disp().log(_("Response: %d"), code)
-        self.count += 1
+        self.count += self.__batches.popleft()
         self.ui.SetProgress(self.count, self.total)
-        self.sendObject()
+        self.sendObjects()
+
+    def packObject(self, obj):
+        """Return the bytes to send for a single object."""
+
+        raise NotImplementedError
+
+
+class FullFromDesktopCategoryState(FullFromDesktopObjectState):
+    def init(self):
+        self.disp().log(_("%d categories"), len(self.categories))
+
+        super().init(self.categories)
+
+    def packObject(self, category):
+        self.disp().log(_("Send category %s"), category.id())
+        return self.packed(
+            "ssz",
+            category.subject(),
+            category.id(),
+            None if category.parent() is None else category.parent().id(),
+        )
 
     def finished(self):
         self.setState(FullFromDesktopTaskState)
 
 
-class FullFromDesktopTaskState(BaseState):
+class FullFromDesktopTaskState(FullFromDesktopObjectState):
     def init(self):
-        super().init("i", len(self.tasks))
-
         self.disp().log(_("%d tasks"), len(self.tasks))
 
-        if self.tasks:
-            self.sendObject()
-
-    def sendObject(self):
-        if self.tasks:
-            task = self.tasks.pop(0)
-            self.disp().log(_("Send task %s"), task.id())
-            if self.version < 4:
-                self.pack(
-                    "sssddd[s]",
-                    task.subject(),
-                    task.id(),
-                    task.description(),
-                    task.plannedStartDateTime().date(),
-                    task.dueDateTime().date(),
-                    task.completionDateTime().date(),
-                    [category.id() for category in task.categories()],
-                )
-            elif self.version < 5:
-                self.pack(
-                    "sssdddz[s]",
-                    task.subject(),
-                    task.id(),
-                    task.description(),
-                    task.plannedStartDateTime().date(),
-                    task.dueDateTime().date(),
-                    task.completionDateTime().date(),
-                    task.parent().id() if task.parent() is not None else None,
-                    [category.id() for category in task.categories()],
-                )
-            else:
-                hasRecurrence = (
-                    task.recurrence() is not None
-                    and task.recurrence().unit != ""
-                )
-                if hasRecurrence:
-                    recPeriod = {
-                        "daily": 0,
-                        "weekly": 1,
-                        "monthly": 2,
-                        "yearly": 3,
-                    }[task.recurrence().unit]
-                    recRepeat = task.recurrence().amount
-                    recSameWeekday = task.recurrence().sameWeekday
-                else:
-                    recPeriod = 0
-                    recRepeat = 0
-                    recSameWeekday = 0
-
-                self.pack(
-                    "sssffffziiiii[s]",
-                    task.subject(),
-                    task.id(),
-                    task.description(),
-                    task.plannedStartDateTime(),
-                    task.dueDateTime(),
-                    task.completionDateTime(),
-                    task.reminder(),
-                    task.parent().id() if task.parent() is not None else None,
-                    task.priority(),
-                    hasRecurrence,
-                    recPeriod,
-                    recRepeat,
-                    recSameWeekday,
-                    [category.id() for category in task.categories()],
-                )
+        super().init(self.tasks)
 
-    def handleNewObject(self, code):
-        self.disp().log(_("Response: %d"), code)
-        self.count += 1
-        self.ui.SetProgress(self.count, self.total)
-        self.sendObject()
+    def packObject(self, task):
+        self.disp().log(_("Send task %s"), task.id())
+        if self.version < 4:
+            return self.packed(
+                "sssddd[s]",
+                task.subject(),
+                task.id(),
+                task.description(),
+                task.plannedStartDateTime().date(),
+                task.dueDateTime().date(),
+                task.completionDateTime().date(),
+                [category.id() for category in task.categories()],
+            )
+        elif self.version < 5:
+            return self.packed(
+                "sssdddz[s]",
+                task.subject(),
+                task.id(),
+                task.description(),
+                task.plannedStartDateTime().date(),
+                task.dueDateTime().date(),
+                task.completionDateTime().date(),
+                task.parent().id() if task.parent() is not None else None,
+                [category.id() for category in task.categories()],
+            )
+        else:
+            hasRecurrence = (
+                task.recurrence() is not None and task.recurrence().unit != ""
+            )
+            if hasRecurrence:
+                recPeriod = {
+                    "daily": 0,
+                    "weekly": 1,
+                    "monthly": 2,
+                    "yearly": 3,
+                }[task.recurrence().unit]
+                recRepeat = task.recurrence().amount
+                recSameWeekday = task.recurrence().sameWeekday
+            else:
+                recPeriod = 0
+                recRepeat = 0
+                recSameWeekday = 0
+
+            return self.packed(
+                "sssffffziiiii[s]",
+                task.subject(),
+                task.id(),
+                task.description(),
+                task.plannedStartDateTime(),
+                task.dueDateTime(),
+                task.completionDateTime(),
+                task.reminder(),
+                task.parent().id() if task.parent() is not None else None,
+                task.priority(),
+                hasRecurrence,
+                recPeriod,
+                recRepeat,
+                recSameWeekday,
+                [category.id() for category in task.categories()],
+            )
 
     def finished(self):
         if self.version >= 4:
@@ -972,36 +1296,28 @@ class FullFromDesktopTaskState(BaseState):
             self.setState(SendGUIDState)
 
 
-class FullFromDesktopEffortState(BaseState):
+class FullFromDesktopEffortState(FullFromDesktopObjectState):
     def init(self):
-        super().init("i", len(self.efforts))
-
         self.disp().log(_("%d efforts"), len(self.efforts))
 
-        if self.efforts:
-            self.sendObject()
-
-    def sendObject(self):
-        if self.efforts:
-            effort = self.efforts.pop(0)
-            self.disp().log(_("Send effort %s"), effort.id())
-            self.pack(
-                "ssztt",
-                effort.id(),
-                effort.subject(),
-                effort.task().id() if effort.task() is not None else None,
-                effort.getStart(),
-                effort.getStop(),
-            )
-
-    def handleNewObject(self, code):  # pylint: disable=W0613
-        self.count += 1
-        self.ui.SetProgress(self.count, self.total)
-        self.sendObject()
+        super().init(self.efforts)
+
+    def packObject(self, effort):
+        self.disp().log(_("Send effort %s"), effort.id())
+        return self.packed(
+            "ssztt",
+            effort.id(),
+            effort.subject(),
+            effort.task().id() if effort.task() is not None else None,
+            effort.getStart(),
+            effort.getStop(),
+        )
 
     def finished(self):
         if self.version < 5:
             self.setState(SendGUIDState)
+        elif self.version >= _DELTA_PROTOVERSION:
+            self.setState(FullFromDesktopDeletedState)
         else:
             self.disp().log(_("Finished."))
             self.disp().close_when_done()
@@ -1012,6 +1328,43 @@ class FullFromDesktopEffortState(BaseState):
             super().handleClose()
 
 
+class FullFromDesktopDeletedState(FullFromDesktopObjectState):
+    def init(self):
+        self.disp().log(_("%d deleted objects"), len(self.deletedIds))
+
+        super().init(self.deletedIds)
+
+    def packObject(self, id_):
+        self.disp().log(_("Delete object %s"), id_)
+        return self.packed("s", id_)
+
+    def finished(self):
+        self.setState(SendSyncTokenState)
+
+    def handleClose(self):
+        pass
+
+
+class SendSyncTokenState(BaseState):
+    def init(self):
+        super().init("i", 1)
+
+        token = self.deviceChanges.pendingToken()
+        self.disp().log(_("Sending synchronization token: %s"), token)
+        self.pack("s", token)
+
+    def handleNewObject(self, code):  # pylint: disable=W0613
+        self.deviceChanges.commit()
+
+    def finished(self):
+        self.disp().log(_("Finished."))
+        self.disp().close_when_done()
+        self.ui.Finished()
+
+    def handleClose(self):
+        pass
+
+
 class FullFromDeviceState(BaseState):
     def init(self):
         self.disp().window.clearTasks()
@@ -1102,21 +1455,9 @@ class FullFromDeviceTaskState(BaseState):
 
 class TwoWayState(BaseState):
     def init(self):
-        self.categoryMap = dict(
-            [
-                (category.id(), category)
-                for category in self.disp().window.taskFile.categories()
-            ]
-        )
-        self.taskMap = dict(
-            [(task.id(), task) for task in self.disp().window.taskFile.tasks()]
-        )
-        self.effortMap = dict(
-            [
-                (effort.id(), effort)
-                for effort in self.disp().window.taskFile.efforts()
-            ]
-        )
+        self.categoryMap = ObjectMap(self.disp().window.taskFile.categories())
+        self.taskMap = ObjectMap(self.disp().window.taskFile.tasks())
+        self.effortMap = ObjectMap(self.disp().window.taskFile.efforts())
 
         if self.version < 3:
             super().init("iiii", 1)
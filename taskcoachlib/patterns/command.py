@@ -16,15 +16,49 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
+import datetime
+import os
+import pickle
+import sys
+import tempfile
 from . import singleton as patterns
 
 
+def sizeOf(value):
+    """Estimate the number of bytes used by value, including the built-in
+    containers (lists, tuples, dicts and sets) it refers to. Other objects
+    are only counted by their own size, so the domain objects a command
+    refers to don't count towards the size of the command."""
+    containers = (list, tuple, dict, set, frozenset)
+    seen = set()
+    values = [value]
+    size = 0
+    while values:
+        value = values.pop()
+        if id(value) in seen:
+            continue
+        seen.add(id(value))
+        size += sys.getsizeof(value)
+        if type(value) is dict:
+            values.extend(value.keys())
+            values.extend(value.values())
+        elif type(value) in containers:
+            values.extend(value)
+    return size
+
+
 class Command(object):
     def __init__(self, *args, **kwargs):
         super().__init__()  # object.__init__ takes no arguments
 
     def do(self):
-        CommandHistory().append(self)
+        history = CommandHistory()
+        history.append(self)
+        self.do_command()
+        history.done(self)
+
+    def do_command(self):
+        """Do the actual work of the command. Override in subclass."""
 
     def undo(self):
         pass
@@ -32,24 +66,228 @@ class Command(object):
     def redo(self):
         pass
 
+    def compact(self):
+        """Drop information that was needed while the command was being done
+        but not for undoing or redoing it. Called by the command history
+        right after the command has been done."""
+        try:
+            compact = super().compact
+        except AttributeError:
+            return  # No 'compact' in any super class
+        compact()
+
+    def size(self):
+        """Return an estimate of the number of bytes this command keeps in
+        memory to be able to undo and redo itself."""
+        return sizeOf(self.__dict__)
+
     def __str__(self):
         return "command"
 
 
+class CommandJournal(object):
+    """Keeps the attributes of commands in a temporary file, so commands
+    that no longer fit in memory can still be undone. Values (strings,
+    numbers, dates and times, and built-in containers) are written to the
+    file, so containers are copied when a command is restored. Other
+    objects, such as the domain objects the commands refer to, are kept by
+    reference."""
+
+    valueTypes = (str, bytes, int, float, complex, bool, type(None))
+    containerTypes = (list, tuple, dict, set, frozenset)
+
+    def __init__(self):
+        self.__file = None
+        self.__entries = dict()  # (offset, references) by command
+
+    def __contains__(self, command):
+        return command in self.__entries
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def store(self, command):
+        """Move the attributes of the command to the journal. Returns False
+        if the attributes can't be stored."""
+        if self.__file is None:
+            self.__file = tempfile.TemporaryFile()
+        self.__file.seek(0, os.SEEK_END)
+        offset = self.__file.tell()
+        references = []
+        try:
+            self.__pickler(references).dump(command.__dict__)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            self.__file.truncate(offset)
+            return False
+        self.__entries[command] = (offset, references)
+        command.__dict__.clear()
+        return True
+
+    def restore(self, command):
+        """Move the attributes of the command back from the journal."""
+        offset, references = self.__entries.pop(command)
+        self.__file.seek(offset)
+        command.__dict__.update(self.__unpickler(references).load())
+        if not self.__entries:
+            self.clear()
+
+    def discard(self, command):
+        self.__entries.pop(command, None)
+        if not self.__entries:
+            self.clear()
+
+    def clear(self):
+        self.__entries.clear()
+        if self.__file is not None:
+            self.__file.close()
+            self.__file = None
+
+    def nrBytes(self):
+        """Return the size of the journal file."""
+        if self.__file is None:
+            return 0
+        self.__file.seek(0, os.SEEK_END)
+        return self.__file.tell()
+
+    def __pickler(self, references):
+        pickler = pickle.Pickler(self.__file, pickle.HIGHEST_PROTOCOL)
+        valueTypes = self.valueTypes + self.containerTypes
+
+        def persistent_id(value):
+            if type(value) in valueTypes or isinstance(
+                value, (datetime.date, datetime.time, datetime.timedelta)
+            ):
+                return None
+            references.append(value)
+            return len(references) - 1
+
+        pickler.persistent_id = persistent_id
+        return pickler
+
+    def __unpickler(self, references):
+        unpickler = pickle.Unpickler(self.__file)
+        unpickler.persistent_load = references.__getitem__
+        return unpickler
+
+
 class CommandHistory(object, metaclass=patterns.Singleton):
+    # When more commands than this are in memory (0 means no limit), or the
+    # commands in memory use more bytes than this, the oldest commands are
+    # moved to the journal or, without journal, forgotten:
+    defaultMaxDepth = 0
+    defaultMaxBytes = 64 * 1024 * 1024
+
     def __init__(self):
         self.__history = []
         self.__future = []
+        self.__sizes = dict()  # Size of done commands, by command
+        self.__nrBytes = 0
+        self.__maxDepth = self.defaultMaxDepth
+        self.__maxBytes = self.defaultMaxBytes
+        self.__journal = None
+        # The oldest commands of the history are in the journal:
+        self.__nrCommandsInJournal = 0
 
     def append(self, command):
         self.__history.append(command)
+        for futureCommand in self.__future:
+            self.__forget(futureCommand)
         del self.__future[:]
+        self.__limitMemoryUse()
+
+    def done(self, command):
+        """Compact the command, now that it has been done, and remember its
+        size. Until then, the command may still change (for example
+        because it does other commands), so it is kept in memory."""
+        if command not in self.__sizes:
+            command.compact()
+            self.__sizes[command] = command.size()
+            self.__nrBytes += self.__sizes[command]
+        self.__limitMemoryUse()
+
+    def __forget(self, command):
+        self.__nrBytes -= self.__sizes.pop(command, 0)
+
+    def __limitMemoryUse(self):
+        # Keep the most recent command in memory, so it can always be
+        # undone:
+        while (
+            self.__isOverLimit()
+            and self.__nrCommandsInJournal < len(self.__history) - 1
+        ):
+            oldest = self.__history[self.__nrCommandsInJournal]
+            if oldest not in self.__sizes:
+                break  # Still being done
+            self.__forget(oldest)
+            if self.__journal is not None and self.__journal.store(oldest):
+                self.__nrCommandsInJournal += 1
+            else:
+                # Commands can only be undone in order, so forget the
+                # commands in the journal as well:
+                for command in self.__history[: self.__nrCommandsInJournal]:
+                    self.__journal.discard(command)
+                del self.__history[: self.__nrCommandsInJournal + 1]
+                self.__nrCommandsInJournal = 0
+
+    def __isOverLimit(self):
+        nrCommandsInMemory = len(self.__history) - self.__nrCommandsInJournal
+        return (
+            0 < self.__maxDepth < nrCommandsInMemory
+            or self.__nrBytes > self.__maxBytes
+        )
+
+    def nrBytes(self):
+        """Return an estimate of the memory used by the commands in the
+        history and the future."""
+        return self.__nrBytes
+
+    def setMaxBytes(self, maxBytes):
+        self.__maxBytes = maxBytes
+        self.__limitMemoryUse()
+
+    def setMaxDepth(self, maxDepth):
+        self.__maxDepth = maxDepth
+        self.__limitMemoryUse()
+
+    def setJournal(self, journal):
+        """Use the journal to keep commands that don't fit in memory. Pass
+        None to forget those commands instead."""
+        if self.__journal is not None:
+            del self.__history[: self.__nrCommandsInJournal]
+            self.__nrCommandsInJournal = 0
+            self.__journal.clear()
+        self.__journal = journal
+
+    def statistics(self):
+        """Return the number of commands and the (estimated) number of bytes
+        they use, in memory and in the journal."""
+        nrCommandsInJournal = self.__nrCommandsInJournal
+        return dict(
+            nrCommands=len(self.__history) + len(self.__future),
+            nrCommandsInMemory=len(self.__history)
+            + len(self.__future)
+            - nrCommandsInJournal,
+            nrCommandsInJournal=nrCommandsInJournal,
+            nrBytesInMemory=self.__nrBytes,
+            nrBytesInJournal=self.__journal.nrBytes() if self.__journal else 0,
+        )
 
     def undo(self):
         if self.__history:
             command = self.__history.pop()
             command.undo()
             self.__future.append(command)
+            self.__restoreMostRecentCommand()
+
+    def __restoreMostRecentCommand(self):
+        """Make sure the most recent command is in memory, so it can be
+        undone and its name can be shown."""
+        if self.__nrCommandsInJournal == len(self.__history) > 0:
+            command = self.__history[-1]
+            self.__journal.restore(command)
+            self.__nrCommandsInJournal -= 1
+            self.__sizes[command] = command.size()
+            self.__nrBytes += self.__sizes[command]
 
     def redo(self):
         if self.__future:
@@ -60,6 +298,11 @@ class CommandHistory(object, metaclass=patterns.Singleton):
     def clear(self):
         del self.__history[:]
         del self.__future[:]
+        self.__sizes.clear()
+        self.__nrBytes = 0
+        self.__nrCommandsInJournal = 0
+        if self.__journal is not None:
+            self.__journal.clear()
 
     def hasHistory(self):
         return self.__history
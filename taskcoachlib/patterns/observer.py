@@ -17,6 +17,7 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
 from . import singleton
+import contextlib
 import functools
 from pubsub import pub
 
@@ -75,6 +76,17 @@ class Event(object):
             if type is None
             else {type: {} if source is None else {source: values}}
         )
+        self.__shared = False
+
+    @classmethod
+    def _view(class_, sourcesAndValuesByType):
+        """Create an event that shares its data with another event. The data
+        is only copied when the event is changed, so views are cheap to
+        create and can be passed to multiple observers."""
+        event = class_()
+        event.__sourcesAndValuesByType = sourcesAndValuesByType
+        event.__shared = True
+        return event
 
     def __repr__(self):  # pragma: no cover
         return "Event(%s)" % (self.__sourcesAndValuesByType)
@@ -89,15 +101,22 @@ class Event(object):
         and values are added for a random type, i.e. only omit the type if
         the event has only one type."""
         eventType = kwargs.pop("type", self.type())
-        currentValues = set(
-            self.__sourcesAndValuesByType.setdefault(eventType, {}).setdefault(
-                source, tuple()
+        if self.__shared:
+            self.__sourcesAndValuesByType = dict(
+                (type, dict(sourcesAndValues))
+                for type, sourcesAndValues in list(
+                    self.__sourcesAndValuesByType.items()
+                )
             )
+            self.__shared = False
+        sourcesAndValues = self.__sourcesAndValuesByType.setdefault(
+            eventType, {}
         )
-        currentValues |= set(values)
-        self.__sourcesAndValuesByType.setdefault(eventType, {})[source] = (
-            tuple(currentValues)
-        )
+        currentValues = sourcesAndValues.get(source)
+        if currentValues is None:
+            sourcesAndValues[source] = tuple(set(values))
+        elif values:
+            sourcesAndValues[source] = tuple(set(currentValues) | set(values))
 
     def type(self):
         """Return the event type. If there are multiple event types, this
@@ -144,21 +163,24 @@ class Event(object):
 
     def subEvent(self, *typesAndSources):
         """Create a new event that contains a subset of the data of this
-        event."""
-        subEvent = self.__class__()
+        event. The new event shares its data with this event until one of
+        them is changed."""
+        sourcesAndValuesByType = {}
         for type, source in typesAndSources:
-            sourcesToAdd = self.sources(type)
-            if source is not None:
-                # Make sure source is actually in self.sources(type):
-                sourcesToAdd &= set([source])
-            kwargs = dict(
-                type=type
-            )  # Python doesn't allow type=type after *values
-            for eachSource in sourcesToAdd:
-                subEvent.addSource(
-                    eachSource, *self.values(eachSource, type), **kwargs
-                )  # pylint: disable=W0142
-        return subEvent
+            sourcesAndValues = self.__sourcesAndValuesByType.get(type)
+            if not sourcesAndValues:
+                continue
+            if source is None:
+                sourcesAndValuesByType[type] = sourcesAndValues
+            elif source in sourcesAndValues:
+                subset = sourcesAndValuesByType.get(type)
+                if subset is sourcesAndValues:
+                    continue  # All sources of this type are included already
+                if subset is None:
+                    subset = sourcesAndValuesByType[type] = {}
+                subset[source] = sourcesAndValues[source]
+        self.__shared = True
+        return self._view(sourcesAndValuesByType)
 
     def send(self):
         """Send this event to observers of the type(s) of this event."""
@@ -264,11 +286,17 @@ class Publisher(object, metaclass=singleton.Singleton):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        self.__batchDepth = 0
+        self.__batchedEvents = []  # [Event, ...] in order of sending
+        # Batched events that only notify about new attribute values, by
+        # event types:
+        self.__batchedAttributeEvents = dict()
+        self.__batchedMessages = []  # [(topic, kwargs), ...]
         self.clear()
 
     def clear(self):
         """Clear the registry of observers. Mainly for testing purposes."""
-        # observers = {(eventType, eventSource): set(callbacks)}
+        # observers = {eventType: {eventSource: set(callbacks)}}
         self.__observers = {}  # pylint: disable=W0201
 
     @wrapObserver
@@ -279,8 +307,8 @@ class Publisher(object, metaclass=singleton.Singleton):
         passing a specific eventSource, the observer is only called when the
         event originates from the specified eventSource."""
 
-        observers = self.__observers.setdefault(
-            (eventType, eventSource), set()
+        observers = self.__observers.setdefault(eventType, {}).setdefault(
+            eventSource, set()
         )
         observers.add(observer)
 
@@ -295,73 +323,195 @@ class Publisher(object, metaclass=singleton.Singleton):
         specified, the observer is removed for the combination of that
         specific event type and event source only."""
 
-        # pylint: disable=W0613
-
-        # First, create a match function that will select the combination of
-        # event source and event type we're looking for:
-
-        if eventType and eventSource:
-
-            def match(type, source):
-                return type == eventType and source == eventSource
-
-        elif eventType:
-
-            def match(type, source):
-                return type == eventType
-
-        elif eventSource:
-
-            def match(type, source):
-                return source == eventSource
-
+        # First, select the event types and event sources we're looking for:
+        if eventType:
+            eventTypes = [eventType] if eventType in self.__observers else []
         else:
-
-            def match(type, source):
-                return True
+            eventTypes = list(self.__observers.keys())
 
         # Next, remove observers that are registered for the event source and
-        # event type we're looking for, i.e. that match:
-        matchingKeys = [key for key in self.__observers if match(*key)]
-        for key in matchingKeys:
-            self.__observers[key].discard(observer)
-            if not self.__observers[key]:
-                del self.__observers[key]
+        # event type we're looking for:
+        for type in eventTypes:
+            observersBySource = self.__observers[type]
+            if eventSource:
+                sources = (
+                    [eventSource] if eventSource in observersBySource else []
+                )
+            else:
+                sources = list(observersBySource.keys())
+            for source in sources:
+                observersBySource[source].discard(observer)
+                if not observersBySource[source]:
+                    del observersBySource[source]
+            if not observersBySource:
+                del self.__observers[type]
+
+    def startBatch(self):
+        """Start deferring events and pubsub messages until the matching
+        endBatch. Batches can be nested; only the outermost endBatch
+        delivers the deferred notifications."""
+        self.__batchDepth += 1
+
+    def endBatch(self):
+        """Deliver the events and messages deferred since the outermost
+        startBatch. Events with the same event types are coalesced into one
+        event, so observers are notified at most once per event type and
+        source. Events with different event types are still delivered
+        separately, because observers may expect an event to have the
+        types they are registered for only. Events about items being added
+        or removed are only coalesced with the event sent right before
+        them, so observers see additions and removals in order. For other
+        event types the last value wins. Pubsub messages are delivered in
+        order, because their payload may describe a change rather than a
+        state."""
+        self.__batchDepth -= 1
+        if self.__batchDepth:
+            return
+        events, messages = self.__batchedEvents, self.__batchedMessages
+        self.__batchedEvents, self.__batchedMessages = [], []
+        self.__batchedAttributeEvents = dict()
+        for event in events:
+            self.notifyObservers(event)
+        for topic, kwargs in messages:
+            pub.sendMessage(topic, **kwargs)
+
+    def isBatching(self):
+        return self.__batchDepth > 0
+
+    def sendMessage(self, topic, **kwargs):
+        """Send a pubsub message, or defer it when a batch is open."""
+        if self.__batchDepth:
+            self.__batchedMessages.append((topic, kwargs))
+        else:
+            pub.sendMessage(topic, **kwargs)
+
+    def __addToBatch(self, event):
+        eventTypes = frozenset(event.types())
+        notifiesAboutItems = any(_isItemEventType(type) for type in eventTypes)
+        if notifiesAboutItems:
+            # Keep additions and removals in order:
+            batchedEvent = None
+            if self.__batchedEvents:
+                lastEvent = self.__batchedEvents[-1]
+                if lastEvent.types() == eventTypes:
+                    batchedEvent = lastEvent
+        else:
+            batchedEvent = self.__batchedAttributeEvents.get(eventTypes)
+        if batchedEvent is None:
+            batchedEvent = Event()
+            self.__batchedEvents.append(batchedEvent)
+            if not notifiesAboutItems:
+                self.__batchedAttributeEvents[eventTypes] = batchedEvent
+        batch = batchedEvent.sourcesAndValuesByType()
+        for type, sourcesAndValues in list(
+            event.sourcesAndValuesByType().items()
+        ):
+            batchedSourcesAndValues = batch.setdefault(type, {})
+            for source, values in list(sourcesAndValues.items()):
+                batchedValues = batchedSourcesAndValues.get(source)
+                if batchedValues is None or not _isItemEventType(type):
+                    # For attribute events, the last value wins:
+                    batchedSourcesAndValues[source] = tuple(values)
+                else:
+                    batchedSourcesAndValues[source] = batchedValues + tuple(
+                        value for value in values if value not in batchedValues
+                    )
 
     def notifyObservers(self, event):
         """Notify observers of the event. The event type and sources are
         extracted from the event."""
-        if not event.sources():
+        if self.__batchDepth:
+            self.__addToBatch(event)
             return
         # Collect observers *and* the types and sources they are registered for
-        observers = dict()  # {observer: set([(type, source), ...])}
-        types = event.types()
-        # Include observers not registered for a specific event source:
-        sources = event.sources() | set([None])
-        eventTypesAndSources = [
-            (type, source) for source in sources for type in types
-        ]
-        for eventTypeAndSource in eventTypesAndSources:
-            for observer in self.__observers.get(eventTypeAndSource, set()):
-                observers.setdefault(observer, set()).add(eventTypeAndSource)
-        for observer, eventTypesAndSources in observers.items():
-            subEvent = event.subEvent(*eventTypesAndSources)
-            if subEvent.types():
-                observer(subEvent)
+        observers = dict()  # {observer: [(type, source), ...]}
+        for type, sourcesAndValues in list(
+            event.sourcesAndValuesByType().items()
+        ):
+            observersBySource = self.__observers.get(type)
+            if not observersBySource or not sourcesAndValues:
+                continue
+            # Include observers not registered for a specific event source:
+            for observer in observersBySource.get(None, ()):
+                observers.setdefault(observer, []).append((type, None))
+            # Look up the observers of each source in the event, or the sources
+            # of each observer, whichever is less work:
+            if len(sourcesAndValues) <= len(observersBySource):
+                registeredSources = [
+                    source
+                    for source in sourcesAndValues
+                    if source in observersBySource
+                ]
+            else:
+                registeredSources = [
+                    source
+                    for source in observersBySource
+                    if source is not None and source in sourcesAndValues
+                ]
+            for source in registeredSources:
+                for observer in observersBySource[source]:
+                    observers.setdefault(observer, []).append((type, source))
+        # Observers registered for the same types and sources share one
+        # sub event:
+        subEvents = dict()
+        for observer, eventTypesAndSources in list(observers.items()):
+            key = tuple(eventTypesAndSources)
+            subEvent = subEvents.get(key)
+            if subEvent is None:
+                subEvent = subEvents[key] = event.subEvent(
+                    *eventTypesAndSources
+                )
+            observer(subEvent)
 
     @unwrapObservers
     def observers(self, eventType=None):
         """Get the currently registered observers. Optionally specify
         a specific event type to get observers for that event type only."""
         if eventType:
-            return self.__observers.get((eventType, None), set())
+            return self.__observers.get(eventType, {}).get(None, set())
         else:
             result = set()
-            for observers in list(self.__observers.values()):
-                result |= observers
+            for observersBySource in list(self.__observers.values()):
+                for observers in list(observersBySource.values()):
+                    result |= observers
             return result
 
 
+# Suffixes of event types that notify about items being added to or removed
+# from their source. Other event types notify about the new value of an
+# attribute of their source:
+_itemEventTypeSuffixes = (".add", ".remove", ".added", ".removed")
+
+
+def _isItemEventType(eventType):
+    return isinstance(eventType, str) and eventType.endswith(
+        _itemEventTypeSuffixes
+    )
+
+
+@contextlib.contextmanager
+def batch():
+    """Context manager that defers and coalesces events and pubsub messages
+    sent while it is active, e.g. when changing many objects at once:
+
+    >>> with batch():
+    ...     for task in tasks:
+    ...         task.setPriority(1)
+    """
+    publisher = Publisher()
+    publisher.startBatch()
+    try:
+        yield
+    finally:
+        publisher.endBatch()
+
+
+def sendMessage(topic, **kwargs):
+    """Send a pubsub message via the Publisher, so that the message can be
+    deferred when a batch is open."""
+    Publisher().sendMessage(topic, **kwargs)
+
+
 class Observer(object):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -16,11 +16,21 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
+import hashlib
 import os
+import time
 import lockfile
 from . import xml
 from taskcoachlib import patterns, operating_system
-from taskcoachlib.domain import base, task, category, note, effort, attachment
+from taskcoachlib.domain import (
+    base,
+    date,
+    task,
+    category,
+    note,
+    effort,
+    attachment,
+)
 from taskcoachlib.syncml.config import createDefaultSyncConfig
 from taskcoachlib.thirdparty.guid import generate
 from taskcoachlib.changes import ChangeMonitor, ChangeSynchronizer
@@ -115,7 +125,30 @@ class SafeWriteFile(object):
         return _isCloud(os.path.dirname(self.__filename))
 
 
+class _DigestingFile(object):
+    """Wraps a file opened for writing and computes the SHA-1 digest of the
+    bytes written to it, so the file doesn't need to be read afterwards."""
+
+    def __init__(self, fd):
+        self.__fd = fd
+        self.__digest = hashlib.sha1()
+
+    def write(self, data):
+        self.__digest.update(data)
+        return self.__fd.write(data)
+
+    def digest(self):
+        return self.__digest.digest()
+
+    def __getattr__(self, attribute):
+        return getattr(self.__fd, attribute)
+
+
 class TaskFile(patterns.Observer):
+    # Files modified longer ago than this many seconds can't be rewritten
+    # without changing their modification time:
+    mtimeResolution = 2.0
+
     def __init__(self, *args, **kwargs):
         self.__filename = self.__lastFilename = ""
         self.__needSave = self.__loading = False
@@ -129,6 +162,10 @@ class TaskFile(patterns.Observer):
         self.__changes = dict()
         self.__changes[self.__monitor.guid()] = self.__monitor
         self.__changedOnDisk = False
+        # Fingerprints of the file and its .delta file as they were after the
+        # last load or save, by filename, see __fileFingerprint():
+        self.__fingerprint = dict()
+        self.__saveStatistics = dict(path=None, duration=0.0)
         if kwargs.pop("poll", True):
             self.__notifier = TaskCoachFilesystemPollerNotifier(self)
         else:
@@ -352,6 +389,7 @@ class TaskFile(patterns.Observer):
             return
         self.__lastFilename = filename or self.__filename
         self.__filename = filename
+        self.__fingerprint = dict()
         self.__notifier.setFilename(filename)
         pub.sendMessage("taskfile.filenameChanged", filename=filename)
 
@@ -413,7 +451,7 @@ class TaskFile(patterns.Observer):
         self.__notifier.stop()
 
     def _read(self, fd):
-        return xml.XMLReader(fd).read()
+        return xml.XMLReader(fd, streaming=True).read()
 
     def exists(self):
         return os.path.isfile(self.__filename)
@@ -433,9 +471,17 @@ class TaskFile(patterns.Observer):
             if self.exists():
                 fd = self._openForRead()
                 try:
-                    tasks, categories, notes, syncMLConfig, changes, guid = (
-                        self._read(fd)
-                    )
+                    # Creating the tasks schedules their due date and
+                    # planned start date jobs; schedule them all at once
+                    with date.Scheduler().deferred():
+                        (
+                            tasks,
+                            categories,
+                            notes,
+                            syncMLConfig,
+                            changes,
+                            guid,
+                        ) = self._read(fd)
                 finally:
                     fd.close()
             else:
@@ -449,9 +495,10 @@ class TaskFile(patterns.Observer):
             self.__monitor.reset()
             self.__changes = changes
             self.__changes[self.__monitor.guid()] = self.__monitor
-            self.categories().extend(categories)
-            self.tasks().extend(tasks)
-            self.notes().extend(notes)
+            with patterns.batch():
+                self.categories().extend(categories)
+                self.tasks().extend(tasks)
+                self.notes().extend(notes)
 
             def registerOtherObjects(objects):
                 for obj in objects:
@@ -479,9 +526,13 @@ class TaskFile(patterns.Observer):
 
             if os.path.exists(self.filename()):
                 # We need to reset the changes on disk because we're up to date.
-                xml.ChangesXMLWriter(
-                    open(self.filename() + ".delta", "wb")
-                ).write(self.__changes)
+                fd = _DigestingFile(open(self.filename() + ".delta", "wb"))
+                try:
+                    xml.ChangesXMLWriter(fd).write(self.__changes)
+                finally:
+                    fd.close()
+                self.__rememberFingerprint(self.__filename + ".delta", fd)
+                self.__rememberFingerprint(self.__filename)
         except:
             self.setFilename("")
             raise
@@ -501,13 +552,14 @@ class TaskFile(patterns.Observer):
         # it's lost. So write to a temporary file and rename it if
         # everything went OK.
         self.__saving = True
+        start = time.time()
         try:
-            self.mergeDiskChanges()
+            path = self.mergeDiskChanges()
 
             if self.__needSave or not os.path.exists(self.__filename):
-                fd = self._openForWrite()
+                fd = _DigestingFile(self._openForWrite())
                 try:
-                    xml.XMLWriter(fd).write(
+                    xml.XMLWriter(fd, streaming=True).write(
                         self.tasks(),
                         self.categories(),
                         self.notes(),
@@ -516,8 +568,12 @@ class TaskFile(patterns.Observer):
                     )
                 finally:
                     fd.close()
+                self.__rememberFingerprint(self.__filename, fd)
 
             self.markClean()
+            self.__saveStatistics = dict(
+                path=path, duration=time.time() - start
+            )
         finally:
             self.__saving = False
             self.__notifier.saved()
@@ -526,12 +582,33 @@ class TaskFile(patterns.Observer):
             except:
                 pass
 
+    def saveStatistics(self):
+        """Return which path the last save took and how long it took in
+        seconds. The path is "merge" if the file on disk was read and
+        merged, "unchanged" if the file on disk had not changed since the
+        last load or save, so reading it could be skipped, and "new" if
+        there was no file on disk yet."""
+        return self.__saveStatistics.copy()
+
     def mergeDiskChanges(self):
+        """Merge the changes made by others on disk and write the changes
+        file. Return "merge", "unchanged" or "new", depending on whether
+        the file on disk had to be read, see saveStatistics()."""
         self.__loading = True
         try:
-            if os.path.exists(
+            if not os.path.exists(
                 self.__filename
             ):  # Not using self.exists() because DummyFile.exists returns True
+                path = "new"
+                self.__changes = {self.__monitor.guid(): self.__monitor}
+            elif self.__isUnchangedOnDisk():
+                # Nobody else wrote the file or the changes file since we
+                # last loaded or saved it, so merging it would not change
+                # anything except the changes of the other devices.
+                path = "unchanged"
+                self.__mergeChangesOfOtherDevices()
+            else:
+                path = "merge"
                 # Instead of writing the content of memory, merge changes
                 # with the on-disk version and save the result.
                 self.__monitor.freeze()
@@ -548,11 +625,7 @@ class TaskFile(patterns.Observer):
                     fd.close()
 
                     self.__changes = allChanges
-
-                    if self.__saving:
-                        for devGUID, changes in list(self.__changes.items()):
-                            if devGUID != self.__monitor.guid():
-                                changes.merge(self.__monitor)
+                    self.__mergeChangesOfOtherDevices()
 
                     sync = ChangeSynchronizer(self.__monitor, allChanges)
 
@@ -570,20 +643,79 @@ class TaskFile(patterns.Observer):
                     self.__changes[self.__monitor.guid()] = self.__monitor
                 finally:
                     self.__monitor.thaw()
-            else:
-                self.__changes = {self.__monitor.guid(): self.__monitor}
+                self.__rememberFingerprint(self.__filename)
 
             self.__monitor.resetAllChanges()
-            fd = self._openForWrite(".delta")
+            fd = _DigestingFile(self._openForWrite(".delta"))
             try:
                 xml.ChangesXMLWriter(fd).write(self.changes())
             finally:
                 fd.close()
+            self.__rememberFingerprint(self.__filename + ".delta", fd)
 
             self.__changedOnDisk = False
+            return path
         finally:
             self.__loading = False
 
+    def __mergeChangesOfOtherDevices(self):
+        if self.__saving:
+            for devGUID, changes in list(self.__changes.items()):
+                if devGUID != self.__monitor.guid():
+                    changes.merge(self.__monitor)
+
+    def __isUnchangedOnDisk(self):
+        """Return whether the task file and its .delta file are still as we
+        last loaded or saved them. Files are only read when their size and
+        modification time are unchanged and we know their digest."""
+        for filename in self.__filename, self.__filename + ".delta":
+            fingerprint = self.__fingerprint.get(filename)
+            if fingerprint is None:
+                return False
+            size, mtime, digest = fingerprint
+            try:
+                stat = os.stat(filename)
+            except (IOError, OSError):
+                return False
+            if (stat.st_size, stat.st_mtime) != (size, mtime):
+                return False
+            if digest is not None and digest != self.__fileDigest(filename):
+                return False
+        return True
+
+    def __rememberFingerprint(self, filename, writtenFile=None):
+        fingerprint = self.__fileFingerprint(filename, writtenFile)
+        if fingerprint is None:
+            self.__fingerprint.pop(filename, None)
+        else:
+            self.__fingerprint[filename] = fingerprint
+
+    def __fileFingerprint(self, filename, writtenFile=None):
+        """Return the size, modification time and SHA-1 digest of the file,
+        or None if the file does not exist. The digest is needed when the
+        file was modified so recently that a rewrite may not change its
+        modification time. It is taken from the file just written, if any,
+        or else read from disk; for older files it is None."""
+        try:
+            stat = os.stat(filename)
+            if writtenFile is not None:
+                digest = writtenFile.digest()
+            elif time.time() - stat.st_mtime < self.mtimeResolution:
+                digest = self.__fileDigest(filename)
+            else:
+                digest = None
+        except (IOError, OSError):
+            return None
+        return (stat.st_size, stat.st_mtime, digest)
+
+    @staticmethod
+    def __fileDigest(filename):
+        digest = hashlib.sha1()
+        with open(filename, "rb") as fd:
+            for chunk in iter(lambda: fd.read(65536), b""):
+                digest.update(chunk)
+        return digest.digest()
+
     def saveas(self, filename):
         if os.path.exists(filename):
             os.remove(filename)
@@ -596,36 +728,33 @@ class TaskFile(patterns.Observer):
         mergeFile = self.__class__()
         mergeFile.load(filename)
         self.__loading = True
-        categoryMap = dict()
-        self.tasks().removeItems(
-            self.objectsToOverwrite(self.tasks(), mergeFile.tasks())
-        )
-        self.rememberCategoryLinks(categoryMap, self.tasks())
-        self.tasks().extend(mergeFile.tasks().rootItems())
-        self.notes().removeItems(
-            self.objectsToOverwrite(self.notes(), mergeFile.notes())
-        )
-        self.rememberCategoryLinks(categoryMap, self.notes())
-        self.notes().extend(mergeFile.notes().rootItems())
-        self.categories().removeItems(
-            self.objectsToOverwrite(self.categories(), mergeFile.categories())
-        )
-        self.categories().extend(mergeFile.categories().rootItems())
-        self.restoreCategoryLinks(categoryMap)
+        with patterns.batch():
+            categoryMap = dict()
+            self.tasks().removeItems(
+                self.objectsToOverwrite(self.tasks(), mergeFile.tasks())
+            )
+            self.rememberCategoryLinks(categoryMap, self.tasks())
+            self.tasks().extend(mergeFile.tasks().rootItems())
+            self.notes().removeItems(
+                self.objectsToOverwrite(self.notes(), mergeFile.notes())
+            )
+            self.rememberCategoryLinks(categoryMap, self.notes())
+            self.notes().extend(mergeFile.notes().rootItems())
+            self.categories().removeItems(
+                self.objectsToOverwrite(
+                    self.categories(), mergeFile.categories()
+                )
+            )
+            self.categories().extend(mergeFile.categories().rootItems())
+            self.restoreCategoryLinks(categoryMap)
         mergeFile.close()
         self.__loading = False
         self.markDirty(force=True)
 
     def objectsToOverwrite(self, originalObjects, objectsToMerge):
-        objectsToOverwrite = []
-        for domainObject in objectsToMerge:
-            try:
-                objectsToOverwrite.append(
-                    originalObjects.getObjectById(domainObject.id())
-                )
-            except IndexError:
-                pass
-        return objectsToOverwrite
+        return originalObjects.getObjectsByIds(
+            [domainObject.id() for domainObject in objectsToMerge]
+        )
 
     def rememberCategoryLinks(self, categoryMap, categorizables):
         for categorizable in categorizables:
@@ -760,6 +889,6 @@ class LockedTaskFile(TaskFile):
     def mergeDiskChanges(self):
         self.acquire_lock(self.filename())
         try:
-            super().mergeDiskChanges()
+            return super().mergeDiskChanges()
         finally:
             self.release_lock()
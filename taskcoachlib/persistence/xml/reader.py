@@ -83,14 +83,42 @@ class XMLReaderTooNewException(Exception):
     pass
 
 
+class BrokenLinesFixer(object):
+    """File-like wrapper that removes spurious newlines from element tags
+    while reading (tskversion 24 may contain newlines in element tags).
+    Returns bytes, as expected by lxml's iterparse."""
+
+    def __init__(self, fd):
+        self.__lines = iter(fd)
+        self.__buffer = bytearray()
+
+    def read(self, size=-1):
+        while size < 0 or len(self.__buffer) < size:
+            line = next(self.__lines, None)
+            if line is None:
+                break
+            if line.endswith("<TaskCoach-\n") or line.endswith(
+                "</TaskCoach-\n"
+            ):
+                nextLine = next(self.__lines, "\n")
+                line = line[:-1] + nextLine[:-1]  # Remove newlines
+            self.__buffer += line.encode("utf-8")
+        if size < 0:
+            size = len(self.__buffer)
+        data = bytes(self.__buffer[:size])
+        del self.__buffer[:size]
+        return data
+
+
 class XMLReader(object):
     """Class for reading task files in the default XML task file format."""
 
     defaultStartTime = (0, 0, 0, 0)
     defaultEndTime = (23, 59, 59, 999999)
 
-    def __init__(self, fd):
+    def __init__(self, fd, streaming=False):
         self.__fd = fd
+        self.__streaming = streaming
         self.__default_font_size = wx.SystemSettings.GetFont(
             wx.SYS_DEFAULT_GUI_FONT
         ).GetPointSize()
@@ -107,27 +135,11 @@ class XMLReader(object):
     def read(self):
         """Read the task file and return the tasks, categories, notes, SyncML
         configuration and GUID."""
-        if self.__has_broken_lines():
-            self.__fix_broken_lines()
-        parser = PIParser()
-        tree = ET.parse(self.__fd, parser)
-        root = tree.getroot()
-        pis = tree.getroot().xpath("//processing-instruction()")
-        for pi in pis:
-            if pi.target == "taskcoach":
-                tskversion = int(pi.attrib.get("tskversion"))
-                break
-        self.__tskversion = tskversion  # pylint: disable=W0201
-        if self.__tskversion > meta.data.tskversion:
-            # Version number of task file is too high
-            raise XMLReaderTooNewException
-        tasks = self.__parse_task_nodes(root)
-        self.__resolve_prerequisites_and_dependencies(tasks)
-        notes = self.__parse_note_nodes(root)
-        if self.__tskversion <= 13:
-            categories = self.__parse_category_nodes_from_task_nodes(root)
+        if self.__streaming:
+            root, tasks, categories, notes = self.__parse_incrementally()
         else:
-            categories = self.__parse_category_nodes(root)
+            root, tasks, categories, notes = self.__parse_tree()
+        self.__resolve_prerequisites_and_dependencies(tasks)
         self.__resolve_categories(categories, tasks, notes)
 
         guid = self.__parse_guid_node(root.find("guid"))
@@ -149,6 +161,69 @@ class XMLReader(object):
 
         return tasks, categories, notes, syncml_config, changes, guid
 
+    def __parse_tree(self):
+        """Parse the complete element tree and then create the domain
+        objects."""
+        if self.__has_broken_lines():
+            self.__fix_broken_lines()
+        parser = PIParser()
+        tree = ET.parse(self.__fd, parser)
+        root = tree.getroot()
+        pis = tree.getroot().xpath("//processing-instruction()")
+        for pi in pis:
+            if pi.target == "taskcoach":
+                tskversion = int(pi.attrib.get("tskversion"))
+                break
+        self.__set_tskversion(tskversion)
+        tasks = self.__parse_task_nodes(root)
+        notes = self.__parse_note_nodes(root)
+        if self.__tskversion <= 13:
+            categories = self.__parse_category_nodes_from_task_nodes(root)
+        else:
+            categories = self.__parse_category_nodes(root)
+        return root, tasks, categories, notes
+
+    def __parse_incrementally(self):
+        """Create the domain objects while parsing, as soon as the element
+        of a top-level task, category or note is complete, and discard the
+        element afterwards. This way the complete element tree of the task
+        file is never in memory at once."""
+        tasks, categories, notes = [], [], []
+        parsers = dict(
+            task=(self._parse_task_node, tasks),
+            category=(self.__parse_category_node, categories),
+            note=(self.__parse_note_node, notes),
+        )
+        root = None
+        self.__tskversion = None  # pylint: disable=W0201
+        for event, element in ET.iterparse(
+            BrokenLinesFixer(self.__fd), events=("pi", "end"), encoding="utf-8"
+        ):
+            if event == "pi":
+                if element.target == "taskcoach" and self.__tskversion is None:
+                    self.__set_tskversion(int(element.get("tskversion")))
+                    if self.__tskversion <= 13:
+                        # In tskversion <= 13 category nodes were subnodes of
+                        # task nodes, so we need the complete tree
+                        self.__fd.seek(0)
+                        return self.__parse_tree()
+                continue
+            parent = element.getparent()
+            if parent is None:
+                root = element
+            elif parent.getparent() is None and element.tag in parsers:
+                parse, domainObjects = parsers[element.tag]
+                domainObjects.append(parse(element))
+                element.clear()
+                parent.remove(element)
+        return root, tasks, categories, notes
+
+    def __set_tskversion(self, tskversion):
+        self.__tskversion = tskversion  # pylint: disable=W0201
+        if self.__tskversion > meta.data.tskversion:
+            # Version number of task file is too high
+            raise XMLReaderTooNewException
+
     def __has_broken_lines(self):
         """tskversion 24 may contain newlines in element tags."""
         has_broken_lines = "><spds><sources><TaskCoach-\n" in self.__fd.read()
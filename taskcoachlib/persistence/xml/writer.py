@@ -78,38 +78,94 @@ def sortedById(objects):
 class XMLWriter(object):
     maxDateTime = date.DateTime()
 
-    def __init__(self, fd, versionnr=meta.data.tskversion):
+    def __init__(self, fd, versionnr=meta.data.tskversion, streaming=False):
         self.__fd = fd
         self.__versionnr = versionnr
+        self.__streaming = streaming
 
     def write(
         self, taskList, categoryContainer, noteContainer, syncMLConfig, guid
     ):
         root = ET.Element("tasks")
+        nodes = self.__topLevelNodes(
+            root,
+            taskList,
+            categoryContainer,
+            noteContainer,
+            syncMLConfig,
+            guid,
+        )
+        if self.__streaming:
+            self.__writeIncrementally(root, nodes)
+            return
+        for dummy_node in nodes:
+            pass
+        flatten(root)
+        PIElementTree(self.__processingInstruction(), root).write(
+            self.__fd, "utf-8"
+        )
 
+    def __topLevelNodes(
+        self,
+        root,
+        taskList,
+        categoryContainer,
+        noteContainer,
+        syncMLConfig,
+        guid,
+    ):
+        """Create the top-level nodes, including their subnodes, one at a
+        time and yield each of them as soon as it is complete."""
         for rootTask in sortedById(taskList.rootItems()):
-            self.taskNode(root, rootTask)
+            yield self.taskNode(root, rootTask)
 
         ownedNotes = self.notesOwnedByNoteOwners(taskList, categoryContainer)
         for rootCategory in sortedById(categoryContainer.rootItems()):
-            self.categoryNode(
+            yield self.categoryNode(
                 root, rootCategory, taskList, noteContainer, ownedNotes
             )
 
         for rootNote in sortedById(noteContainer.rootItems()):
-            self.noteNode(root, rootNote)
+            yield self.noteNode(root, rootNote)
 
         if syncMLConfig:
-            self.syncMLNode(root, syncMLConfig)
+            yield self.syncMLNode(root, syncMLConfig)
         if guid:
-            ET.SubElement(root, "guid").text = guid
+            node = ET.SubElement(root, "guid")
+            node.text = guid
+            yield node
+
+    def __writeIncrementally(self, root, nodes):
+        """Write each top-level node as soon as it is complete and discard
+        it afterwards, so that only one top-level subtree is in memory at a
+        time. The output is identical to the output of the
+        PIElementTree."""
+        encoding = "utf-8"
+        self.__fd.write(
+            ('<?xml version="1.0" encoding="%s"?>\n' % encoding).encode(
+                encoding
+            )
+        )
+        self.__fd.write(
+            (self.__processingInstruction() + "\n").encode(encoding)
+        )
+        isEmpty = True
+        for node in nodes:
+            if isEmpty:
+                self.__fd.write(b"<tasks>\n")
+                isEmpty = False
+            flatten(node)
+            ET.ElementTree(node).write(
+                self.__fd, encoding, xml_declaration=False
+            )
+            root.remove(node)
+        self.__fd.write(b"<tasks />\n" if isEmpty else b"</tasks>\n")
 
-        flatten(root)
-        PIElementTree(
-            '<?taskcoach release="%s" tskversion="%d"?>\n'
-            % (meta.data.version, self.__versionnr),
-            root,
-        ).write(self.__fd, "utf-8")
+    def __processingInstruction(self):
+        return '<?taskcoach release="%s" tskversion="%d"?>\n' % (
+            meta.data.version,
+            self.__versionnr,
+        )
 
     def notesOwnedByNoteOwners(self, *collectionOfNoteOwners):
         notes = []
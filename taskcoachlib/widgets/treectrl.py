@@ -16,6 +16,7 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
+import bisect
 from taskcoachlib import operating_system
 from wx.lib.agw import customtreectrl as customtree, hypertreelist
 from taskcoachlib.widgets import itemctrl, draganddrop
@@ -180,6 +181,13 @@ class TreeListCtrl(
     ):
         self.__adapter = parent
         self.__selection = []
+        self.__items_by_object = {}
+        # In virtual mode, items are added without their columns, colors
+        # and font. These are rendered when the item is first painted or
+        # its contents are asked for:
+        self.__virtual = kwargs.pop("virtual", False)
+        self.__unrendered_items = set()
+        self.__rows_touched = 0
         self.__user_double_clicked = False
         self.__columns_with_images = []
         self.__default_font = wx.NORMAL_FONT
@@ -195,6 +203,8 @@ class TreeListCtrl(
             **kwargs
         )
         self.bindEventHandlers(selectCommand, editCommand, dragAndDropCommand)
+        if self.__virtual:
+            self.GetMainWindow().Bind(wx.EVT_PAINT, self.onPaint)
 
     def bindEventHandlers(
         self, selectCommand, editCommand, dragAndDropCommand
@@ -233,6 +243,7 @@ class TreeListCtrl(
         self.Freeze()
         self.StopEditing()
         self.__selection = self.curselection()
+        self.__rows_touched = 0
         self.DeleteAllItems()
         self.__columns_with_images = [
             index
@@ -251,18 +262,132 @@ class TreeListCtrl(
             self.ScrollTo(selections[0])
         self.Thaw()
 
-    def RefreshItems(self, *objects):
+    def UpdateAllItems(self):
+        """Update the tree to reflect items that have been added, removed or
+        moved, without rebuilding the items that didn't change. Returns the
+        number of rows inserted, deleted, moved or refreshed."""
+        root_item = self.GetRootItem()
+        if not root_item:
+            self.RefreshAllItems()
+            return self.__rows_touched
+        self.Freeze()
+        self.StopEditing()
         self.__selection = self.curselection()
-        self._refreshTargetObjects(self.GetRootItem(), *objects)
+        self.__rows_touched = 0
+        self.__update_children(root_item)
+        self.Thaw()
+        return self.__rows_touched
+
+    def __update_children(self, parent_item, parent_object=None):
+        """Make the child items of the parent item match the children of the
+        parent object. Returns whether any child was inserted or deleted."""
+        child_objects = self.__adapter.children(parent_object)
+        index_of_object = dict(
+            (child_object, index)
+            for index, child_object in enumerate(child_objects)
+        )
+        kept_items = []
+        changed = False
+        for item in list(parent_item.GetChildren()):
+            if self.GetItemPyData(item) in index_of_object:
+                kept_items.append(item)
+            else:
+                self.__delete_item(item)
+                changed = True
+        # Keep the largest group of items that is already in the right
+        # order and move the others by deleting and reinserting them:
+        in_order = self.__longest_increasing_subsequence(
+            [index_of_object[self.GetItemPyData(item)] for item in kept_items]
+        )
+        for position, item in enumerate(kept_items):
+            if position not in in_order:
+                self.__delete_item(item)
+        kept_items = [
+            item
+            for position, item in enumerate(kept_items)
+            if position in in_order
+        ]
+        kept_items.reverse()
+        for index, child_object in enumerate(child_objects):
+            if (
+                kept_items
+                and self.GetItemPyData(kept_items[-1]) == child_object
+            ):
+                self.__update_item(kept_items.pop(), child_object)
+            else:
+                self._addObject(parent_item, child_object, index)
+                changed = True
+        return changed
+
+    def __update_item(self, item, domain_object):
+        if item.GetChildren():
+            if self.__update_children(item, domain_object):
+                # Some columns and the icon depend on the children:
+                if item not in self.__unrendered_items:
+                    self._refreshObjectCompletely(item, domain_object)
+                self.__rows_touched += 1
+            if not item.GetChildren():
+                self.SetItemHasChildren(item, False)
+        elif self.__adapter.getItemExpanded(domain_object):
+            self._addObjectRecursively(item, domain_object)
+            item.Expand()
+        else:
+            self.SetItemHasChildren(
+                item, self.__adapter.children(domain_object)
+            )
+
+    def __delete_item(self, item):
+        items = [item]
+        while items:
+            each_item = items.pop()
+            items.extend(each_item.GetChildren())
+            domain_object = self.GetItemPyData(each_item)
+            items_of_object = self.__items_by_object.get(domain_object, [])
+            if each_item in items_of_object:
+                items_of_object.remove(each_item)
+                if not items_of_object:
+                    del self.__items_by_object[domain_object]
+            self.__unrendered_items.discard(each_item)
+            self.__rows_touched += 1
+        self.Delete(item)
+
+    @staticmethod
+    def __longest_increasing_subsequence(values):
+        """Return the positions of the values that form the longest strictly
+        increasing subsequence of values."""
+        # For each length, the smallest value that ends an increasing
+        # subsequence of that length and the position of that value:
+        tail_values, tail_positions = [], []
+        predecessors = []
+        for position, value in enumerate(values):
+            length = bisect.bisect_left(tail_values, value)
+            predecessors.append(tail_positions[length - 1] if length else None)
+            if length == len(tail_values):
+                tail_values.append(value)
+                tail_positions.append(position)
+            else:
+                tail_values[length] = value
+                tail_positions[length] = position
+        positions = set()
+        position = tail_positions[-1] if tail_positions else None
+        while position is not None:
+            positions.add(position)
+            position = predecessors[position]
+        return positions
+
+    def DeleteAllItems(self):
+        self.__items_by_object.clear()
+        self.__unrendered_items.clear()
+        super().DeleteAllItems()
 
-    def _refreshTargetObjects(self, parent_item, *target_objects):
-        child_item, cookie = self.GetFirstChild(parent_item)
-        while child_item:
-            item_object = self.GetItemPyData(child_item)
-            if item_object in target_objects:
-                self._refreshObjectCompletely(child_item, item_object)
-            self._refreshTargetObjects(child_item, *target_objects)
-            child_item, cookie = self.GetNextChild(parent_item, cookie)
+    def RefreshItems(self, *objects):
+        self.__selection = self.curselection()
+        # Look the tree items up instead of walking the whole tree, so
+        # refreshing a few objects doesn't cost a visit of every item.
+        for target_object in objects:
+            for item in self.__items_by_object.get(target_object, []):
+                if item not in self.__unrendered_items:
+                    self._refreshObjectCompletely(item, target_object)
 
     def _refreshObjectCompletely(self, item, *args):
         self.__refresh_aspects(
@@ -275,29 +400,77 @@ class TreeListCtrl(
 
     def _addObjectRecursively(self, parent_item, parent_object=None):
         for child_object in self.__adapter.children(parent_object):
+            self._addObject(parent_item, child_object)
+
+    def _addObject(self, parent_item, child_object, index=None):
+        ct_type = self.getItemCTType(child_object)
+        if index is None:
             child_item = self.AppendItem(
-                parent_item,
-                "",
-                self.getItemCTType(child_object),
-                data=child_object,
+                parent_item, "", ct_type, data=child_object
+            )
+        else:
+            child_item = self.InsertItem(
+                parent_item, index, "", ct_type, data=child_object
+            )
+        self.__items_by_object.setdefault(child_object, []).append(child_item)
+        self.__rows_touched += 1
+        self._refreshObjectMinimally(child_item, child_object)
+        expanded = self.__adapter.getItemExpanded(child_object)
+        if expanded:
+            self._addObjectRecursively(child_item, child_object)
+            # Call Expand on the item instead of on the tree
+            # (self.Expand(childItem)) to prevent lots of events
+            # (EVT_TREE_ITEM_EXPANDING/EXPANDED) being sent
+            child_item.Expand()
+        else:
+            self.SetItemHasChildren(
+                child_item, self.__adapter.children(child_object)
+            )
+
+    def _refreshObjectMinimally(self, item, *args, **kwargs):
+        if self.__virtual:
+            self._refreshSelection(item, *args, **kwargs)
+            self.__unrendered_items.add(item)
+        else:
+            self.__refresh_aspects(
+                ("Columns", "Colors", "Font", "Selection"),
+                item,
+                *args,
+                **kwargs
             )
-            self._refreshObjectMinimally(child_item, child_object)
-            expanded = self.__adapter.getItemExpanded(child_object)
-            if expanded:
-                self._addObjectRecursively(child_item, child_object)
-                # Call Expand on the item instead of on the tree
-                # (self.Expand(childItem)) to prevent lots of events
-                # (EVT_TREE_ITEM_EXPANDING/EXPANDED) being sent
-                child_item.Expand()
-            else:
-                self.SetItemHasChildren(
-                    child_item, self.__adapter.children(child_object)
-                )
 
-    def _refreshObjectMinimally(self, *args, **kwargs):
+    def _renderItem(self, item):
+        """Render an item that was added in virtual mode. Returns whether
+        the item still needed rendering."""
+        if item not in self.__unrendered_items:
+            return False
+        self.__unrendered_items.remove(item)
         self.__refresh_aspects(
-            ("Columns", "Colors", "Font", "Selection"), *args, **kwargs
+            ("ItemType", "Columns", "Colors", "Font"),
+            item,
+            self.GetItemPyData(item),
+            check=True,
         )
+        return True
+
+    def _visibleItems(self):
+        """Yield the items that are (partly) within the visible part of the
+        tree, in display order."""
+        root_item = self.GetRootItem()
+        if not root_item:
+            return
+        main_window = self.GetMainWindow()
+        top = main_window.CalcUnscrolledPosition(wx.Point(0, 0)).y
+        bottom = top + main_window.GetClientSize().GetHeight()
+        items = list(reversed(root_item.GetChildren()))
+        while items:
+            item = items.pop()
+            if item.GetY() > bottom:
+                break
+            if item.GetY() + item.GetHeight() >= top:
+                yield item
+            if item.IsExpanded():
+                items.extend(reversed(item.GetChildren()))
 
     def __refresh_aspects(self, aspects, *args, **kwargs):
         for aspect in aspects:
@@ -363,8 +536,44 @@ class TreeListCtrl(
         if not check or (check and select != item.IsSelected()):
             item.SetHilight(select)
 
+    def GetItemText(self, item, *args, **kwargs):
+        self._renderItem(item)
+        return super().GetItemText(item, *args, **kwargs)
+
+    def GetItemImage(self, item, *args, **kwargs):
+        self._renderItem(item)
+        return super().GetItemImage(item, *args, **kwargs)
+
+    def GetItemBackgroundColour(self, item):
+        self._renderItem(item)
+        return super().GetItemBackgroundColour(item)
+
+    def GetItemTextColour(self, item):
+        self._renderItem(item)
+        return super().GetItemTextColour(item)
+
+    def GetItemFont(self, item):
+        self._renderItem(item)
+        return super().GetItemFont(item)
+
     # Event handlers
 
+    def onPaint(self, event):
+        event.Skip()
+        main_window = self.GetMainWindow()
+        # Item positions are only valid once the main window has recalculated
+        # them, which it does when idle:
+        # pylint: disable=W0212
+        if not self.__unrendered_items or main_window._dirty:
+            return
+        rendered = [
+            item for item in self._visibleItems() if self._renderItem(item)
+        ]
+        if rendered:
+            # Rendered items may have a different size now, so let the main
+            # window recalculate the item positions:
+            main_window._dirty = True
+
     def onSelect(self, event):
         # Use CallAfter to prevent handling the select while items are
         # being deleted:
@@ -454,6 +663,7 @@ class TreeListCtrl(
     def CreateEditCtrl(self, item, column_index):
         column = self._getColumn(column_index)
         domain_object = self.GetItemPyData(item)
+        self._renderItem(item)
         return column.editControl(
             self.GetMainWindow(), item, column_index, domain_object
         )
@@ -0,0 +1,324 @@
+"""
+Task Coach - Your friendly task manager
+Copyright (C) 2004-2016 Task Coach developers <developers@taskcoach.org>
+
+Task Coach is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Task Coach is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import hashlib, time
+import test
+from taskcoachlib import config, persistence
+from taskcoachlib.domain import task, effort, date
+from twisted.internet.protocol import ClientFactory, Protocol
+
+
+class FakeIPhoneSyncFrame(object):
+    def Started(self):
+        pass
+
+    def SetDeviceName(self, name):
+        pass
+
+    def AddLogLine(self, line):
+        pass
+
+    def SetProgress(self, value, total):
+        pass
+
+    def Finished(self):
+        pass
+
+
+class FakeIOController(object):
+    def filename(self):
+        return ""
+
+
+class FakeMainWindow(object):
+    def __init__(self, taskFile):
+        self.taskFile = taskFile
+
+    def createIPhoneProgressFrame(self):
+        return FakeIPhoneSyncFrame()
+
+    def restoreTasks(self, categories, tasks):
+        self.taskFile.clear(False)
+        self.taskFile.categories().extend(categories)
+        self.taskFile.tasks().extend(tasks)
+
+    def modifyIPhoneTask(self, task, subject, *args):
+        task.setSubject(subject)
+
+
+class Device(Protocol):
+    """Simulates a device that uploads the subjects of modified tasks and
+    stores what the desktop sends it."""
+
+    def __init__(self, name, password, token, modifiedTasks=None):
+        from taskcoachlib.iphone import protocol
+
+        self.name = name
+        self.password = password
+        self.token = token
+        self.modifiedTasks = modifiedTasks or dict()  # {task id: subject}
+        self.full = None
+        self.received = []
+        self.deleted = []
+        self.closed = False
+        self.__parser = protocol.ItemParser()
+        self.__buffer = b""
+        self.__script = self.script()
+        self.__item = self.__parser.parse(next(self.__script))
+
+    def send(self, format, *values):  # pylint: disable=W0622
+        self.transport.write(self.__parser.parse(format).pack(*values))
+
+    def script(self):
+        yield "i"  # Protocol version
+        self.send("i", 1)
+        hashData = yield "512b"
+        self.send(
+            "20b",
+            hashlib.sha1(hashData + self.password.encode("UTF-8")).digest(),
+        )
+        yield "i"  # Password accepted
+        self.send("s", self.name)
+        yield "s"  # Task file GUID
+        self.send("i", 1)
+        yield "z"  # Task file name
+        self.send("i", 1)
+        yield "ii"  # Day hours
+        self.send("i", 1)
+        self.send("z", self.token)
+        self.send("iiiiiiiii", 0, 0, 0, len(self.modifiedTasks), 0, 0, 0, 0, 0)
+        for taskId, subject in self.modifiedTasks.items():
+            self.send(
+                "sssffffiiiii[s]",
+                subject,
+                taskId,
+                "",
+                date.DateTime(),
+                date.DateTime(),
+                date.DateTime(),
+                None,
+                0,
+                0,
+                0,
+                0,
+                0,
+                [],
+            )
+            yield "s"  # Id of the modified task
+        header = yield "iiiii"
+        self.full = header[0]
+        for format, count, objects in (
+            ("ssz", header[1], self.received),
+            ("sssffffziiiii[s]", header[2], self.received),
+            ("ssztt", header[3], self.received),
+            ("s", header[4], self.deleted),
+        ):
+            while count:
+                size = yield "i"
+                for dummy in range(size):
+                    objects.append((yield format))
+                self.send("i", size)
+                count -= size
+        self.token = yield "s"
+        self.send("i", 1)
+        self.transport.loseConnection()
+
+    def receivedIds(self):
+        return set(
+            [values[0 if len(values) == 5 else 1] for values in self.received]
+        )
+
+    def dataReceived(self, data):
+        self.__buffer += data
+        while True:
+            length = self.__item.expect()
+            if length is None:
+                try:
+                    format = self.__script.send(self.__item.value)
+                except StopIteration:
+                    return
+                self.__item = self.__parser.parse(format)
+            elif len(self.__buffer) >= length:
+                self.__item.feed(self.__buffer[:length])
+                self.__buffer = self.__buffer[length:]
+            else:
+                return
+
+    def connectionLost(self, reason):
+        self.closed = True
+
+
+class DeviceFactory(ClientFactory):
+    def __init__(self, device):
+        self.device = device
+
+    def buildProtocol(self, addr):
+        return self.device
+
+
+class IPhoneSyncTest(test.TestCase):
+    """Synchronizes a simulated device with an IPhoneAcceptor over
+    localhost using the delta protocol."""
+
+    def setUp(self):
+        from taskcoachlib.iphone import protocol
+
+        super().setUp()
+        task.Task.settings = self.settings = config.Settings(load=False)
+        self.settings.set("iphone", "password", "secret")
+        self.taskFile = persistence.TaskFile()
+        self.task = task.Task("task")
+        self.completedTask = task.Task(
+            "completed", completionDateTime=date.Now()
+        )
+        self.effort = effort.Effort(self.task, date.DateTime(2000, 1, 1))
+        self.task.addEffort(self.effort)
+        self.taskFile.tasks().extend([self.task, self.completedTask])
+        self.closedConnections = []
+
+        closedConnections = self.closedConnections
+
+        class IPhoneHandler(protocol.IPhoneHandler):
+            protocolVersion = protocol._DELTA_PROTOVERSION
+
+            def connectionLost(self, reason):
+                super().connectionLost(reason)
+                closedConnections.append(self)
+
+        self.acceptor = protocol.IPhoneAcceptor(
+            FakeMainWindow(self.taskFile), self.settings, FakeIOController()
+        )
+        self.acceptor.protocol = IPhoneHandler
+
+    def tearDown(self):
+        self.acceptor.close()
+        self.taskFile.close()
+        self.taskFile.stop()
+        super().tearDown()
+
+    def synchronize(self, token=None, name="device", modifiedTasks=None):
+        from twisted.internet import reactor
+
+        device = Device(name, "secret", token, modifiedTasks)
+        nrClosedConnections = len(self.closedConnections)
+        reactor.connectTCP(
+            "127.0.0.1", self.acceptor.port, DeviceFactory(device)
+        )
+        start = time.time()
+        while time.time() - start < 10 and not (
+            device.closed and len(self.closedConnections) > nrClosedConnections
+        ):
+            reactor.iterate(0.01)
+        self.assertTrue(device.closed)
+        return device
+
+    def testFirstSynchronizationSendsEverything(self):
+        device = self.synchronize()
+        self.assertEqual(1, device.full)
+        self.assertEqual(
+            set([self.task.id(), self.completedTask.id(), self.effort.id()]),
+            device.receivedIds(),
+        )
+        self.assertTrue(device.token)
+
+    def testSecondSynchronizationWithoutChangesSendsNothing(self):
+        device = self.synchronize()
+        device = self.synchronize(device.token)
+        self.assertEqual(0, device.full)
+        self.assertEqual([], device.received)
+        self.assertEqual([], device.deleted)
+
+    def testSecondSynchronizationSendsChangedTasksOnly(self):
+        device = self.synchronize()
+        self.task.setSubject("new subject")
+        device = self.synchronize(device.token)
+        self.assertEqual(0, device.full)
+        self.assertEqual(set([self.task.id()]), device.receivedIds())
+
+    def testSecondSynchronizationSendsNewTaskWithItsEfforts(self):
+        device = self.synchronize()
+        newTask = task.Task("new")
+        newEffort = effort.Effort(newTask, date.DateTime(2000, 1, 2))
+        newTask.addEffort(newEffort)
+        self.taskFile.tasks().append(newTask)
+        device = self.synchronize(device.token)
+        self.assertEqual(
+            set([newTask.id(), newEffort.id()]), device.receivedIds()
+        )
+
+    def testSecondSynchronizationSendsChangedEffort(self):
+        device = self.synchronize()
+        self.effort.setStop(date.DateTime(2000, 1, 1, 12, 0))
+        device = self.synchronize(device.token)
+        self.assertEqual(set([self.effort.id()]), device.receivedIds())
+
+    def testSecondSynchronizationSendsDeletedTask(self):
+        device = self.synchronize()
+        self.taskFile.tasks().remove(self.completedTask)
+        device = self.synchronize(device.token)
+        self.assertEqual([], device.received)
+        self.assertEqual([self.completedTask.id()], device.deleted)
+
+    def testTaskThatIsNoLongerSyncedIsDeleted(self):
+        self.settings.setboolean("iphone", "synccompleted", False)
+        device = self.synchronize()
+        self.task.setCompletionDateTime(date.Now())
+        device = self.synchronize(device.token)
+        self.assertEqual([self.task.id()], device.deleted)
+
+    def testTaskThatIsSyncedAgainIsSentWithItsEfforts(self):
+        self.settings.setboolean("iphone", "synccompleted", False)
+        completedEffort = effort.Effort(
+            self.completedTask, date.DateTime(2000, 1, 1)
+        )
+        self.completedTask.addEffort(completedEffort)
+        device = self.synchronize()
+        self.assertFalse(completedEffort.id() in device.receivedIds())
+        self.completedTask.setCompletionDateTime(date.DateTime())
+        device = self.synchronize(device.token)
+        self.assertEqual(
+            set([self.completedTask.id(), completedEffort.id()]),
+            device.receivedIds(),
+        )
+
+    def testUnknownTokenGetsEverything(self):
+        self.synchronize()
+        device = self.synchronize("unknown token")
+        self.assertEqual(1, device.full)
+
+    def testOldTokenGetsEverything(self):
+        oldToken = self.synchronize().token
+        self.synchronize(oldToken)
+        device = self.synchronize(oldToken)
+        self.assertEqual(1, device.full)
+
+    def testOtherDeviceGetsEverything(self):
+        device = self.synchronize()
+        device = self.synchronize(device.token, name="other device")
+        self.assertEqual(1, device.full)
+
+    def testChangingSyncCompletedSettingGetsEverything(self):
+        device = self.synchronize()
+        self.settings.setboolean("iphone", "synccompleted", False)
+        device = self.synchronize(device.token)
+        self.assertEqual(1, device.full)
+
+    def testTaskModifiedOnDeviceIsChangedOnDesktop(self):
+        device = self.synchronize()
+        self.synchronize(device.token, modifiedTasks={self.task.id(): "new"})
+        self.assertEqual("new", self.task.subject())
@@ -16,11 +16,12 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
-import time, os
+import gc, time, os, struct, tracemalloc
 import test, mock
-from taskcoachlib import persistence, config
-from taskcoachlib.domain import task, category, note
+from taskcoachlib import patterns, persistence, config
+from taskcoachlib.domain import base, task, category, effort, note, date
 from taskcoachlib.syncml.config import createDefaultSyncConfig
+from twisted.internet.protocol import Protocol
 
 
 class PerformanceTest(test.TestCase):
@@ -29,7 +30,7 @@ class PerformanceTest(test.TestCase):
         taskList = task.TaskList(
             [task.Task("test") for _ in range(self.nrTasks)]
         )
-        taskfile = open(self.taskfilename, "w")
+        taskfile = open(self.taskfilename, "wb")
         taskWriter = persistence.XMLWriter(taskfile)
         taskWriter.write(
             taskList,
@@ -57,3 +58,637 @@ class PerformanceTest(test.TestCase):
         self.assertEqual(self.nrTasks, len(mockApp.taskFile.tasks()))
         self.assertTrue(end - start < self.nrTasks / 10)
         mockApp.quitApplication()
+
+
+class Counter(object):
+    def __init__(self):
+        self.count = 0
+
+    def onEvent(self, event):
+        self.count += len(event.sources())
+
+
+class PublisherPerformanceTest(test.TestCase):
+    """Measure how fast the publisher dispatches one event with many
+    sources to observers of specific sources and to observers of all
+    sources."""
+
+    nrSources = 10000
+
+    def setUp(self):
+        self.publisher = patterns.Publisher()
+        self.sources = [object() for _ in range(self.nrSources)]
+        self.counters = []
+        for source in self.sources:
+            counter = Counter()
+            self.publisher.registerObserver(
+                counter.onEvent, eventType="eventType", eventSource=source
+            )
+            self.counters.append(counter)
+        self.allSourcesCounter = Counter()
+        self.publisher.registerObserver(
+            self.allSourcesCounter.onEvent, eventType="eventType"
+        )
+        self.otherTypeCounter = Counter()
+        self.publisher.registerObserver(
+            self.otherTypeCounter.onEvent, eventType="otherEventType"
+        )
+
+    def tearDown(self):
+        self.publisher.clear()
+        super().tearDown()
+
+    def testDispatchThroughput(self):
+        event = patterns.Event()
+        for source in self.sources:
+            event.addSource(source, "value", type="eventType")
+        nrRounds = 10
+        start = time.time()
+        for _ in range(nrRounds):
+            self.publisher.notifyObservers(event)
+        end = time.time()
+        self.assertEqual(
+            nrRounds * self.nrSources,
+            sum(counter.count for counter in self.counters),
+        )
+        self.assertEqual(
+            nrRounds * self.nrSources, self.allSourcesCounter.count
+        )
+        self.assertEqual(0, self.otherTypeCounter.count)
+        self.assertTrue(end - start < nrRounds * self.nrSources / 10000.0)
+
+
+class SchedulerPerformanceTest(test.TestCase):
+    """Measure how fast the scheduler schedules and unschedules the jobs
+    of many tasks."""
+
+    nrJobs = 20000
+
+    def setUp(self):
+        super().setUp()
+        self.scheduler = date.Scheduler()
+        self.counters = [Counter() for _ in range(self.nrJobs)]
+        self.dateTime = date.Now() + date.ONE_HOUR
+
+    def testScheduleAndUnschedule(self):
+        start = time.time()
+        for counter in self.counters:
+            self.scheduler.schedule(counter.onEvent, self.dateTime)
+        for counter in reversed(self.counters):
+            self.scheduler.unschedule(counter.onEvent)
+        end = time.time()
+        self.assertFalse(self.scheduler.get_jobs())
+        self.assertTrue(end - start < self.nrJobs / 10000.0)
+
+    def testScheduleMany(self):
+        scheduler = date.scheduler.TwistedScheduler()
+        start = time.time()
+        scheduler.scheduleMany(
+            [(counter.onEvent, self.dateTime) for counter in self.counters]
+        )
+        end = time.time()
+        try:
+            self.assertEqual(self.nrJobs, len(scheduler.jobs()))
+        finally:
+            scheduler.shutdown()
+        self.assertTrue(end - start < self.nrJobs / 20000.0)
+
+
+class TaskMemoryTest(test.TestCase):
+    """Measure how many bytes a task uses. Before domain objects kept their
+    attribute values in a value table, and before tasks shared their
+    subscriptions to setting changes, a task used about 11.9 kB."""
+
+    nrTasks = 10000
+
+    def setUp(self):
+        super().setUp()
+        task.Task.settings = config.Settings(load=False)
+
+    def bytesPerTask(self):
+        gc.collect()
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            tasks = [task.Task("task %d" % i) for i in range(self.nrTasks)]
+            gc.collect()
+            after = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(self.nrTasks, len(tasks))
+        return (after - before) / self.nrTasks
+
+    def testBytesPerTask(self):
+        self.assertTrue(self.bytesPerTask() < 4000)
+
+
+class CategorizationPerformanceTest(test.TestCase):
+    """Measure how fast tasks are added to categories and how fast the
+    categories of tasks are read, with thousands of categories."""
+
+    nrCategories = 2000
+    nrTasks = 10000
+
+    def setUp(self):
+        super().setUp()
+        task.Task.settings = config.Settings(load=False)
+        self.categories = [
+            category.Category("category %d" % index)
+            for index in range(self.nrCategories)
+        ]
+        self.tasks = [
+            task.Task("task %d" % index) for index in range(self.nrTasks)
+        ]
+
+    def categorize(self):
+        for index, eachTask in enumerate(self.tasks):
+            for offset in range(3):
+                eachCategory = self.categories[
+                    (index + offset) % self.nrCategories
+                ]
+                eachTask.addCategory(eachCategory)
+                eachCategory.addCategorizable(eachTask)
+
+    def testAddManyTasksToOneCategory(self):
+        start = time.time()
+        for eachTask in self.tasks:
+            self.categories[0].addCategorizable(eachTask)
+        end = time.time()
+        self.assertEqual(
+            self.nrTasks, len(self.categories[0].categorizables())
+        )
+        self.assertTrue(end - start < self.nrTasks / 20000.0)
+
+    def testCategorize(self):
+        start = time.time()
+        self.categorize()
+        end = time.time()
+        self.assertEqual(15, len(self.categories[0].categorizables()))
+        self.assertTrue(end - start < self.nrTasks / 1000.0)
+
+    def testReadCategories(self):
+        self.categorize()
+        nrRounds = 10
+        start = time.time()
+        for _ in range(nrRounds):
+            for eachTask in self.tasks:
+                eachTask.categories()
+        end = time.time()
+        self.assertTrue(end - start < nrRounds * self.nrTasks / 500000.0)
+
+
+class CategoryFilterPerformanceTest(test.TestCase):
+    """Measure how fast a category filter is toggled in a large file, while
+    another category is filtered already."""
+
+    nrTasks = 30000
+    nrCategories = 100
+
+    def setUp(self):
+        super().setUp()
+        task.Task.settings = config.Settings(load=False)
+        self.categories = category.CategoryList(
+            [
+                category.Category("category %d" % index)
+                for index in range(self.nrCategories)
+            ]
+        )
+        self.tasks = task.TaskList(
+            [task.Task("task %d" % index) for index in range(self.nrTasks)]
+        )
+        categories = list(self.categories)
+        for index, eachTask in enumerate(self.tasks):
+            eachCategory = categories[index % self.nrCategories]
+            eachTask.addCategory(eachCategory)
+            eachCategory.addCategorizable(eachTask)
+        self.filter = category.filter.CategoryFilter(
+            self.tasks, categories=self.categories
+        )
+        categories[0].setFiltered()
+
+    def toggle(self):
+        toggledCategory = [
+            eachCategory
+            for eachCategory in self.categories
+            if not eachCategory.isFiltered()
+        ][0]
+        nrRounds = 20
+        start = time.time()
+        for _ in range(nrRounds):
+            toggledCategory.setFiltered()
+            toggledCategory.setFiltered(False)
+        end = time.time()
+        self.assertEqual(self.nrTasks // self.nrCategories, len(self.filter))
+        return (end - start) / nrRounds
+
+    def testToggleCategoryFilter(self):
+        self.assertTrue(self.toggle() < 0.01)
+
+    def testToggleCategoryFilterWhenAllCategoriesMustMatch(self):
+        self.filter.onFilterMatchingChanged(True)
+        self.assertTrue(self.toggle() < 0.01)
+
+    def testCategorizeWhileFiltering(self):
+        filteredCategory = list(self.categories.filteredCategories())[0]
+        tasks = [
+            eachTask
+            for eachTask in self.tasks
+            if filteredCategory not in eachTask.categories()
+        ][:2000]
+        start = time.time()
+        for eachTask in tasks:
+            filteredCategory.addCategorizable(eachTask)
+        end = time.time()
+        self.assertEqual(
+            self.nrTasks // self.nrCategories + len(tasks), len(self.filter)
+        )
+        self.assertTrue(end - start < len(tasks) / 5000.0)
+
+
+class SearchFilterPerformanceTest(test.TestCase):
+    """Measure how fast a search filter searches a large file, with and
+    without the search index."""
+
+    nrTasks = 30000
+
+    def setUp(self):
+        super().setUp()
+        task.Task.settings = config.Settings(load=False)
+        self.tasks = task.TaskList(
+            [
+                task.Task(
+                    "task %d" % index,
+                    description="description of task %d" % index,
+                )
+                for index in range(self.nrTasks)
+            ]
+        )
+
+    def search(self, searchIndex):
+        searchFilter = base.SearchFilter(
+            self.tasks, searchIndex=searchIndex, searchDescription=True
+        )
+        searchFilter.setSearchFilter("task 12345", searchDescription=True)
+        nrRounds = 20
+        start = time.time()
+        for index in range(nrRounds):
+            searchFilter.setSearchFilter(
+                "task 1%04d" % index, searchDescription=True
+            )
+        end = time.time()
+        self.assertEqual(1, len(searchFilter))
+        return (end - start) / nrRounds
+
+    def testSearchWithIndexIsFasterThanWithoutIndex(self):
+        self.assertTrue(self.search(True) * 10 < self.search(False))
+
+    def testSearchWithIndex(self):
+        self.assertTrue(self.search(True) < 0.01)
+
+
+class EffortAggregatorPerformanceTest(test.TestCase):
+    """Measure how fast effort aggregated per day, as shown in the effort
+    viewer, is updated when the user changes effort, with 200,000 effort
+    records in the file."""
+
+    nrTasks = 100
+    nrDays = 2000
+
+    def setUp(self):
+        super().setUp()
+        task.Task.settings = config.Settings(load=False)
+        self.tasks = [
+            task.Task("task %d" % index) for index in range(self.nrTasks)
+        ]
+        self.firstStart = date.DateTime(2015, 1, 1, 9, 0, 0)
+        for index, eachTask in enumerate(self.tasks):
+            efforts = []
+            for day in range(self.nrDays):
+                start = self.firstStart + date.TimeDelta(
+                    days=day, minutes=index
+                )
+                efforts.append(
+                    effort.Effort(eachTask, start, start + date.ONE_MINUTE)
+                )
+            eachTask.setEfforts(efforts)
+        self.aggregator = effort.EffortAggregator(
+            task.TaskList(self.tasks), aggregation="day"
+        )
+
+    def testStartAndStopTracking(self):
+        nrRounds = 20
+        start = time.time()
+        for _ in range(nrRounds):
+            trackedEffort = effort.Effort(self.tasks[0])
+            self.tasks[0].addEffort(trackedEffort)
+            trackedEffort.setStop()
+        end = time.time()
+        self.assertTrue((end - start) / nrRounds < 0.04)
+
+    def testAddAndRemoveEffortInThePast(self):
+        nrRounds = 20
+        start = time.time()
+        for _ in range(nrRounds):
+            pastEffort = effort.Effort(
+                self.tasks[0], self.firstStart, self.firstStart + date.ONE_HOUR
+            )
+            self.tasks[0].addEffort(pastEffort)
+            self.tasks[0].removeEffort(pastEffort)
+        end = time.time()
+        self.assertTrue((end - start) / nrRounds < 0.04)
+
+
+class TaskAppearancePerformanceTest(test.TestCase):
+    """Measure how fast the colors, font and icon of the rows of a task
+    viewer with 10,000 tasks are determined when rendering the viewer."""
+
+    nrTasks = 10000
+
+    def setUp(self):
+        super().setUp()
+        task.Task.settings = config.Settings(load=False)
+        self.tasks = [
+            task.Task("task %d" % index) for index in range(self.nrTasks)
+        ]
+
+    def testRenderAllRows(self):
+        start = time.time()
+        for eachTask in self.tasks:
+            eachTask.foregroundColor(recursive=True)
+            eachTask.backgroundColor(recursive=True)
+            eachTask.font(recursive=True)
+            eachTask.icon(recursive=True)
+        end = time.time()
+        self.assertTrue(end - start < 1.0)
+
+
+class LoopbackTransport(object):
+    """Transport that queues the data written for delivery to the peer
+    by IPhoneSyncPerformanceTest.pump."""
+
+    def __init__(self):
+        self.pending = []
+
+    def write(self, data):
+        self.pending.append(data)
+
+
+class FakeIPhoneSyncFrame(object):
+    def AddLogLine(self, line):
+        pass
+
+    def SetProgress(self, value, total):
+        pass
+
+    def Finished(self):
+        pass
+
+
+class DeviceStandIn(Protocol):
+    """Plays the device side of a full synchronization from the desktop
+    and acknowledges everything it receives."""
+
+    def __init__(self, version):
+        from taskcoachlib.iphone import protocol
+
+        self.version = version
+        self.received = []
+        self.__parser = protocol.ItemParser()
+        self.__buffer = b""
+        self.__offset = 0
+        self.__script = self.script()
+        self.__item = self.__parser.parse(next(self.__script))
+
+    def script(self):
+        nrCategories, nrTasks, nrEfforts = yield "iii"
+        for format, count in (
+            ("ssz", nrCategories),
+            ("sssffffziiiii[s]", nrTasks),
+            ("ssztt", nrEfforts),
+        ):
+            while count:
+                size = 1 if self.version < 6 else (yield "i")
+                for dummy in range(size):
+                    self.received.append((yield format))
+                self.transport.write(struct.pack("!i", size))
+                count -= size
+
+    def dataReceived(self, data):
+        self.__buffer = self.__buffer[self.__offset :] + data
+        self.__offset = 0
+        while True:
+            length = self.__item.expect()
+            if length is None:
+                try:
+                    format = self.__script.send(self.__item.value)
+                except StopIteration:
+                    return
+                self.__item = self.__parser.parse(format)
+            elif len(self.__buffer) - self.__offset >= length:
+                start, self.__offset = self.__offset, self.__offset + length
+                self.__item.feed(self.__buffer[start : self.__offset])
+            else:
+                return
+
+
+class IPhoneSyncPerformanceTest(test.TestCase):
+    nrTasks = 2000
+
+    def setUp(self):
+        from taskcoachlib.iphone import protocol
+
+        super().setUp()
+        self.protocol = protocol
+        task.Task.settings = self.settings = config.Settings(load=False)
+        self.taskFile = persistence.TaskFile()
+        tasks = [task.Task("task %d" % index) for index in range(self.nrTasks)]
+        self.taskFile.tasks().extend(tasks)
+        self.taskFile.efforts().extend(
+            [
+                effort.Effort(eachTask, date.DateTime(2000, 1, 1, 10, 0))
+                for eachTask in tasks
+            ]
+        )
+        self.window = self
+
+    def tearDown(self):
+        self.taskFile.close()
+        self.taskFile.stop()
+        super().tearDown()
+
+    def createHandler(self):
+        handler = self.protocol.IPhoneHandler()
+        handler.window = self.window
+        handler.settings = self.settings
+        handler.close_when_done = lambda: None
+        return handler
+
+    def pump(self, handler, device):
+        """Deliver the data written by each side to the other side until
+        both are silent. Return the number of round trips."""
+        roundTrips = 0
+        while handler.transport.pending or device.transport.pending:
+            roundTrips += 1
+            for sender, receiver in ((handler, device), (device, handler)):
+                pending = sender.transport.pending
+                sender.transport.pending = []
+                for data in pending:
+                    receiver.dataReceived(data)
+        return roundTrips
+
+    def synchronize(self, version):
+        handler = self.createHandler()
+        device = DeviceStandIn(version)
+        handler.transport = LoopbackTransport()
+        device.makeConnection(LoopbackTransport())
+        handler.state = self.protocol.BaseState(handler)
+        handler.state.version = version
+        handler.state.ui = FakeIPhoneSyncFrame()
+        start = time.time()
+        handler.state.setState(self.protocol.FullFromDesktopState)
+        roundTrips = self.pump(handler, device)
+        end = time.time()
+        self.assertEqual(2 * self.nrTasks, len(device.received))
+        return roundTrips, end - start
+
+    def testFullSynchronization(self):
+        roundTrips, duration = self.synchronize(5)
+        self.assertEqual(2 * self.nrTasks, roundTrips)
+        self.assertTrue(duration < 5)
+
+    def testPipelinedFullSynchronization(self):
+        roundTrips, duration = self.synchronize(6)
+        self.assertTrue(roundTrips <= 2 * self.nrTasks / 100)
+        self.assertTrue(duration < 2.5)
+
+    def testReceiveManyObjectsAtOnce(self):
+        subjects = ["task %d" % index for index in range(20000)]
+        received = []
+
+        class ReceiveState(self.protocol.State):
+            def handleNewObject(self, subject):
+                received.append(subject)
+
+            def finished(self):
+                pass
+
+        handler = self.createHandler()
+        handler.transport = LoopbackTransport()
+        handler.state = ReceiveState(handler)
+        handler.state.init("s", len(subjects))
+        data = b"".join(
+            [handler.state.packed("s", subject) for subject in subjects]
+        )
+        start = time.time()
+        handler.dataReceived(data)
+        end = time.time()
+        self.assertEqual(subjects, received)
+        self.assertTrue(end - start < 1)
+
+
+class XMLReaderPerformanceTest(PerformanceTest):
+    """Compare reading a large task file with the tree based reader and
+    the streaming reader."""
+
+    def setUp(self):
+        self.nrTasks = 5000
+        self.taskfilename = "performanceTest.tsk"
+        self.createTestFile()
+
+    def read(self, streaming):
+        with open(self.taskfilename, "r") as fd:
+            tasks = persistence.XMLReader(fd, streaming=streaming).read()[0]
+        self.assertEqual(self.nrTasks, len(tasks))
+        return tasks
+
+    def duration(self, streaming):
+        start = time.time()
+        self.read(streaming)
+        return time.time() - start
+
+    def peakMemoryGrowth(self, streaming):
+        """Return how much the peak resident memory of a child process
+        grows while it reads the file. The element tree is allocated by
+        libxml2 and not by Python, so tracemalloc can't measure it."""
+        try:
+            import resource
+
+            fork = os.fork
+        except (ImportError, AttributeError):
+            self.skipTest("no fork or resource module on this platform")
+        readFd, writeFd = os.pipe()
+        pid = fork()
+        if pid == 0:  # pragma: no cover
+            os.close(readFd)
+            try:
+                before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+                self.read(streaming)
+                after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+                os.write(writeFd, struct.pack("q", after - before))
+            finally:
+                os._exit(0)
+        os.close(writeFd)
+        try:
+            data = os.read(readFd, 8)
+        finally:
+            os.close(readFd)
+            os.waitpid(pid, 0)
+        self.assertEqual(8, len(data), "child process failed to read")
+        return struct.unpack("q", data)[0]
+
+    def testStreamingReadIsNotSlowerThanTreeRead(self):
+        treeDuration = self.duration(streaming=False)
+        streamingDuration = self.duration(streaming=True)
+        self.assertTrue(streamingDuration < 1.5 * treeDuration + 0.1)
+
+    def testStreamingReadUsesLessMemoryThanTreeRead(self):
+        treeGrowth = self.peakMemoryGrowth(streaming=False)
+        streamingGrowth = self.peakMemoryGrowth(streaming=True)
+        self.assertTrue(streamingGrowth < treeGrowth)
+
+
+class TaskFileMergePerformanceTest(test.TestCase):
+    """Measure how fast a large task file is merged into another large
+    task file, half of whose tasks are overwritten by the merge."""
+
+    nrTasks = 10000
+
+    def setUp(self):
+        super().setUp()
+        task.Task.settings = config.Settings(load=False)
+        self.filename = "performanceTestMerge.tsk"
+        self.taskFile = persistence.TaskFile()
+        self.taskFile.tasks().extend(
+            [task.Task("task %d" % index) for index in range(self.nrTasks)]
+        )
+        mergeFile = persistence.TaskFile()
+        mergeFile.setFilename(self.filename)
+        mergeFile.tasks().extend(
+            [
+                task.Task("merged", id=eachTask.id())
+                for eachTask in list(self.taskFile.tasks())[
+                    : self.nrTasks // 2
+                ]
+            ]
+            + [task.Task("new") for _ in range(self.nrTasks // 2)]
+        )
+        mergeFile.save()
+        mergeFile.close()
+        mergeFile.stop()
+
+    def tearDown(self):
+        self.taskFile.close()
+        self.taskFile.stop()
+        for filename in (self.filename, self.filename + ".delta"):
+            if os.path.exists(filename):
+                os.remove(filename)
+        super().tearDown()
+
+    def testMerge(self):
+        start = time.time()
+        self.taskFile.merge(self.filename)
+        end = time.time()
+        self.assertEqual(
+            self.nrTasks + self.nrTasks // 2, len(self.taskFile.tasks())
+        )
+        self.assertTrue(end - start < self.nrTasks / 500.0)
@@ -18,7 +18,7 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
-import test, sys, os, configparser, io
+import test, sys, os, configparser, io, wx
 from taskcoachlib import config, meta
 from pubsub import pub
 
@@ -135,6 +135,51 @@ class SettingsTest(SettingsTestCase):
         )
 
 
+class CachedSettingsTest(SettingsTestCase):
+    def testGetBooleanAfterSet(self):
+        self.assertEqual(True, self.settings.getboolean("view", "statusbar"))
+        self.settings.setboolean("view", "statusbar", False)
+        self.assertEqual(False, self.settings.getboolean("view", "statusbar"))
+
+    def testGetIntAfterInit(self):
+        self.settings.getint("view", "efforthourstart")
+        self.settings.init("view", "efforthourstart", "3")
+        self.assertEqual(3, self.settings.getint("view", "efforthourstart"))
+
+    def testChangingTheListReturnedDoesNotChangeTheSetting(self):
+        self.settings.getlist("file", "recentfiles").append("file.tsk")
+        self.assertEqual([], self.settings.getlist("file", "recentfiles"))
+
+    def testGetColour(self):
+        self.settings.settuple("fgcolor", "activetasks", (1, 2, 3))
+        self.assertEqual(
+            wx.Colour(1, 2, 3),
+            self.settings.getcolour("fgcolor", "activetasks"),
+        )
+
+    def testGetColourIsCached(self):
+        colour = self.settings.getcolour("fgcolor", "activetasks")
+        self.assertTrue(
+            colour is self.settings.getcolour("fgcolor", "activetasks")
+        )
+
+    def testGetColourAfterSet(self):
+        self.settings.getcolour("fgcolor", "activetasks")
+        self.settings.settuple("fgcolor", "activetasks", (4, 5, 6))
+        self.assertEqual(
+            wx.Colour(4, 5, 6),
+            self.settings.getcolour("fgcolor", "activetasks"),
+        )
+
+    def testGetFontWhenNotSet(self):
+        self.assertEqual(None, self.settings.getfont("font", "activetasks"))
+
+    def testGetAfterReadingFile(self):
+        self.settings.get("view", "statusbar")
+        self.settings.read_file(io.StringIO("[view]\nstatusbar = False\n"))
+        self.assertEqual(False, self.settings.getboolean("view", "statusbar"))
+
+
 class SettingsIOTest(SettingsTestCase):
     def setUp(self):
         super().setUp()
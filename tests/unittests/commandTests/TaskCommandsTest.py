@@ -150,6 +150,12 @@ class DeleteCommandWithTasksTest(TaskCommandTestCase):
             lambda: self.assertTaskList([self.task1, self.task2]),
         )
 
+    def testDeleteWithoutShadowIsCompactedWithoutSavedStates(self):
+        delete = command.DeleteTaskCommand(self.taskList, [self.task1])
+        delete.do()
+        self.assertEqual([], delete.changes)
+        self.assertHistoryAndFuture([delete], [])
+
     def testDeleteEmptyList(self):
         self.taskList.remove(self.task1)
         self.delete("all")
@@ -514,6 +520,28 @@ class MarkCompletedCommandTest(CommandWithChildrenTestCase):
             lambda: self.assertTrue(self.task1.isBeingTracked()),
         )
 
+    def testMarkCompletedOnlyKeepsChangedAttributes(self):
+        markCompleted = command.MarkCompletedCommand(
+            self.taskList, [self.child]
+        )
+        markCompleted.do()
+        markCompleted.compact()
+        self.assertEqual(
+            set([self.child, self.grandchild]),
+            set(changed for changed, _, _, _ in markCompleted.changes),
+        )
+
+    def testMarkCompletedAfterCompacting(self):
+        markCompleted = command.MarkCompletedCommand(
+            self.taskList, [self.task1]
+        )
+        markCompleted.do()
+        markCompleted.compact()
+        self.assertDoUndoRedo(
+            lambda: self.assertTrue(self.task1.completed()),
+            lambda: self.assertFalse(self.task1.completed()),
+        )
+
     def testMarkCompletedChildDoesNotStopEffortTrackingOfParent(self):
         self.parent.addEffort(effort.Effort(self.parent))
         self.markCompleted([self.child])
@@ -601,6 +629,16 @@ class EditPercentageCompleteTest(TaskCommandTestCase):
             ),
         )
 
+    def testUndoAndRedoSuccessiveEdits(self):
+        for percentage in 30, 60, 90:
+            self.editPercentageComplete([self.task1], percentage)
+        for percentage in 60, 30, 0:
+            self.undo()
+            self.assertEqual(percentage, self.task1.percentageComplete())
+        for percentage in 30, 60, 90:
+            self.redo()
+            self.assertEqual(percentage, self.task1.percentageComplete())
+
 
 class MarkActiveCommandTest(TaskCommandTestCase):
     def testMarkInactiveTaskActive(self):
@@ -714,6 +752,18 @@ class DragAndDropTaskCommandTest(CommandWithChildrenTestCase):
             lambda: self.assertEqual(self.child, self.grandchild.parent()),
         )
 
+    def testDropSeveralRootTasksOnAnotherTask(self):
+        sorter = task.sorter.Sorter(self.taskList, treeMode=True)
+        self.taskList.append(self.task2)
+        self.dragAndDrop([self.parent], [self.task1, self.task2])
+        self.assertDoUndoRedo(
+            lambda: self.assertEqual([self.parent], sorter.rootItems()),
+            lambda: self.assertEqual(
+                set([self.parent, self.task1, self.task2]),
+                set(sorter.rootItems()),
+            ),
+        )
+
 
 class PriorityCommandTestCase(TaskCommandTestCase):
     def setUp(self):
@@ -834,3 +834,36 @@ class BaseCollectionTest(test.TestCase):
         self.assertEqual(
             domainObject, self.collection.getObjectById(domainObject.id())
         )
+
+    def testLookupIdOfChildWhenParentIsInCollection(self):
+        parent = base.CompositeObject()
+        child = base.CompositeObject()
+        parent.addChild(child)
+        self.collection.append(parent)
+        self.assertEqual(child, self.collection.getObjectById(child.id()))
+
+    def testLookupIdAfterObjectIsRemovedRaisesIndexError(self):
+        domainObject = base.CompositeObject()
+        self.collection.append(domainObject)
+        self.collection.remove(domainObject)
+        self.assertRaises(
+            IndexError, self.collection.getObjectById, domainObject.id()
+        )
+
+    def testLookupIdAfterClearRaisesIndexError(self):
+        domainObject = base.CompositeObject()
+        self.collection.append(domainObject)
+        self.collection.clear()
+        self.assertRaises(
+            IndexError, self.collection.getObjectById, domainObject.id()
+        )
+
+    def testLookupIds(self):
+        domainObjects = [base.CompositeObject() for _ in range(3)]
+        self.collection.extend(domainObjects[:2])
+        self.assertEqual(
+            domainObjects[:2],
+            self.collection.getObjectsByIds(
+                [domainObject.id() for domainObject in domainObjects]
+            ),
+        )
@@ -67,6 +67,17 @@ class CategorizableCompositeObjectTest(test.TestCase):
         self.categorizable.addCategory(self.category)
         self.assertEqual(set([self.category]), self.categorizable.categories())
 
+    def testCategoriesAreNotCopied(self):
+        self.categorizable.addCategory(self.category)
+        self.assertTrue(
+            self.categorizable.categories() is self.categorizable.categories()
+        )
+
+    def testCategoriesAreReadOnly(self):
+        categories = self.categorizable.categories()
+        self.categorizable.addCategory(self.category)
+        self.assertEqual(frozenset(), categories)
+
     def testAddCategoryNotification(self):
         self.registerObserver(self.categoryAddedEventType)
         self.categorizable.addCategory(self.category)
@@ -585,6 +585,36 @@ class ParentAndChildCategoryAndParentAndChildTaskFixture(Fixture):
         self.childCategory.setFiltered()
         self.assertChildTaskIsFiltered()
 
+    def testThatFilterContainsTaskThatIsUnlinkedFromOneOfTwoSubcategories(
+        self,
+    ):
+        otherChildCategory = category.Category("other child")
+        self.parentCategory.addChild(otherChildCategory)
+        otherChildCategory.setParent(self.parentCategory)
+        self.categories.append(otherChildCategory)
+        self.link(self.childCategory, self.parentTask)
+        self.link(otherChildCategory, self.parentTask)
+        self.parentCategory.setFiltered()
+        self.childCategory.removeCategorizable(self.parentTask)
+        self.parentTask.removeCategory(self.childCategory)
+        self.assertFilterHidesNothing()
+
+    def testThatFilterHidesTaskThatIsUnlinkedWhileFiltering(self):
+        self.link(self.childCategory, self.childTask)
+        self.parentCategory.setFiltered()
+        self.childCategory.removeCategorizable(self.childTask)
+        self.childTask.removeCategory(self.childCategory)
+        self.assertFilterHidesEverything()
+
+    def testThatFilterContainsNewChildOfCategorizedTask(self):
+        self.link(self.parentCategory, self.parentTask)
+        self.parentCategory.setFiltered()
+        grandChildTask = task.Task("grandchild")
+        self.childTask.addChild(grandChildTask)
+        grandChildTask.setParent(self.childTask)
+        self.tasks.append(grandChildTask)
+        self.assertTrue(grandChildTask in self.filter)
+
 
 class ParentAndChildCategoryAndParentAndChildTaskInListModeTest(
     ParentAndChildCategoryAndParentAndChildTaskFixture, test.TestCase
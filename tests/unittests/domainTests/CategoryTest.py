@@ -141,6 +141,17 @@ class CategoryTest(test.TestCase):
         self.assertFalse(self.category.categorizables())
         self.assertFalse(self.categorizable.categories())
 
+    def testCategorizablesAreReadOnly(self):
+        categorizables = self.category.categorizables()
+        self.category.addCategorizable(self.categorizable)
+        self.assertEqual(frozenset(), categorizables)
+
+    def testRemoveOneOfTwoCategorizables(self):
+        other = categorizable.CategorizableCompositeObject()
+        self.category.addCategorizable(self.categorizable, other)
+        self.category.removeCategorizable(self.categorizable)
+        self.assertEqual(set([other]), self.category.categorizables())
+
     def testRemovecategorizableThatsNotInThisCategory(self):
         self.category.removeCategorizable(self.categorizable)
         self.assertFalse(self.category.categorizables())
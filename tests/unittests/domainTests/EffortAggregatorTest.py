@@ -272,6 +272,33 @@ class CommonTestsMixin(object):
         self.effort1period1a.setStart(date.DateTime(2005, 1, 1, 11, 0, 0))
         self.assertEqual(4, len(self.effortAggregator))
 
+    def testChangeStartToPeriodThatHasEffortAlready(self):
+        self.taskList.append(self.task1)
+        self.task1.addEffort(self.effort1period1a)
+        self.task1.addEffort(self.effort1period2)
+        self.effort1period1a.setStart(self.effort1period2.getStart())
+        self.assertEqual(2, len(self.effortAggregator))
+        for composite in self.effortAggregator:
+            self.assertEqual(2, len(composite))
+
+    def testChangeStartTwice(self):
+        self.taskList.append(self.task1)
+        self.task1.addEffort(self.effort1period1a)
+        self.task1.addEffort(self.effort1period2)
+        self.effort1period1a.setStart(self.effort1period2.getStart())
+        self.effort1period1a.setStart(self.effort1period1b.getStart())
+        self.assertEqual(4, len(self.effortAggregator))
+        for composite in self.effortAggregator:
+            self.assertEqual(1, len(composite))
+
+    def testChangeStartOfChildEffort(self):
+        self.taskList.extend([self.task1, self.task3])
+        self.task3.addEffort(self.effort3period1a)
+        self.effort3period1a.setStart(self.effort1period2.getStart())
+        self.assertEqual(3, len(self.effortAggregator))
+        for composite in self.effortAggregator:
+            self.assertEqual([self.effort3period1a], list(composite))
+
     def testNotification_Add(self):
         self.taskList.append(self.task1)
         self.task1.addEffort(self.effort1period1a)
@@ -399,3 +426,56 @@ class MultipleAggregatorsTest(test.TestCase):
         aTask.addEffort(anEffort)
         aTask.removeEffort(anEffort)
         self.assertFalse(self.effortPerDay)
+
+
+class EffortStoreTest(test.TestCase):
+    def setUp(self):
+        task.Task.settings = config.Settings(load=False)
+        self.store = effort.reducer.EffortStore(self.period)
+        self.task = task.Task()
+        self.effort = effort.Effort(
+            self.task, date.DateTime(2006, 8, 28, 10, 0, 0)
+        )
+
+    @staticmethod
+    def period(anEffort):
+        start = anEffort.getStart()
+        return start.startOfDay(), start.endOfDay()
+
+    def efforts(self, anEffort):
+        return set(self.store.efforts(*self.period(anEffort)))
+
+    def testEmptyStore(self):
+        self.assertEqual(0, len(self.store))
+        self.assertEqual(set(), self.efforts(self.effort))
+
+    def testAdd(self):
+        self.store.add(self.effort)
+        self.assertEqual({self.effort}, self.efforts(self.effort))
+        self.assertEqual(
+            self.period(self.effort), self.store.period(self.effort)
+        )
+
+    def testAddTwice(self):
+        self.store.add(self.effort)
+        self.store.add(self.effort)
+        self.assertEqual(1, len(self.store))
+
+    def testAddAfterStartChanged(self):
+        self.store.add(self.effort)
+        previousPeriod = self.period(self.effort)
+        self.effort.setStart(date.DateTime(2006, 8, 29, 10, 0, 0))
+        self.store.add(self.effort)
+        self.assertEqual({self.effort}, self.efforts(self.effort))
+        self.assertEqual(set(), set(self.store.efforts(*previousPeriod)))
+
+    def testRemove(self):
+        self.store.add(self.effort)
+        self.store.remove(self.effort)
+        self.assertEqual(0, len(self.store))
+        self.assertEqual(set(), self.efforts(self.effort))
+        self.assertEqual(None, self.store.period(self.effort))
+
+    def testRemoveEffortNotInStore(self):
+        self.store.remove(self.effort)
+        self.assertEqual(0, len(self.store))
@@ -58,6 +58,15 @@ class EffortListTest(test.TestCase):
         self.assertEqual(1, len(self.effortList))
         self.assertTrue(self.effort in self.effortList)
 
+    def testAppendTwoEffortsInOneBatch(self):
+        secondEffort = effort.Effort(self.task, date.DateTime(2004, 1, 3))
+        with patterns.batch():
+            self.task.addEffort(self.effort)
+            self.task.addEffort(secondEffort)
+        self.assertEqual(
+            set([self.effort, secondEffort]), set(self.effortList)
+        )
+
     def testNotificationAfterRemove(self):
         self.task.addEffort(self.effort)
         self.task.removeEffort(self.effort)
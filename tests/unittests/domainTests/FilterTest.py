@@ -26,6 +26,16 @@ class TestFilter(base.Filter):
         return [item for item in items if item > "b"]
 
 
+class CountingFilter(TestFilter):
+    def __init__(self, *args, **kwargs):
+        self.filteredItems = []
+        super().__init__(*args, **kwargs)
+
+    def filterItems(self, items):
+        self.filteredItems.extend(items)
+        return super().filterItems(items)
+
+
 class FilterTestsMixin(object):
     def setUp(self):
         self.observable = self.collectionClass(["a", "b", "c", "d"])
@@ -48,6 +58,21 @@ class FilterTestsMixin(object):
         self.assertEqual(3, len(self.filter))
         self.assertTrue("e" in self.filter)
 
+    def testOnlyAddedItemsAreFiltered(self):
+        countingFilter = CountingFilter(self.observable)
+        countingFilter.filteredItems = []
+        self.observable.append("e")
+        self.assertEqual(["e"], countingFilter.filteredItems)
+
+    def testRefreshItems(self):
+        self.filter.refreshItems(["a", "c"])
+        self.assertEqual(2, len(self.filter))
+        self.assertTrue("c" in self.filter and "d" in self.filter)
+
+    def testRefreshItemsIgnoresItemsNotInObservable(self):
+        self.filter.refreshItems(["x"])
+        self.assertFalse("x" in self.filter)
+
 
 class FilterListTest(FilterTestsMixin, test.TestCase):
     collectionClass = patterns.ObservableList
@@ -219,6 +244,134 @@ class SearchFilterTest(test.TestCase):
         self.assertEqual(2, len(self.filter))
 
 
+class SearchFilterWithIndexTest(test.TestCase):
+    def setUp(self):
+        task.Task.settings = config.Settings(load=False)
+        self.parent = task.Task(subject="Parent", description="Groceries")
+        self.child = task.Task(subject="Child", description="Vegetables")
+        self.parent.addChild(self.child)
+        self.list = task.TaskList([self.parent, self.child])
+        self.filter = base.SearchFilter(self.list, searchIndex=True)
+
+    def setSearchString(self, searchString, **kwargs):
+        self.filter.setSearchFilter(searchString, **kwargs)
+
+    def assertFilterShows(self, *tasks):
+        self.assertEqual(set(tasks), set(self.filter))
+
+    def testNoMatch(self):
+        self.setSearchString("xyz")
+        self.assertFilterShows()
+
+    def testMatch(self):
+        self.setSearchString("aren")
+        self.assertFilterShows(self.parent)
+
+    def testMatchIsCaseInsensitiveByDefault(self):
+        self.setSearchString("PARENT")
+        self.assertFilterShows(self.parent)
+
+    def testMatchCase(self):
+        self.setSearchString("PARENT", matchCase=True)
+        self.assertFilterShows()
+
+    def testShortSearchString(self):
+        self.setSearchString("ch")
+        self.assertFilterShows(self.child)
+
+    def testSearchDescription(self):
+        self.setSearchString("veget", searchDescription=True)
+        self.assertFilterShows(self.child)
+
+    def testDescriptionIsNotSearchedByDefault(self):
+        self.setSearchString("veget")
+        self.assertFilterShows()
+
+    def testMatchDoesNotSpanSubjectAndDescription(self):
+        self.setSearchString("childveg", searchDescription=True)
+        self.assertFilterShows()
+
+    def testMatchChildAlsoSelectsParentInTreeMode(self):
+        self.filter.setTreeMode(True)
+        self.setSearchString("child")
+        self.assertFilterShows(self.parent, self.child)
+
+    def testIncludeSubItems(self):
+        self.setSearchString("parent", includeSubItems=True)
+        self.assertFilterShows(self.parent, self.child)
+
+    def testChangeSubject(self):
+        self.setSearchString("xyz")
+        self.child.setSubject("xyz")
+        self.filter.reset()
+        self.assertFilterShows(self.child)
+
+    def testChangeSubjectSoItNoLongerMatches(self):
+        self.setSearchString("child")
+        self.child.setSubject("other")
+        self.filter.reset()
+        self.assertFilterShows()
+
+    def testChangeDescription(self):
+        self.setSearchString("xyz", searchDescription=True)
+        self.parent.setDescription("xyz")
+        self.filter.reset()
+        self.assertFilterShows(self.parent)
+
+    def testAddTask(self):
+        self.setSearchString("xyz")
+        taskXYZ = task.Task(subject="subject with XYZ")
+        self.list.append(taskXYZ)
+        self.assertFilterShows(taskXYZ)
+
+    def testRemoveTask(self):
+        self.setSearchString("child")
+        self.list.remove(self.child)
+        self.assertFilterShows()
+
+    def testChangeSubjectOfRemovedTask(self):
+        self.setSearchString("child")
+        self.list.remove(self.child)
+        self.child.setSubject("still a child")
+        self.filter.reset()
+        self.assertFilterShows()
+
+
+class RefreshItemsInTreeModeTest(test.TestCase):
+    def setUp(self):
+        task.Task.settings = config.Settings(load=False)
+        self.parent = task.Task(subject="parent")
+        self.child = task.Task(subject="child")
+        self.parent.addChild(self.child)
+        self.list = task.TaskList([self.parent, self.child])
+        self.filter = base.SearchFilter(self.list, treeMode=True)
+        self.filter.setSearchFilter("child")
+
+    def testParentIsIncludedBecauseOfChild(self):
+        self.assertEqual(2, len(self.filter))
+
+    def testParentIsRemovedWhenChildNoLongerMatches(self):
+        self.child.setSubject("other")
+        self.filter.refreshItems([self.child])
+        self.assertFalse(self.filter)
+
+    def testParentIsAddedWhenChildStartsMatching(self):
+        self.child.setSubject("other")
+        self.filter.refreshItems([self.child])
+        self.child.setSubject("child")
+        self.filter.refreshItems([self.child])
+        self.assertEqual(2, len(self.filter))
+
+    def testParentStaysWhenOneOfTwoChildrenStopsMatching(self):
+        otherChild = task.Task(subject="another child")
+        self.parent.addChild(otherChild)
+        self.list.append(otherChild)
+        self.child.setSubject("other")
+        self.filter.refreshItems([self.child])
+        self.assertEqual(2, len(self.filter))
+        self.assertTrue(otherChild in self.filter)
+
+
 class DeletedFilterTest(test.TestCase):
     def setUp(self):
         task.Task.settings = config.Settings(load=False)
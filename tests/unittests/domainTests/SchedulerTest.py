@@ -78,3 +78,90 @@ class SchedulerTest(test.TestCase):
             self.assertEqual(self.callCount, 2)
         finally:
             self.scheduler.unschedule(self.callback)
+
+    def testUnscheduleOneOfMany(self):
+        futureDate = date.Now() + date.TimeDelta(hours=1)
+        callbacks = [Callback() for _ in range(3)]
+        for callback in callbacks:
+            self.scheduler.schedule(callback.onCall, futureDate)
+        self.scheduler.unschedule(callbacks[1].onCall)
+        try:
+            self.assertEqual(
+                [True, False, True],
+                [
+                    self.scheduler.is_scheduled(callback.onCall)
+                    for callback in callbacks
+                ],
+            )
+        finally:
+            for callback in callbacks:
+                self.scheduler.unschedule(callback.onCall)
+
+    def testJobsAreSortedByDateTime(self):
+        now = date.Now()
+        callbacks = [Callback() for _ in range(3)]
+        for hours, callback in zip((3, 1, 2), callbacks):
+            self.scheduler.schedule(
+                callback.onCall, now + date.TimeDelta(hours=hours)
+            )
+        try:
+            expectedJobs = [
+                date.scheduler.ScheduledMethod(callbacks[index].onCall)
+                for index in (1, 2, 0)
+            ]
+            self.assertEqual(expectedJobs, self.scheduler.get_jobs())
+        finally:
+            for callback in callbacks:
+                self.scheduler.unschedule(callback.onCall)
+
+    def testJobsScheduledWhileDeferredAreScheduled(self):
+        futureDate = date.Now() + date.TimeDelta(hours=1)
+        with self.scheduler.deferred():
+            self.scheduler.schedule(self.callback, futureDate)
+            self.assertTrue(self.scheduler.is_scheduled(self.callback))
+        try:
+            self.assertTrue(self.scheduler.is_scheduled(self.callback))
+        finally:
+            self.scheduler.unschedule(self.callback)
+
+    def testJobsUnscheduledWhileDeferredAreNotScheduled(self):
+        futureDate = date.Now() + date.TimeDelta(hours=1)
+        with self.scheduler.deferred():
+            self.scheduler.schedule(self.callback, futureDate)
+            self.scheduler.unschedule(self.callback)
+        self.assertFalse(self.scheduler.is_scheduled(self.callback))
+        self.assertFalse(self.scheduler.get_jobs())
+
+
+class TwistedSchedulerTest(test.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.scheduler = date.scheduler.TwistedScheduler()
+
+    def tearDown(self):
+        self.scheduler.shutdown()
+        super().tearDown()
+
+    def testScheduleMany(self):
+        futureDate = date.Now() + date.TimeDelta(hours=1)
+        jobs = [Callback().onCall for _ in range(3)]
+        self.scheduler.scheduleMany([(job, futureDate) for job in jobs])
+        self.assertEqual(jobs, self.scheduler.jobs())
+        for job in jobs:
+            self.assertTrue(self.scheduler.isScheduled(job))
+
+    def testScheduleManySortsJobsByDateTime(self):
+        now = date.Now()
+        jobs = [Callback().onCall for _ in range(3)]
+        self.scheduler.scheduleMany(
+            [
+                (job, now + date.TimeDelta(hours=hours))
+                for job, hours in zip(jobs, (3, 1, 2))
+            ]
+        )
+        self.assertEqual([jobs[1], jobs[2], jobs[0]], self.scheduler.jobs())
+
+
+class Callback(object):
+    def onCall(self):
+        pass
@@ -19,6 +19,7 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 import test
 from taskcoachlib import config
 from taskcoachlib.domain import task, effort, date, category
+from pubsub import pub
 
 
 class DummyTaskList(task.TaskList):
@@ -67,6 +68,37 @@ class TaskSorterTest(test.TestCase):
         self.a.setSubject("z")
         self.assertEqual([self.b, self.c, self.d, self.a], list(self.sorter))
 
+    def testAppendInTheMiddle(self):
+        e = task.Task("bb")
+        self.list.append(e)
+        self.assertEqual(
+            [self.a, self.b, e, self.c, self.d], list(self.sorter)
+        )
+
+    def testChangeSendsSortEvent(self):
+        self.sortEvents = []
+        pub.subscribe(self.onSorted, self.sorter.sortEventType())
+        self.a.setSubject("z")
+        self.assertEqual([self.sorter], self.sortEvents)
+
+    def testChangeThatDoesNotMoveItemsDoesNotSendSortEvent(self):
+        self.sortEvents = []
+        pub.subscribe(self.onSorted, self.sorter.sortEventType())
+        self.b.setSubject("bb")
+        self.assertEqual([], self.sortEvents)
+        self.assertEqual([self.a, self.b, self.c, self.d], list(self.sorter))
+
+    def testChangeMultipleSortKeys(self):
+        self.sorter.sortBy("priority")
+        self.sorter.sortBy("priority")  # Descending
+        self.c.setPriority(1)
+        self.assertEqual([self.c, self.a, self.b, self.d], list(self.sorter))
+        self.c.setPriority(0)
+        self.assertEqual([self.a, self.b, self.c, self.d], list(self.sorter))
+
+    def onSorted(self, sender):
+        self.sortEvents.append(sender)
+
 
 class TaskSorterSettingsTest(test.TestCase):
     def setUp(self):
@@ -163,6 +163,16 @@ class ViewFilterTestsMixin(object):
         self.filter.hideTaskStatus(task.status.overdue)
         self.assertFilterIsEmpty()
 
+    def testFilterOverDueTask_WhenDueDateTimePasses(self):
+        self.list.extend([self.task, self.dueTomorrow])
+        self.filter.hideTaskStatus(task.status.overdue)
+        oldNow = date.Now
+        now = self.dueTomorrow.dueDateTime() + date.ONE_SECOND
+        date.Now = lambda: now
+        self.dueTomorrow.onOverDue()
+        self.assertFilterShows(self.task)
+        date.Now = oldNow
+
     def testFilterOverDueTaskWithActiveChild(self):
         self.child.setActualStartDateTime(date.Now())
         self.task.setDueDateTime(date.Now() - date.ONE_HOUR)
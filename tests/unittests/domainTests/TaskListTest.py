@@ -57,6 +57,43 @@ class TaskListTest(test.TestCase):
         self.taskList.append(task.Task(dueDateTime=date.Now() + date.ONE_HOUR))
         self.assertEqual(1, self.nrStatus(task.status.duesoon))
 
+    def testNrOverdueWhenDueDateTimePasses(self):
+        self.taskList.append(self.task1)
+        self.assertEqual(0, self.nrStatus(task.status.overdue))
+        oldNow = date.Now
+        now = self.task1.dueDateTime() + date.ONE_SECOND
+        date.Now = lambda: now
+        self.task1.onOverDue()
+        self.assertEqual(1, self.nrStatus(task.status.overdue))
+        date.Now = oldNow
+
+    def testNrOfTasksPerStatusAfterRemovingTask(self):
+        self.taskList.extend([self.task1, self.task2])
+        self.assertEqual(2, self.nrStatus(task.status.inactive))
+        self.taskList.remove(self.task1)
+        self.assertEqual(1, self.nrStatus(task.status.inactive))
+
+    def testNrOfTasksPerStatusAfterClear(self):
+        self.taskList.extend([self.task1, self.task2])
+        self.assertEqual(2, self.nrStatus(task.status.inactive))
+        self.taskList.clear()
+        self.assertEqual(0, self.nrStatus(task.status.inactive))
+
+    def testNrOfTasksPerStatusIgnoresRemovedTask(self):
+        self.taskList.append(self.task1)
+        self.assertEqual(0, self.nrStatus(task.status.completed))
+        self.taskList.remove(self.task1)
+        self.task1.setCompletionDateTime()
+        self.assertEqual(0, self.nrStatus(task.status.completed))
+
+    def testNrOfTasksPerStatusIgnoresDeletedTasks(self):
+        self.taskList.extend([self.task1, self.task2])
+        self.assertEqual(2, self.nrStatus(task.status.inactive))
+        self.task1.markDeleted()
+        self.assertEqual(1, self.nrStatus(task.status.inactive))
+        self.task1.cleanDirty()
+        self.assertEqual(2, self.nrStatus(task.status.inactive))
+
     def testNrBeingTracked(self):
         self.assertEqual(0, self.taskList.nrBeingTracked())
         activeTask = task.Task()
@@ -385,6 +385,34 @@ class DefaultTaskStateTest(
         )
         date.Now = oldNow
 
+    def testStatusChangedNotificationAfterDueDateTimeHasPassed(self):
+        events = []
+
+        def onEvent(newValue, sender):
+            events.append((newValue, sender))
+
+        pub.subscribe(onEvent, task.Task.statusChangedEventType())
+        self.task.setDueDateTime(self.tomorrow)
+        self.assertNotEqual(task.status.overdue, self.task.status())
+        del events[:]
+        now = self.tomorrow + date.ONE_SECOND
+        oldNow = date.Now
+        date.Now = lambda: now
+        self.task.onOverDue()
+        date.Now = oldNow
+        self.assertEqual([(task.status.overdue, self.task)], events)
+
+    def testNoStatusChangedNotificationWhenStatusDoesNotChange(self):
+        events = []
+
+        def onEvent(newValue, sender):
+            events.append((newValue, sender))
+
+        pub.subscribe(onEvent, task.Task.statusChangedEventType())
+        self.assertEqual(task.status.inactive, self.task.status())
+        self.task.setDueDateTime(date.DateTime(date.Now().year + 1, 1, 1))
+        self.assertFalse(events)
+
     def testIconChangedAfterTaskHasBecomeDueSoon(self):
         self.settings.setint("behavior", "duesoonhours", 1)
         self.task.setDueDateTime(self.tomorrow)
@@ -2942,6 +2970,64 @@ class TaskWithGrandChildAndEffortTest(TaskTestCase, CommonTaskTestsMixin):
             self.task1.efforts(recursive=True),
         )
 
+    def testRecursiveTimeSpentAfterAddingEffortToGrandChild(self):
+        self.task1.timeSpent(recursive=True)
+        self.addEffort(date.ONE_HOUR, self.task1_1_1)
+        self.assertEqual(
+            date.TimeDelta(days=3) + date.ONE_HOUR,
+            self.task1.timeSpent(recursive=True),
+        )
+
+    def testRecursiveTimeSpentAfterChangingEffortOfGrandChild(self):
+        self.task1.timeSpent(recursive=True)
+        self.task1_1_1effort1.setStop(date.DateTime(2005, 3, 3))
+        self.assertEqual(
+            date.TimeDelta(days=4), self.task1.timeSpent(recursive=True)
+        )
+
+    def testRecursiveTimeSpentOfTrackedEffortIncreases(self):
+        self.task1.timeSpent(recursive=True)
+        self.task1_1_1effort1.setStop(date.DateTime.max)
+        self.assertTrue(self.task1.isBeingTracked(recursive=True))
+        timeSpent = self.task1.timeSpent(recursive=True)
+        self.assertTrue(timeSpent > date.TimeDelta(days=365))
+        self.assertTrue(self.task1.timeSpent(recursive=True) >= timeSpent)
+
+    def testRecursiveAggregatesAfterRemovingGrandChild(self):
+        self.task1_1_1.setBudget(date.ONE_HOUR)
+        self.task1.budget(recursive=True)
+        self.task1.timeSpent(recursive=True)
+        self.task1_1.removeChild(self.task1_1_1)
+        self.assertEqual(
+            date.TimeDelta(days=2), self.task1.timeSpent(recursive=True)
+        )
+        self.assertEqual(date.TimeDelta(), self.task1.budget(recursive=True))
+        self.assertEqual(
+            [self.task1effort1, self.task1_1effort1],
+            self.task1.efforts(recursive=True),
+        )
+
+    def testRecursiveBudgetAfterChangingBudgetOfGrandChild(self):
+        self.task1.budget(recursive=True)
+        self.task1_1_1.setBudget(date.ONE_HOUR)
+        self.assertEqual(date.ONE_HOUR, self.task1.budget(recursive=True))
+
+    def testRecursivePercentageCompleteAfterChangingGrandChild(self):
+        self.task1.percentageComplete(recursive=True)
+        self.task1_1_1.setPercentageComplete(60)
+        self.assertEqual(15, self.task1.percentageComplete(recursive=True))
+
+    def testRecursiveRevenueAfterChangingHourlyFeeOfGrandChild(self):
+        self.task1.revenue(recursive=True)
+        self.task1_1_1.setHourlyFee(100)
+        self.assertEqual(2400, self.task1.revenue(recursive=True))
+
+    def testRecursiveRevenueAfterChangingFixedFeeOfGrandChild(self):
+        self.task1.revenue(recursive=True)
+        self.task1_1_1.setFixedFee(100)
+        self.assertEqual(100, self.task1.fixedFee(recursive=True))
+        self.assertEqual(100, self.task1.revenue(recursive=True))
+
 
 class TaskWithBudgetTest(TaskTestCase, CommonTaskTestsMixin):
     def taskCreationKeywordArguments(self):
@@ -215,6 +215,19 @@ class IOControllerTest(test.TestCase):
         )  # pylint: disable=W0212
         self.assertTrue(self.showerrorCalled)
 
+    def testSaveMessageReportsDurationOfSave(self):
+        messages = []
+        iocontroller = gui.IOController(
+            self.taskFile, messages.append, self.settings
+        )
+        self.taskFile.setFilename(self.filename1)
+        iocontroller._saveSave(
+            self.taskFile, lambda *args, **kwargs: None
+        )  # pylint: disable=W0212
+        self.assertEqual(
+            "Saved 0 tasks to whatever.tsk in 0.00 seconds", messages[-1]
+        )
+
     def testIOErrorOnExport(self):
         self.taskFile.setFilename(self.filename1)
         self.taskFile.tasks().append(task.Task())
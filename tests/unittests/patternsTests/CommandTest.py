@@ -82,3 +82,174 @@ class HistoryTest(test.TestCase, asserts.CommandAssertsMixin):
         self.assertTrue(self.commands.hasFuture())
         self.commands.redo()
         self.assertFalse(self.commands.hasFuture())
+
+
+class CommandWithData(patterns.Command):
+    def __init__(self, nrBytes):
+        super().__init__()
+        self.data = "x" * nrBytes
+        self.compacted = False
+
+    def compact(self):
+        super().compact()
+        self.compacted = True
+
+
+class HistoryMemoryTest(test.TestCase, asserts.CommandAssertsMixin):
+    def setUp(self):
+        self.commands = patterns.CommandHistory()
+
+    def tearDown(self):
+        self.commands.setMaxBytes(patterns.CommandHistory.defaultMaxBytes)
+        self.commands.clear()
+
+    def testNoBytesInitially(self):
+        self.assertEqual(0, self.commands.nrBytes())
+
+    def testCommandsAreCompactedOnceDone(self):
+        command = CommandWithData(10)
+        command.do()
+        self.assertTrue(command.compacted)
+
+    def testCommandIsCompactedAfterItsNestedCommands(self):
+        compacted = []
+        outer, inner = CommandWithData(10), CommandWithData(10)
+        outer.compact = lambda: compacted.append(outer)
+        inner.compact = lambda: compacted.append(inner)
+        outer.do_command = inner.do
+        outer.do()
+        self.assertEqual([inner, outer], compacted)
+
+    def testCompactedCommandsAreMeasured(self):
+        command = CommandWithData(1000)
+        command.do()
+        self.assertTrue(command.size() == self.commands.nrBytes() > 1000)
+
+    def testOldestCommandsAreForgottenWhenOverTheLimit(self):
+        self.commands.setMaxBytes(3500)
+        commands = [CommandWithData(1000) for _ in range(4)]
+        for each in commands:
+            each.do()
+        self.assertHistoryAndFuture(commands[2:], [])
+
+    def testLowerTheLimit(self):
+        commands = [CommandWithData(1000) for _ in range(4)]
+        for each in commands:
+            each.do()
+        self.commands.setMaxBytes(0)
+        self.assertHistoryAndFuture(commands[3:], [])
+
+    def testCommandBeingDoneIsNotForgotten(self):
+        self.commands.setMaxBytes(1500)
+        outer = CommandWithData(1000)
+        inner = [CommandWithData(1000) for _ in range(2)]
+
+        def do_command():
+            for each in inner:
+                each.do()
+            self.assertHistoryAndFuture([outer] + inner, [])
+
+        outer.do_command = do_command
+        outer.do()
+        self.assertHistoryAndFuture(inner[1:], [])
+
+    def testClearForgetsSizes(self):
+        for _ in range(3):
+            CommandWithData(1000).do()
+        self.commands.clear()
+        self.assertEqual(0, self.commands.nrBytes())
+
+
+class UndoableCommandWithData(CommandWithData):
+    def __init__(self, nrBytes, onUndo):
+        super().__init__(nrBytes)
+        self.onUndo = onUndo
+
+    def undo(self):
+        super().undo()
+        self.onUndo(self)
+
+
+class HistoryLimitTest(test.TestCase, asserts.CommandAssertsMixin):
+    def setUp(self):
+        self.commands = patterns.CommandHistory()
+        self.undone = []
+
+    def tearDown(self):
+        self.commands.setJournal(None)
+        self.commands.setMaxDepth(patterns.CommandHistory.defaultMaxDepth)
+        self.commands.setMaxBytes(patterns.CommandHistory.defaultMaxBytes)
+        self.commands.clear()
+
+    def doCommands(self, nrCommands, nrBytes=10):
+        commands = [
+            UndoableCommandWithData(nrBytes, self.undone.append)
+            for _ in range(nrCommands)
+        ]
+        for each in commands:
+            each.do()
+        return commands
+
+    def testOldestCommandsAreForgottenWhenOverTheDepth(self):
+        self.commands.setMaxDepth(3)
+        commands = self.doCommands(5)
+        self.assertHistoryAndFuture(commands[2:], [])
+
+    def testLowerTheDepth(self):
+        commands = self.doCommands(5)
+        self.commands.setMaxDepth(3)
+        self.assertHistoryAndFuture(commands[2:], [])
+
+    def testOldestCommandsAreMovedToTheJournal(self):
+        self.commands.setJournal(patterns.CommandJournal())
+        self.commands.setMaxDepth(3)
+        commands = self.doCommands(5)
+        self.assertHistoryAndFuture(commands, [])
+        self.assertEqual({}, commands[0].__dict__)
+
+    def testUndoCommandsFromTheJournal(self):
+        self.commands.setJournal(patterns.CommandJournal())
+        self.commands.setMaxDepth(2)
+        commands = self.doCommands(5, nrBytes=100)
+        for _ in range(5):
+            self.commands.undo()
+        self.assertEqual(commands[::-1], self.undone)
+        self.assertEqual(["x" * 100] * 5, [each.data for each in commands])
+        self.assertHistoryAndFuture([], commands[::-1])
+
+    def testRedoAfterUndoFromTheJournal(self):
+        self.commands.setJournal(patterns.CommandJournal())
+        self.commands.setMaxDepth(2)
+        commands = self.doCommands(4)
+        for _ in range(3):
+            self.commands.undo()
+        for _ in range(3):
+            self.commands.redo()
+        self.assertHistoryAndFuture(commands, [])
+
+    def testCommandThatCantBeStoredIsForgotten(self):
+        journal = patterns.CommandJournal()
+        self.commands.setJournal(journal)
+        commands = self.doCommands(4)
+        journal.store = lambda command: command is commands[0]
+        self.commands.setMaxDepth(2)
+        self.assertHistoryAndFuture(commands[2:], [])
+
+    def testStatistics(self):
+        self.commands.setJournal(patterns.CommandJournal())
+        self.commands.setMaxDepth(3)
+        self.doCommands(5, nrBytes=1000)
+        self.commands.undo()
+        statistics = self.commands.statistics()
+        self.assertEqual(5, statistics["nrCommands"])
+        self.assertEqual(3, statistics["nrCommandsInMemory"])
+        self.assertEqual(2, statistics["nrCommandsInJournal"])
+        self.assertTrue(statistics["nrBytesInMemory"] > 1000)
+        self.assertTrue(statistics["nrBytesInJournal"] > 2000)
+
+    def testClearEmptiesTheJournal(self):
+        self.commands.setJournal(patterns.CommandJournal())
+        self.commands.setMaxDepth(2)
+        self.doCommands(4, nrBytes=1000)
+        self.commands.clear()
+        self.assertEqual(0, self.commands.statistics()["nrBytesInJournal"])
@@ -18,6 +18,7 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import test
 from taskcoachlib import patterns
+from pubsub import pub
 
 
 class EventTest(test.TestCase):
@@ -199,6 +200,16 @@ class EventTest(test.TestCase):
             patterns.Event(), self.event.subEvent(("eventtype", "source"))
         )
 
+    def testChangingSubEventDoesNotChangeEvent(self):
+        subEvent = self.event.subEvent(("eventtype", None))
+        subEvent.addSource("source", type="eventtype")
+        self.assertEqual(set([self]), self.event.sources())
+
+    def testChangingEventDoesNotChangeSubEvent(self):
+        subEvent = self.event.subEvent(("eventtype", None))
+        self.event.addSource("source", type="eventtype")
+        self.assertEqual(set([self]), subEvent.sources())
+
 
 class ObservableCollectionFixture(test.TestCase):
     def setUp(self):
@@ -696,3 +707,175 @@ class PublisherTest(test.TestCase):
         )
         patterns.Event("eventType1", "observable2").send()
         self.assertTrue(self.events)
+
+    def testObserversRegisteredForTheSameTypeShareTheSubEvent(self):
+        self.publisher.registerObserver(self.onEvent, eventType="eventType")
+        self.publisher.registerObserver(self.onEvent2, eventType="eventType")
+        patterns.Event("eventType", "observable").send()
+        self.assertTrue(self.events[0] is self.events2[0])
+
+    def testNotifyObserverForSpecificSourceOnlyGetsThatSource(self):
+        self.publisher.registerObserver(
+            self.onEvent, eventType="eventType", eventSource="observable1"
+        )
+        event = patterns.Event("eventType", "observable1")
+        event.addSource("observable2")
+        event.send()
+        self.assertEqual(
+            [patterns.Event("eventType", "observable1")], self.events
+        )
+
+
+class BatchTest(test.TestCase):
+    def setUp(self):
+        self.events = []
+        self.messages = []
+        patterns.Publisher().registerObserver(
+            self.onEvent, eventType="eventType"
+        )
+        pub.subscribe(self.onMessage, "test.topic")
+
+    def onEvent(self, event):
+        self.events.append(event)
+
+    def onMessage(self, newValue, sender):
+        self.messages.append((newValue, sender))
+
+    def testEventsAreDeferredUntilTheEndOfTheBatch(self):
+        with patterns.batch():
+            patterns.Event("eventType", "source").send()
+            self.assertFalse(self.events)
+        self.assertEqual([patterns.Event("eventType", "source")], self.events)
+
+    def testEventsAreCoalesced(self):
+        with patterns.batch():
+            patterns.Event("eventType", "source1", "value1").send()
+            patterns.Event("eventType", "source2", "value2").send()
+            patterns.Event("eventType", "source1", "value3").send()
+        self.assertEqual(1, len(self.events))
+        self.assertEqual(set(["source1", "source2"]), self.events[0].sources())
+
+    def testLastValueWins(self):
+        with patterns.batch():
+            patterns.Event("eventType", "source", "value1").send()
+            patterns.Event("eventType", "source", "value2").send()
+        self.assertEqual(
+            [patterns.Event("eventType", "source", "value2")], self.events
+        )
+
+    def testEventsWithDifferentTypesAreNotCoalesced(self):
+        patterns.Publisher().registerObserver(
+            self.onEvent, eventType="otherEventType"
+        )
+        with patterns.batch():
+            patterns.Event("eventType", "source").send()
+            patterns.Event("otherEventType", "source").send()
+        self.assertEqual(
+            [
+                patterns.Event("eventType", "source"),
+                patterns.Event("otherEventType", "source"),
+            ],
+            self.events,
+        )
+
+    def testAddedItemsAreCoalesced(self):
+        patterns.Publisher().registerObserver(self.onEvent, "list.add")
+        with patterns.batch():
+            patterns.Event("list.add", "list", "item1").send()
+            patterns.Event("list.add", "list", "item2").send()
+        self.assertEqual(
+            set(["item1", "item2"]), set(self.events[0].values("list"))
+        )
+
+    def registerForAddAndRemove(self, observable):
+        for eventType in (
+            observable.addItemEventType(),
+            observable.removeItemEventType(),
+        ):
+            patterns.Publisher().registerObserver(
+                self.onEvent, eventType=eventType, eventSource=observable
+            )
+
+    def testAddRemoveAddIsDeliveredInOrder(self):
+        observable = patterns.ObservableList()
+        self.registerForAddAndRemove(observable)
+        with patterns.batch():
+            observable.append("item")
+            observable.remove("item")
+            observable.append("item")
+        addEvent = patterns.Event(
+            observable.addItemEventType(), observable, "item"
+        )
+        removeEvent = patterns.Event(
+            observable.removeItemEventType(), observable, "item"
+        )
+        self.assertEqual([addEvent, removeEvent, addEvent], self.events)
+
+    def testRemoveAddIsDeliveredInOrder(self):
+        observable = patterns.ObservableList(["item"])
+        self.registerForAddAndRemove(observable)
+        with patterns.batch():
+            observable.remove("item")
+            observable.append("item")
+        self.assertEqual(
+            [
+                patterns.Event(
+                    observable.removeItemEventType(), observable, "item"
+                ),
+                patterns.Event(
+                    observable.addItemEventType(), observable, "item"
+                ),
+            ],
+            self.events,
+        )
+
+    def testSuccessiveAddsAreCoalesced(self):
+        observable = patterns.ObservableList()
+        self.registerForAddAndRemove(observable)
+        with patterns.batch():
+            observable.append("item1")
+            observable.append("item2")
+        self.assertEqual(
+            [
+                patterns.Event(
+                    observable.addItemEventType(), observable, "item1", "item2"
+                )
+            ],
+            self.events,
+        )
+
+    def testMessagesAreDeferredUntilTheEndOfTheBatch(self):
+        with patterns.batch():
+            patterns.sendMessage("test.topic", newValue=1, sender="sender")
+            self.assertFalse(self.messages)
+        self.assertEqual([(1, "sender")], self.messages)
+
+    def testMessagesAreDeliveredInOrder(self):
+        with patterns.batch():
+            patterns.sendMessage("test.topic", newValue=1, sender="sender1")
+            patterns.sendMessage("test.topic", newValue=2, sender="sender2")
+            patterns.sendMessage("test.topic", newValue=3, sender="sender1")
+        self.assertEqual(
+            [(1, "sender1"), (2, "sender2"), (3, "sender1")], self.messages
+        )
+
+    def testNestedBatches(self):
+        with patterns.batch():
+            with patterns.batch():
+                patterns.Event("eventType", "source").send()
+            self.assertFalse(self.events)
+        self.assertEqual(1, len(self.events))
+
+    def testBatchIsDeliveredWhenAnExceptionIsRaised(self):
+        try:
+            with patterns.batch():
+                patterns.Event("eventType", "source").send()
+                raise ValueError
+        except ValueError:
+            pass
+        self.assertEqual(1, len(self.events))
+        self.assertFalse(patterns.Publisher().isBatching())
+
+    def testMessagesAreSentImmediatelyWithoutBatch(self):
+        patterns.sendMessage("test.topic", newValue=1, sender="sender")
+        self.assertEqual([(1, "sender")], self.messages)
@@ -960,6 +960,73 @@ class TaskFileMergeTest(TaskFileTestCase):
         self.assertEqual(1, len(self.taskFile.categories()))
 
 
+class TaskFileSaveStatisticsTest(TaskFileTestCase):
+    def setUp(self):
+        super().setUp()
+        self.taskFile.setFilename(self.filename)
+
+    def assertSavePath(self, expectedPath, taskFile=None):
+        taskFile = taskFile or self.taskFile
+        taskFile.save()
+        statistics = taskFile.saveStatistics()
+        self.assertEqual(expectedPath, statistics["path"])
+        self.assertTrue(statistics["duration"] >= 0)
+
+    def testNoSaveYet(self):
+        self.assertEqual(None, self.taskFile.saveStatistics()["path"])
+
+    def testFirstSaveCreatesNewFile(self):
+        self.assertSavePath("new")
+
+    def testSecondSaveDoesNotMergeUnchangedFile(self):
+        self.taskFile.save()
+        self.task.setSubject("New subject")
+        self.assertSavePath("unchanged")
+
+    def testSaveAfterLoadDoesNotMergeUnchangedFile(self):
+        self.taskFile.save()
+        self.emptyTaskFile.load(self.filename)
+        list(self.emptyTaskFile.tasks())[0].setSubject("New subject")
+        self.assertSavePath("unchanged", self.emptyTaskFile)
+
+    def testSaveAfterLoadDoesNotMergeUnchangedOldFile(self):
+        self.taskFile.save()
+        anHourAgo = os.stat(self.filename).st_mtime - 3600
+        os.utime(self.filename, (anHourAgo, anHourAgo))
+        self.emptyTaskFile.load(self.filename)
+        list(self.emptyTaskFile.tasks())[0].setSubject("New subject")
+        self.assertSavePath("unchanged", self.emptyTaskFile)
+
+    def testSaveMergesFileRewrittenWithSameSizeAndModificationTime(self):
+        self.taskFile.save()
+        stat = os.stat(self.filename)
+        with open(self.filename, "rb") as fd:
+            contents = fd.read()
+        with open(self.filename, "wb") as fd:
+            fd.write(contents.replace(b'subject="task"', b'subject="tusk"'))
+        os.utime(self.filename, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assertSavePath("merge")
+
+    def testSaveMergesFileChangedByOthers(self):
+        self.taskFile.save()
+        self.emptyTaskFile.load(self.filename)
+        self.emptyTaskFile.tasks().append(task.Task(subject="Other task"))
+        self.emptyTaskFile.save()
+        self.assertSavePath("merge")
+        self.assertEqual(2, len(self.taskFile.tasks()))
+
+    def testSaveMergesWhenChangesFileWasChangedByOthers(self):
+        self.taskFile.save()
+        self.emptyTaskFile.load(self.filename)
+        self.emptyTaskFile.mergeDiskChanges()
+        self.assertSavePath("merge")
+
+    def testSaveAsCreatesNewFile(self):
+        self.taskFile.save()
+        self.taskFile.saveas(self.filename2)
+        self.assertEqual("new", self.taskFile.saveStatistics()["path"])
+
+
 class LockedTaskFileLockTest(TaskFileTestCase):
     def createTaskFiles(self):
         # pylint: disable=W0201
@@ -1487,7 +1554,9 @@ class TaskFileMultiUserTestBase(object):
         self.doSave(self.taskFile2)
         newObj = getattr(self.taskFile2, listName)().rootItems()[0]
         self.assertEqual(len(newObj.categories()), 1)
-        self.assertEqual(newObj.categories().pop().id(), self.category.id())
+        self.assertEqual(
+            list(newObj.categories())[0].id(), self.category.id()
+        )
 
     def testAddNoteCategory(self):
         self._testAddObjectCategory("notes")
@@ -1517,7 +1586,9 @@ class TaskFileMultiUserTestBase(object):
 
         newObj = getattr(self.taskFile2, listName)().rootItems()[0]
         self.assertEqual(len(newObj.categories()), 1)
-        self.assertEqual(newObj.categories().pop().id(), self.category2.id())
+        self.assertEqual(
+            list(newObj.categories())[0].id(), self.category2.id()
+        )
 
     def testChangeNoteCategory(self):
         self._testChangeObjectCategory("notes")
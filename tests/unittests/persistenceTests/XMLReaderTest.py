@@ -87,6 +87,7 @@ class XMLTemplateReaderTestCase(test.TestCase):
 
 class XMLReaderTestCase(test.TestCase):
     tskversion = "Subclass responsibility"
+    streaming = False
 
     def setUp(self):
         super().setUp()
@@ -96,7 +97,9 @@ class XMLReaderTestCase(test.TestCase):
         # pylint: disable=W0201
         self.fd = io.StringIO()
         self.fd.name = "testfile.tsk"
-        self.reader = persistence.XMLReader(self.fd)
+        self.reader = persistence.XMLReader(
+            self.fd, streaming=self.streaming
+        )
         all_xml = (
             '<?taskcoach release="whatever" '
             'tskversion="%d"?>\n' % self.tskversion + xml_contents
@@ -2238,3 +2241,39 @@ class XMLReaderVersion37Test(XMLReaderTestCase):
         self.assertTrue(
             "noteid" in [obj.id() for obj in categories[0].categorizables()]
         )
+
+
+class StreamingXMLReaderVersion13Test(XMLReaderVersion13Test):
+    # The streaming reader falls back to parsing the complete tree for
+    # task files in which categories are stored inside task nodes.
+    streaming = True
+
+
+class StreamingXMLReaderVersion24Test(XMLReaderVersion24Test):
+    streaming = True
+
+
+class StreamingXMLReaderVersion37Test(XMLReaderVersion37Test):
+    streaming = True
+
+    def testTopLevelObjectsAreCreatedWhileParsing(self):
+        tasks, categories, notes, _, _, guid = self.writeAndRead(
+            """
+        <tasks>
+          <task id="1" subject="Task">
+            <task id="1.1" subject="Subtask" prerequisites="2" />
+          </task>
+          <task id="2" subject="Other task" />
+          <category categorizables="1.1" subject="Category" />
+          <note subject="Note" />
+          <guid>GUID</guid>
+        </tasks>"""
+        )
+        self.assertEqual(
+            ["Task", "Other task"], [eachTask.subject() for eachTask in tasks]
+        )
+        subtask = tasks[0].children()[0]
+        self.assertEqual(set([tasks[1]]), subtask.prerequisites())
+        self.assertEqual(set([subtask]), categories[0].categorizables())
+        self.assertEqual("Note", notes[0].subject())
+        self.assertEqual("GUID", guid)
@@ -889,3 +889,77 @@ class XMLWriterTest(test.TestCase):
             modificationDateTime=date.DateTime.min
         )
         self.expectNotInXML('modificationDateTime="0001-01-01 00:00:00"')
+
+
+class StreamingXMLWriterTest(test.TestCase):
+    def setUp(self):
+        task.Task.settings = config.Settings(load=False)
+        self.taskList = task.TaskList()
+        self.categoryContainer = category.CategoryList()
+        self.noteContainer = note.NoteContainer()
+
+    def write(self, streaming, guid="GUID"):
+        fd = io.BytesIO()
+        persistence.XMLWriter(fd, streaming=streaming).write(
+            self.taskList,
+            self.categoryContainer,
+            self.noteContainer,
+            SyncMLConfigNode("root"),
+            guid,
+        )
+        return fd.getvalue()
+
+    def assertStreamingOutputIsIdentical(self, guid="GUID"):
+        self.assertEqual(
+            self.write(streaming=False, guid=guid),
+            self.write(streaming=True, guid=guid),
+        )
+
+    def fillContainers(self):
+        parent = task.Task(subject="Parent\twith <markup> & tab")
+        child = task.Task(subject="Child", description="Line 1\nLine 2")
+        parent.addChild(child)
+        other = task.Task(subject="Other", prerequisites=[child])
+        child.addEffort(
+            effort.Effort(
+                child, date.DateTime(2004, 1, 1), date.DateTime(2004, 1, 2)
+            )
+        )
+        child.addAttachments(attachment.FileAttachment("whatever.txt"))
+        parent.addNote(note.Note(subject="Task note"))
+        self.taskList.extend([parent, other])
+        aCategory = category.Category("Category")
+        aCategory.addCategorizable(child)
+        aCategory.addChild(category.Category("Subcategory"))
+        self.categoryContainer.append(aCategory)
+        self.noteContainer.append(note.Note(subject="Note"))
+        return parent, other
+
+    def testEmptyFile(self):
+        self.assertStreamingOutputIsIdentical(guid=None)
+
+    def testOnlyGUID(self):
+        self.assertStreamingOutputIsIdentical()
+
+    def testFilledContainers(self):
+        self.fillContainers()
+        self.assertStreamingOutputIsIdentical()
+
+    def testRoundTrip(self):
+        parent, other = self.fillContainers()
+        fd = io.StringIO(self.write(streaming=True).decode("utf-8"))
+        fd.name = "testfile.tsk"
+        tasks, categories, notes, _, _, guid = persistence.XMLReader(
+            fd, streaming=True
+        ).read()
+        self.assertEqual(
+            [parent.subject(), other.subject()],
+            [eachTask.subject() for eachTask in tasks],
+        )
+        child = tasks[0].children()[0]
+        self.assertEqual("Line 1\nLine 2", child.description())
+        self.assertEqual(set([child]), tasks[1].prerequisites())
+        self.assertEqual(1, len(child.efforts()))
+        self.assertEqual(set([child]), categories[0].categorizables())
+        self.assertEqual(["Note"], [eachNote.subject() for eachNote in notes])
+        self.assertEqual("GUID", guid)
@@ -240,6 +240,80 @@ class CommonTestsMixin(object):
         item = self.getFirstTreeItem()
         self.assertEqual("item 0", self.treeCtrl.GetItemText(item))
 
+    def testRefreshChildItem(self):
+        self.children[None] = [self.item0]
+        self.children[self.item0] = [self.item0_0]
+        self.treeCtrl.RefreshAllItems(2)
+        self.treeCtrl.RefreshItems(self.item0_0)
+        item = self.treeCtrl.GetFirstChild(self.getFirstTreeItem())[0]
+        self.assertEqual("item 0.0", self.treeCtrl.GetItemText(item))
+
+    def testRefreshItemThatIsNoLongerInTheTree(self):
+        self.children[None] = [self.item0, self.item1]
+        self.treeCtrl.RefreshAllItems(2)
+        self.children[None] = [self.item1]
+        self.treeCtrl.RefreshAllItems(1)
+        self.treeCtrl.RefreshItems(self.item0)
+        self.assertEqual(1, len(self.treeCtrl.GetItemChildren()))
+
+    def testUpdateAllItems_AddItem(self):
+        self.children[None] = [self.item0]
+        self.treeCtrl.RefreshAllItems(1)
+        self.children[None] = [self.item0, self.item1]
+        self.assertEqual(1, self.treeCtrl.UpdateAllItems())
+        self.assertEqual(
+            ["item 0", "item 1"],
+            [
+                self.treeCtrl.GetItemText(item)
+                for item in self.treeCtrl.GetItemChildren()
+            ],
+        )
+
+    def testUpdateAllItems_RemoveItem(self):
+        self.children[None] = [self.item0, self.item1]
+        self.treeCtrl.RefreshAllItems(2)
+        self.children[None] = [self.item1]
+        self.assertEqual(1, self.treeCtrl.UpdateAllItems())
+        self.assertEqual(
+            "item 1", self.treeCtrl.GetItemText(self.getFirstTreeItem())
+        )
+
+    def testUpdateAllItems_RemoveParentRemovesChildren(self):
+        self.children[None] = [self.item0, self.item1]
+        self.children[self.item0] = [self.item0_0]
+        self.treeCtrl.RefreshAllItems(3)
+        self.children[None] = [self.item1]
+        self.assertEqual(2, self.treeCtrl.UpdateAllItems())
+        self.assertEqual(1, self.treeCtrl.GetItemCount())
+
+    def testUpdateAllItems_ReorderItems(self):
+        self.children[None] = [self.item0, self.item1]
+        self.treeCtrl.RefreshAllItems(2)
+        self.children[None] = [self.item1, self.item0]
+        self.treeCtrl.UpdateAllItems()
+        self.assertEqual(
+            "item 1", self.treeCtrl.GetItemText(self.getFirstTreeItem())
+        )
+
+    def testUpdateAllItems_ReorderChildren(self):
+        self.children[None] = [self.item0]
+        self.children[self.item0] = [self.item0_0, self.item0_1]
+        self.treeCtrl.RefreshAllItems(3)
+        self.children[self.item0] = [self.item0_1, self.item0_0]
+        self.treeCtrl.UpdateAllItems()
+        self.assertEqual(
+            "item 0.1",
+            self.treeCtrl.GetItemText(
+                self.treeCtrl.GetFirstChild(self.getFirstTreeItem())[0]
+            ),
+        )
+
+    def testUpdateAllItems_NoChanges(self):
+        self.children[None] = [self.item0, self.item1]
+        self.children[self.item0] = [self.item0_0]
+        self.treeCtrl.RefreshAllItems(3)
+        self.assertEqual(0, self.treeCtrl.UpdateAllItems())
+
     def testIsAnyItemCollapsable_NoItems(self):
         self.assertFalse(self.treeCtrl.isAnyItemCollapsable())
 
@@ -307,6 +381,45 @@ class TreeListCtrlTest(TreeCtrlTestCase, CommonTestsMixin):
         self.treeCtrl.AssignImageList(imageList)  # pylint: disable=E1101
 
 
+class VirtualTreeListCtrlTest(TreeCtrlTestCase, CommonTestsMixin):
+    def setUp(self):
+        super().setUp()
+        self.renderedItems = []
+        self.frame.getItemText = self.getItemText
+        columns = [widgets.Column("subject", "Subject")]
+        self.treeCtrl = widgets.TreeListCtrl(
+            self.frame,
+            columns,
+            self.onSelect,
+            dummy.DummyUICommand(),
+            dummy.DummyUICommand(),
+            dummy.DummyUICommand(),
+            virtual=True,
+        )
+
+    def getItemText(self, item, column):  # pylint: disable=W0613
+        self.renderedItems.append(item)
+        return item.subject()
+
+    def testItemsAreNotRenderedWhenAdded(self):
+        self.children[None] = [self.item0, self.item1]
+        self.treeCtrl.RefreshAllItems(2)
+        self.assertEqual([], self.renderedItems)
+
+    def testItemIsRenderedWhenAskedForItsText(self):
+        self.children[None] = [self.item0]
+        self.treeCtrl.RefreshAllItems(1)
+        item = self.getFirstTreeItem()
+        self.assertEqual("item 0", self.treeCtrl.GetItemText(item))
+        self.assertEqual([self.item0], self.renderedItems)
+
+    def testRefreshingAnUnrenderedItemDoesNotRenderIt(self):
+        self.children[None] = [self.item0]
+        self.treeCtrl.RefreshAllItems(1)
+        self.treeCtrl.RefreshItems(self.item0)
+        self.assertEqual([], self.renderedItems)
+
+
 class CheckTreeCtrlTest(TreeCtrlTestCase, CommonTestsMixin):
     def setUp(self):
         self.frame.getItemParentHasExclusiveChildren = (